@@ -1,4 +1,5 @@
 from prodtools import download_markup_journals
 
 
-download_markup_journals.main()
+if __name__ == "__main__":
+    download_markup_journals.main()
@@ -5,7 +5,6 @@ import configparser
 
 from prodtools.utils import fs_utils
 from prodtools.utils import encoding
-from prodtools.utils.ws import ws_requester
 
 from prodtools import XC_SERVER_CONFIG_PATH
 from prodtools import BIN_PATH
@@ -85,10 +84,18 @@ class Configuration(object):
 
     @property
     def kernel_gate(self):
-        return {key[3:].lower(): self._data.get(key)
+        """
+        Configuração do Exporter. Se não informada, a pasta dos pacotes
+        aguardando o envio por FTP (KG_outbox_path) fica em serial_path
+        """
+        data = {key[3:].lower(): self._data.get(key)
                 for key in self._data.keys()
                 if key.startswith("KG_")
                 }
+        if data.get("server") and not data.get("outbox_path") and self.serial_path:
+            data["outbox_path"] = os.path.join(
+                self.serial_path, "kernel_gate_outbox")
+        return data
 
     @property
     def remote_web_app_path(self):
@@ -253,6 +260,23 @@ class Configuration(object):
     def gerapadrao_permission_file(self):
         return self._data.get('GERAPADRAO_PERMISSION')
 
+    @property
+    def gerapadrao_state_file(self):
+        """
+        Registro das execuções do GeraPadrao e dos fascículos processados
+        """
+        if self._data.get('GERAPADRAO_STATE'):
+            return self._data.get('GERAPADRAO_STATE')
+        if self.gerapadrao_permission_file:
+            return self.gerapadrao_permission_file + '.state.json'
+
+    @property
+    def gerapadrao_lock_max_age(self):
+        """
+        Idade máxima, em segundos, do bloqueio do GeraPadrao
+        """
+        return int(self._data.get('GERAPADRAO_LOCK_MAX_AGE') or 12 * 60 * 60)
+
     @property
     def gerapadrao_proc_path(self):
         return self._data.get('PROC_PATH')
@@ -376,6 +400,48 @@ class Configuration(object):
             servers = servers.split(';')
         return servers
 
+    @property
+    def transference_max_workers(self):
+        return int(self._data.get('TRANSFER_MAX_WORKERS') or 4)
+
+    @property
+    def transference_retries(self):
+        return int(self._data.get('TRANSFER_RETRIES') or 2)
+
+    @property
+    def paginated_reports_min_articles(self):
+        """
+        A partir deste número de documentos, os relatórios de cada documento
+        ficam em páginas próprias. 0 desativa
+        """
+        value = self._data.get('PAGINATED_REPORTS_MIN_ARTICLES')
+        return int(value) if value else 100
+
+    @property
+    def pmc_package_max_workers(self):
+        """
+        Número de processos que geram o pacote PMC.
+        0 usa o número de processadores
+        """
+        return int(self._data.get('PMC_PACKAGE_MAX_WORKERS') or 0) or None
+
+    @property
+    def max_loaded_articles(self):
+        """
+        Quantidade máxima de documentos (árvores XML) mantidos em memória
+        durante o processamento de um pacote; os demais são carregados
+        novamente quando necessários. 0 (sem limite) mantém todos
+        """
+        return int(self._data.get('MAX_LOADED_ARTICLES') or 0) or None
+
+    @property
+    def journals_refresh_interval(self):
+        """
+        Intervalo mínimo, em segundos, entre as verificações de atualização
+        da lista de periódicos (JOURNALS_CSV_URL)
+        """
+        return int(self._data.get('JOURNALS_REFRESH_INTERVAL') or 3600)
+
     @property
     def is_enabled_email_service(self):
         return self.is_activated('EMAIL_SERVICE_STATUS', 'OFF') and self.is_valid_email_configuration
@@ -477,6 +543,8 @@ class Configuration(object):
 
     @property
     def app_ws_requester(self):
+        # importado apenas quando usado (urllib etc)
+        from prodtools.utils.ws import ws_requester
         if self.is_web_access_enabled is False:
             encoding.display_message('ENABLED_WEB_ACCESS=off')
         return ws_requester.WebServicesRequester(self.is_web_access_enabled, self.proxy_info)
@@ -1,5 +1,6 @@
 # coding=utf-8
 import os
+import sys
 from datetime import datetime
 import itertools
 from copy import deepcopy
@@ -19,6 +20,21 @@ from prodtools.data import article_utils
 from prodtools.data import attributes
 
 
+def intern_value(value):
+    """
+    Retorna `value` internado (mesmo objeto para textos iguais), usado nos
+    dados curtos e muito repetidos, como tipos de publicação, idiomas,
+    papéis e códigos de países
+    """
+    if value is None:
+        return None
+    return sys.intern(str(value))
+
+
+def intern_items(items):
+    return [intern_value(item) for item in items]
+
+
 def get_number_from_rid(rid):
     return int(''.join([c for c in rid if c.isdigit()]))
 
@@ -78,6 +94,8 @@ def element_which_requires_permissions(node, node_graphic=None):
 
 class AffiliationXML(object):
 
+    __slots__ = ('node', '_aff', '_institution_id')
+
     def __init__(self, node):
         self.node = node
         self._aff = None
@@ -118,7 +136,7 @@ class AffiliationXML(object):
     def country(self):
         r = []
         for node in find_nodes(self.node, ['.//country']):
-            r.append((node.attrib.get('country'), node.text))
+            r.append((intern_value(node.attrib.get('country')), node.text))
         return r
 
     @property
@@ -189,6 +207,12 @@ class AffiliationXML(object):
 
 class Affiliation(object):
 
+    __slots__ = (
+        'xml', 'id', 'city', 'state', 'country', 'i_country', 'orgname',
+        'norgname', 'orgdiv1', 'orgdiv2', 'orgdiv3', 'label', 'email',
+        'original',
+    )
+
     def __init__(self):
         self.xml = None
         self.id = None
@@ -310,6 +334,8 @@ class HRef(object):
 
 class ContribId(object):
 
+    __slots__ = ('attrib', 'xml', 'value')
+
     def __init__(self, node):
         self.attrib = node.attrib
         self.xml = tostring(node)
@@ -318,6 +344,11 @@ class ContribId(object):
 
 class ContribXML(object):
 
+    __slots__ = (
+        'node', '_contrib', 'fnames', 'surnames', 'suffixes', 'prefixes',
+        'contrib_id_items', 'xref_items',
+    )
+
     def __init__(self, node):
         self.node = node
         self._contrib = None
@@ -356,7 +387,7 @@ class ContribXML(object):
             c.contrib_id = {}
             for contrib_id in self.contrib_id_items:
                 c.contrib_id[contrib_id.attrib.get('contrib-id-type')] = contrib_id.value
-            c.role = self.node.get('contrib-type')
+            c.role = intern_value(self.node.get('contrib-type'))
             for text, attribs in self.xref_items:
                 if attribs.get('ref-type') == 'aff' and attribs.get('rid'):
                     c.xref.append(attribs.get('rid'))
@@ -366,7 +397,7 @@ class ContribXML(object):
     def corp_author(self):
         if len(self.collabs) > 0:
             c = CorpAuthor()
-            c.role = self.node.attrib.get('contrib-type')
+            c.role = intern_value(self.node.attrib.get('contrib-type'))
             c.collab = first_item(self.collabs)
             return c
 
@@ -378,18 +409,23 @@ class ContribXML(object):
             self.anonymous_author
         )
         if self._contrib and role:
-            self._contrib.role = role
+            self._contrib.role = intern_value(role)
         return self._contrib
 
 
 class AnonymousAuthor(object):
 
+    __slots__ = ('fullname', 'role')
+
     def __init__(self, fullname):
         self.fullname = fullname
 
 
 class PersonAuthor(object):
 
+    __slots__ = (
+        'fname', 'surname', 'suffix', 'prefix', 'contrib_id', 'role', 'xref')
+
     def __init__(self):
         self.fname = None
         self.surname = None
@@ -406,6 +442,8 @@ class PersonAuthor(object):
 
 class CorpAuthor(object):
 
+    __slots__ = ('role', 'collab')
+
     def __init__(self):
         self.role = None
         self.collab = None
@@ -475,28 +513,85 @@ class Text(object):
 class ArticleXML(object):
 
     def __init__(self, tree):
-        self.tree = tree
-        self.journal_meta = None
-        self.article_meta = None
-        self.body = None
-        self.back = None
-        self.translations = []
-        self.sub_articles = []
-        self.responses = []
+        self._tree = tree
+        self._load_tree = None
+        self._nodes = None
         self._fpage_node = None
         self._fpage = None
         self.fpage_seq = None
         self._all_abstracts = None
 
-        if tree is not None:
-            self.journal_meta = self.tree.find('./front/journal-meta')
-            self.article_meta = self.tree.find('./front/article-meta')
-            self.body = self.tree.find('.//body')
-            self.back = self.tree.find('.//back')
-            self.translations = self.tree.findall('./sub-article[@article-type="translation"]')
-            for s in self.tree.findall('./sub-article'):
-                self.sub_articles.append(s)
-            self.responses = self.tree.findall('./response')
+    @property
+    def tree(self):
+        if self._tree is None and self._load_tree is not None:
+            self._tree = self._load_tree()
+        return self._tree
+
+    def release_tree(self, load_tree=None):
+        """
+        Libera a árvore XML e os nós obtidos dela, mantendo os demais
+        dados do documento. A árvore é carregada novamente por `load_tree`
+        (ou pelo informado anteriormente), quando for necessária.
+        Sem `load_tree`, a árvore é mantida
+        """
+        self._load_tree = load_tree or self._load_tree
+        if self._load_tree is not None:
+            self._tree = None
+            self._nodes = None
+            self._fpage_node = None
+
+    @property
+    def nodes(self):
+        if self._nodes is None:
+            nodes = {
+                'journal_meta': None,
+                'article_meta': None,
+                'body': None,
+                'back': None,
+                'translations': [],
+                'sub_articles': [],
+                'responses': [],
+            }
+            tree = self.tree
+            if tree is not None:
+                nodes['journal_meta'] = tree.find('./front/journal-meta')
+                nodes['article_meta'] = tree.find('./front/article-meta')
+                nodes['body'] = tree.find('.//body')
+                nodes['back'] = tree.find('.//back')
+                nodes['translations'] = tree.findall(
+                    './sub-article[@article-type="translation"]')
+                nodes['sub_articles'] = tree.findall('./sub-article')
+                nodes['responses'] = tree.findall('./response')
+            self._nodes = nodes
+        return self._nodes
+
+    @property
+    def journal_meta(self):
+        return self.nodes['journal_meta']
+
+    @property
+    def article_meta(self):
+        return self.nodes['article_meta']
+
+    @property
+    def body(self):
+        return self.nodes['body']
+
+    @property
+    def back(self):
+        return self.nodes['back']
+
+    @property
+    def translations(self):
+        return self.nodes['translations']
+
+    @property
+    def sub_articles(self):
+        return self.nodes['sub_articles']
+
+    @property
+    def responses(self):
+        return self.nodes['responses']
 
     @property
     def is_provisional(self):
@@ -1791,7 +1886,13 @@ class Article(ArticleXML):
         self.article_records = None
         self.is_ex_aop = False
         self.section_code = None
-        self.xml = None if self.tree is None else tostring(self.tree.find('.'))
+
+    @property
+    def xml(self):
+        # obtido somente quando usado, para não manter em memória uma cópia
+        # serializada de cada documento
+        if self.tree is not None:
+            return tostring(self.tree.find('.'))
 
     def count_words(self, word):
         return self.xml.count(word)
@@ -1990,6 +2091,19 @@ class Article(ArticleXML):
 
 class Reference(object):
 
+    __slots__ = (
+        'source', 'id', 'language', 'article_title', 'chapter_title',
+        'trans_title', 'trans_title_language', 'publication_type',
+        'ref_status', 'xml', 'mixed_citation', 'element_citation_texts',
+        'contrib_xml_items', 'person_group_xml_items', 'volume', 'issue',
+        'supplement', 'edition', 'version', 'year', 'publisher_name',
+        'publisher_loc', 'fpage', 'lpage', 'page_range', 'elocation_id',
+        'size', 'label', 'cited_date', 'ext_link', 'degree', 'comments',
+        'notes', 'contract_number', 'doi', 'pmid', 'pmcid',
+        'conference_name', 'conference_location', 'conference_date',
+        'data_registration',
+    )
+
     def __init__(self):
         self.source = None
         self.id = None
@@ -1999,6 +2113,7 @@ class Reference(object):
         self.trans_title = None
         self.trans_title_language = None
         self.publication_type = None
+        self.ref_status = None
         self.xml = None
         self.mixed_citation = None
         self.element_citation_texts = None
@@ -2030,6 +2145,7 @@ class Reference(object):
         self.conference_name = None
         self.conference_location = None
         self.conference_date = None
+        self.data_registration = None
 
     @property
     def formatted_year(self):
@@ -2050,44 +2166,85 @@ class Reference(object):
 
 class ReferenceXML(object):
 
+    # elemento -> atributo com o conteúdo (node_xml_content) dos elementos
+    CONTENT_FIELDS = (
+        ('source', 'source'),
+        ('volume', 'volume'),
+        ('issue', 'issue'),
+        ('supplement', 'supplement'),
+        ('edition', 'edition'),
+        ('version', 'version'),
+        ('year', 'year'),
+        ('fpage', 'fpage'),
+        ('lpage', 'lpage'),
+        ('label', 'label'),
+        ('article-title', 'article_title'),
+        ('chapter-title', 'chapter_title'),
+        ('trans-title', 'trans_title'),
+        ('publisher-name', 'publisher_name'),
+        ('publisher-loc', 'publisher_loc'),
+        ('page-range', 'page_range'),
+        ('elocation-id', 'elocation_id'),
+        ('ext-link', 'ext_link'),
+        ('comment', 'comments'),
+        ('notes', 'notes'),
+        ('conf-name', 'conference_name'),
+        ('conf-loc', 'conference_location'),
+        ('conf-date', 'conference_date'),
+    )
+    INTERNED_FIELDS = ('source', 'volume', 'issue', 'year')
+    # elementos mantidos para as propriedades calculadas sob demanda
+    LAZY_NODES = (
+        'source', 'article-title', 'chapter-title', 'trans-title',
+        'mixed-citation', 'person-group', 'size', 'date-in-citation',
+        'pub-id',
+    )
+
+    __slots__ = (
+        'root', 'elem_citation_nodes', '_pub_id_items', '_doi', '_ref',
+        '_person_group_xml_items', '_contrib_xml_items', '_nodes',
+        '_data_registration', 'source', 'volume', 'issue', 'supplement',
+        'edition', 'version', 'year', 'fpage', 'lpage', 'label',
+        'article_title', 'chapter_title', 'trans_title', 'publisher_name',
+        'publisher_loc', 'page_range', 'elocation_id', 'ext_link', 'comments',
+        'notes', 'contract_number', 'conference_name', 'conference_location',
+        'conference_date',
+    )
+
     def __init__(self, root):
         self.root = root
-        self.elem_citation_nodes = find_nodes(
-            self.root, ['.//element-citation'])
         self._pub_id_items = None
         self._doi = None
         self._ref = None
         self._person_group_xml_items = None
         self._contrib_xml_items = None
-        self.source = nodes_xml_content(self.root, ['.//source'])
-        self.volume = nodes_xml_content(self.root, ['.//volume'])
-        self.issue = nodes_xml_content(self.root, ['.//issue'])
-        self.supplement = nodes_xml_content(self.root, ['.//supplement'])
-        self.edition = nodes_xml_content(self.root, ['.//edition'])
-        self.version = nodes_xml_content(self.root, ['.//version'])
-        self.year = nodes_xml_content(self.root, ['.//year'])
-        self.fpage = nodes_xml_content(self.root, ['.//fpage'])
-        self.lpage = nodes_xml_content(self.root, ['.//lpage'])
-        self.label = nodes_xml_content(self.root, ['.//label'])
-        self.article_title = nodes_xml_content(self.root, ['.//article-title'])
-        self.chapter_title = nodes_xml_content(self.root, ['.//chapter-title'])
-        self.trans_title = nodes_xml_content(self.root, ['.//trans-title'])
-        self.publisher_name = nodes_xml_content(
-            self.root, ['.//publisher-name'])
-        self.publisher_loc = nodes_xml_content(self.root, ['.//publisher-loc'])
-        self.page_range = nodes_xml_content(self.root, ['.//page-range'])
-        self.elocation_id = nodes_xml_content(self.root, ['.//elocation-id'])
-        self.ext_link = nodes_xml_content(self.root, ['.//ext-link'])
-        self.comments = nodes_xml_content(self.root, ['.//comment'])
-        self.notes = nodes_xml_content(self.root, ['.//notes'])
-        self.contract_number = nodes_xml_content(
-            self.root, ['.//comment[@content-type="award-id"]'])
-        self.conference_name = nodes_xml_content(self.root, ['.//conf-name'])
-        self.conference_location = nodes_xml_content(
-            self.root, ['.//conf-loc'])
-        self.conference_date = nodes_xml_content(self.root, ['.//conf-date'])
         self._data_registration = None
 
+        # um único percurso da referência, agrupando os elementos por nome,
+        # na ordem do documento, como os `.//tag` consultados um a um
+        nodes = {}
+        for node in root.iterdescendants():
+            if isinstance(node.tag, str):
+                try:
+                    nodes[node.tag].append(node)
+                except KeyError:
+                    nodes[node.tag] = [node]
+
+        for tag, attr in self.CONTENT_FIELDS:
+            setattr(self, attr, [
+                node_xml_content(node) for node in nodes.get(tag, [])])
+        for attr in self.INTERNED_FIELDS:
+            setattr(self, attr, intern_items(getattr(self, attr)))
+        self.contract_number = [
+            text
+            for node, text in zip(nodes.get('comment', []), self.comments)
+            if node.get('content-type') == 'award-id'
+        ]
+        self.elem_citation_nodes = nodes.get('element-citation', [])
+        self._nodes = {
+            tag: nodes[tag] for tag in self.LAZY_NODES if tag in nodes
+        }
+
     @property
     def reference(self):
         if self._ref is None:
@@ -2142,29 +2299,31 @@ class ReferenceXML(object):
     @property
     def language(self):
         lang = None
-        for elem in ['.//source', './/article-title', './/chapter-title']:
-            if self.root.find(elem) is not None:
-                lang = element_lang(self.root.find(elem))
+        for tag in ('source', 'article-title', 'chapter-title'):
+            if tag in self._nodes:
+                lang = element_lang(self._nodes[tag][0])
             if lang is not None:
                 break
-        return lang
+        return intern_value(lang)
 
     @property
     def trans_title_language(self):
         items = []
-        for node in find_nodes(self.root, ['.//trans-title']):
-            items.append(element_lang(node))
+        for node in self._nodes.get('trans-title', []):
+            items.append(intern_value(element_lang(node)))
         return items
 
     @property
     def publication_type(self):
         if self.elem_citation_nodes is not None:
-            return [item.get('publication-type') for item in self.elem_citation_nodes]
+            return [intern_value(item.get('publication-type'))
+                    for item in self.elem_citation_nodes]
 
     @property
     def ref_status(self):
         if self.elem_citation_nodes is not None:
-            return [item.get('specific-use') for item in self.elem_citation_nodes]
+            return [intern_value(item.get('specific-use'))
+                    for item in self.elem_citation_nodes]
 
     @property
     def xml(self):
@@ -2172,11 +2331,12 @@ class ReferenceXML(object):
 
     @property
     def mixed_citation(self):
-        return nodes_xml_content(self.root, ['.//mixed-citation'])
+        return [node_xml_content(node)
+                for node in self._nodes.get('mixed-citation', [])]
 
     @property
     def element_citation(self):
-        return nodes_xml_content(self.root, ['.//element-citation'])
+        return [node_xml_content(node) for node in self.elem_citation_nodes]
 
     @property
     def contrib_xml_items(self):
@@ -2190,10 +2350,7 @@ class ReferenceXML(object):
 
     @property
     def person_group_nodes(self):
-        if not hasattr(self, '_person_group_nodes'):
-            self._person_group_nodes = find_nodes(
-                self.root, ['.//person-group'])
-        return self._person_group_nodes
+        return self._nodes.get('person-group', [])
 
     @property
     def person_group_xml_items(self):
@@ -2201,7 +2358,8 @@ class ReferenceXML(object):
             groups = []
             if self.elem_citation_nodes is not None:
                 for person_group in self.person_group_nodes:
-                    role = person_group.get('person-group-type', 'author')
+                    role = intern_value(
+                        person_group.get('person-group-type', 'author'))
                     authors = []
                     etal = None
                     for contrib in person_group.findall('*'):
@@ -2218,20 +2376,19 @@ class ReferenceXML(object):
     @property
     def size(self):
         items = []
-        for item in nodes_xml_content_and_attributes(
-                self.root, ['.//size']):
-            text, attribs = item
-            items.append({'size': text, 'units': attribs.get('units')})
+        for node in self._nodes.get('size', []):
+            items.append({'size': tostring(node), 'units': node.get('units')})
         return items if len(items) > 0 else [None]
 
     @property
     def cited_date(self):
-        return nodes_xml_content(
-                    self.root,
-                    [
-                        './/date-in-citation[@content-type="access-date"]',
-                        './/date-in-citation[@content-type="update"]'
-                    ])
+        nodes = self._nodes.get('date-in-citation', [])
+        return [
+            node_xml_content(node)
+            for content_type in ('access-date', 'update')
+            for node in nodes
+            if node.get('content-type') == content_type
+        ]
 
     @property
     def degree(self):
@@ -2241,11 +2398,10 @@ class ReferenceXML(object):
     @property
     def pub_id_items(self):
         if self._pub_id_items is None:
-            data = nodes_xml_content_and_attributes(
-                self.root, ['.//pub-id'])
-            if len(data) > 0:
-                self._pub_id_items = {attribs.get('pub-id-type'): text
-                                      for text, attribs in data}
+            nodes = self._nodes.get('pub-id')
+            if nodes:
+                self._pub_id_items = {node.get('pub-id-type'): tostring(node)
+                                      for node in nodes}
         return self._pub_id_items
 
     @property
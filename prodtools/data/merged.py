@@ -60,26 +60,46 @@ class GroupedDocuments(object):
         self.EXPECTED_UNIQUE_VALUE_LABELS = ['order', 'doi', 'elocation id', 'fpage-lpage-seq-elocation-id']
 
     @property
-    def articles(self):
+    def grouped_docs(self):
+        return self._grouped_docs
+
+    @grouped_docs.setter
+    def grouped_docs(self, value):
+        self._grouped_docs = value
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Descarta os dados agregados calculados a partir de `grouped_docs`.
+        Deve ser chamado sempre que o conjunto de documentos for alterado
+        sem atribuir um novo dicionário a `grouped_docs`
+        """
+        self._aggregates = None
+
+    def _get_aggregates(self):
+        if self._aggregates is None:
+            summaries = {
+                xml_name: article.summary
+                for xml_name, article in self.grouped_docs.items()
+            }
+            self._aggregates = {'summaries': summaries}
+            self._aggregates['articles'] = self._sort_articles()
+            self._aggregates['common_data'] = self._get_common_data(summaries)
+            self._aggregates['unique_values'] = self._get_unique_values(
+                summaries)
+        return self._aggregates
+
+    def _sort_articles(self):
         l = sorted([(article.order, xml_name) for xml_name, article in self.grouped_docs.items()])
         l = [(xml_name, self.grouped_docs[xml_name]) for order, xml_name in l]
         return l
 
-    @property
-    def is_aop_issue(self):
-        return any([a.is_ahead for a in self.grouped_docs.values()])
-
-    @property
-    def is_rolling_pass(self):
-        return all([a for a in self.grouped_docs.values() if a.is_rolling_pass])
-
-    @property
-    def common_data(self):
+    def _get_common_data(self, summaries):
         data = {}
         for label in self.EXPECTED_COMMON_VALUES_LABELS:
             values = {}
-            for xml_name, article in self.grouped_docs.items():
-                value = article.summary[label]
+            for xml_name, summary in summaries.items():
+                value = summary[label]
                 if label in self.IGNORE_NONE and value is None:
                     pass
                 else:
@@ -90,47 +110,77 @@ class GroupedDocuments(object):
             data[label] = values
         return data
 
+    def _get_unique_values(self, summaries):
+        data = {}
+        for label in self.EXPECTED_UNIQUE_VALUE_LABELS:
+            values = {}
+            for xml_name, summary in summaries.items():
+                value = summary[label]
+                if value is not None:
+                    if value not in values:
+                        values[value] = []
+                    values[value].append(xml_name)
+
+            data[label] = values
+        return data
+
+    @property
+    def articles(self):
+        return self._get_aggregates()['articles']
+
+    @property
+    def is_aop_issue(self):
+        return any([a.is_ahead for a in self.grouped_docs.values()])
+
+    @property
+    def is_rolling_pass(self):
+        return all([a for a in self.grouped_docs.values() if a.is_rolling_pass])
+
+    @property
+    def common_data(self):
+        return self._get_aggregates()['common_data']
+
     @property
     def missing_required_data(self):
-        required_items = {}
-        for label in self.REQUIRED_DATA:
-            if label in self.common_data.keys():
-                if None in self.common_data[label].keys():
-                    required_items[label] = self.common_data[label][None]
-        return required_items
+        aggregates = self._get_aggregates()
+        if 'missing_required_data' not in aggregates:
+            common_data = self.common_data
+            required_items = {}
+            for label in self.REQUIRED_DATA:
+                if label in common_data.keys():
+                    if None in common_data[label].keys():
+                        required_items[label] = common_data[label][None]
+            aggregates['missing_required_data'] = required_items
+        return aggregates['missing_required_data']
 
     @property
     def conflicting_values(self):
-        data = {}
-        for label, values in self.common_data.items():
-            if len(values) > 1:
-                data[label] = values
-        return data
+        aggregates = self._get_aggregates()
+        if 'conflicting_values' not in aggregates:
+            data = {}
+            for label, values in self.common_data.items():
+                if len(values) > 1:
+                    data[label] = values
+            aggregates['conflicting_values'] = data
+        return aggregates['conflicting_values']
 
     @property
     def duplicated_values(self):
-        duplicated_labels = {}
-        for label, values in self.unique_values.items():
-            if len(values) > 0 and len(values) != len(self.articles):
-                duplicated = {value: xml_files for value, xml_files in values.items() if len(xml_files) > 1}
-                if len(duplicated) > 0:
-                    duplicated_labels[label] = duplicated
-        return duplicated_labels
+        aggregates = self._get_aggregates()
+        if 'duplicated_values' not in aggregates:
+            total = len(self.articles)
+            duplicated_labels = {}
+            for label, values in self.unique_values.items():
+                if len(values) > 0 and len(values) != total:
+                    duplicated = {value: xml_files for value, xml_files in values.items() if len(xml_files) > 1}
+                    if len(duplicated) > 0:
+                        duplicated_labels[label] = duplicated
+            aggregates['duplicated_values'] = duplicated_labels
+        return aggregates['duplicated_values']
 
     @property
     def unique_values(self):
-        data = {}
-        for label in self.EXPECTED_UNIQUE_VALUE_LABELS:
-            values = {}
-            for xml_name, article in self.grouped_docs.items():
-                value = article.summary[label]
-                if value is not None:
-                    if value not in values:
-                        values[value] = []
-                    values[value].append(xml_name)
-
-            data[label] = values
-        return data
+        return self._get_aggregates()['unique_values']
 
 
 class DocumentsMerger(object):
@@ -1,5 +1,6 @@
 # coding=utf-8
 import logging
+from collections import OrderedDict
 
 from prodtools.utils import xml_utils
 from prodtools.data import article
@@ -20,27 +21,56 @@ class SPPackage(object):
     """
 
     def __init__(self, path, output_path, xml_names, sgmxml_name=None,
-                 optimised=False):
+                 optimised=False, max_loaded_articles=None):
+        """
+        max_loaded_articles (int): se informado, limita a quantidade de
+            árvores XML mantidas em memória (modo para pacotes muito
+            grandes); as demais são liberadas e carregadas novamente
+            do arquivo, quando necessárias
+        """
         self.package_folder = workarea.MultiDocsPackageFolder(path)
         self.wk = workarea.MultiDocsPackageOuputs(output_path)
         self.xml_names = xml_names
         self.optimised = optimised
         self._articles = {}
+        self.loaded_trees = None
+        if max_loaded_articles:
+            self.loaded_trees = LoadedTrees(max_loaded_articles)
+        issue_data = []
         if xml_names:
             for name, item in self.files.items():
                 if item.basename not in xml_names:
                     continue
                 xml, xml_error = xml_utils.load_xml(item.filename)
-                self._articles[name] = article.Article(xml, name)
+                doc = article.Article(xml, name)
+                self._articles[name] = doc
                 self.wk.get_doc_outputs(name, sgmxml_name)
+                issue_data.append(PackageIssueData.article_data(doc))
+                if self.loaded_trees is not None:
+                    doc.release_tree(self._tree_loader(name))
         self.issue_data = PackageIssueData()
-        self.issue_data.setup(self._articles)
+        self.issue_data.setup_data(issue_data)
         if len(xml_names) < len(self.package_folder.pkgfiles_items):
             print("SPPackage have {} documents. "
                   "{} was filtered to be processed.".format(
                     len(self.package_folder.pkgfiles_items), len(xml_names)
                   ))
 
+    def _tree_loader(self, name):
+        def load_tree():
+            xml, xml_error = xml_utils.load_xml(self.files[name].filename)
+            self.loaded_trees.add(self._articles[name])
+            return xml
+        return load_tree
+
+    def release_articles(self):
+        """
+        Libera as árvores XML carregadas, ao final de uma etapa, no modo
+        de memória limitada (`max_loaded_articles`)
+        """
+        if self.loaded_trees is not None:
+            self.loaded_trees.clear()
+
     @property
     def file_paths(self):
         return self.package_folder.file_paths
@@ -71,6 +101,30 @@ class SPPackage(object):
             pkgfiles.zip(self.package_folder.path + '_zips')
 
 
+class LoadedTrees(object):
+    """
+    Mantém carregadas as árvores XML de no máximo `max_loaded` documentos.
+    Ao carregar mais uma, libera a do documento usado há mais tempo
+    """
+    def __init__(self, max_loaded):
+        self.max_loaded = max(max_loaded, 1)
+        self.loads = 0
+        self._docs = OrderedDict()
+
+    def add(self, doc):
+        self.loads += 1
+        self._docs[id(doc)] = doc
+        self._docs.move_to_end(id(doc))
+        while len(self._docs) > self.max_loaded:
+            key, released = self._docs.popitem(last=False)
+            released.release_tree()
+
+    def clear(self):
+        while self._docs:
+            key, released = self._docs.popitem()
+            released.release_tree()
+
+
 class PackageIssueData(object):
     """
     Identifica os dados do fascículo dado um dicionário de `Article`
@@ -84,8 +138,18 @@ class PackageIssueData(object):
         self.journal_data = None
         self._issue_label = None
 
+    @staticmethod
+    def article_data(doc):
+        if doc.tree is not None:
+            return (doc.journal_title, doc.print_issn, doc.e_issn,
+                    doc.issue_label)
+
     def setup(self, articles):
-        data = [(a.journal_title, a.print_issn, a.e_issn, a.issue_label) for a in articles.values() if a.tree is not None]
+        self.setup_data(
+            [self.article_data(a) for a in articles.values()])
+
+    def setup_data(self, data):
+        data = [item for item in data if item is not None]
         if len(data) > 0:
             self.pkg_journal_title, self.pkg_p_issn, self.pkg_e_issn, self.pkg_issue_label = self.select(data)
 
@@ -248,12 +248,25 @@ class DocumentPackageFiles(object):
         return filename
 
     def copy_related_files(self, dest_path):
+        propagation = fs_utils.FilesPropagation()
         if dest_path is not None:
             if not os.path.isdir(dest_path):
                 os.makedirs(dest_path)
             for f in self.related_files:
-                shutil.copyfile(
+                propagation.propagate(
                     os.path.join(self.path, f), os.path.join(dest_path, f))
+            logger.debug(
+                "copy_related_files %s: %s", self.filename, propagation)
+        return propagation
+
+    @property
+    def content_hash(self):
+        """
+        Identifica o conteúdo do documento: XML + arquivos relacionados
+        """
+        return fs_utils.files_hash(
+            [self.filename] +
+            [os.path.join(self.path, f) for f in sorted(self.related_files)])
 
     def copy_xml(self, dest_path):
         if dest_path is not None:
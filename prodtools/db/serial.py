@@ -1,6 +1,8 @@
 # coding=utf-8
 import os
 import shutil
+import json
+import hashlib
 
 from prodtools.utils import fs_utils, xml_utils, encoding
 
@@ -112,6 +114,74 @@ class IssuePathsInSerial(object):
         return os.path.join(self.windows_base_path, self.issue_folder)
 
 
+def record_hash(record):
+    """
+    Retorna o sha256 do registro (dict) serializado
+    """
+    return hashlib.sha256(
+        json.dumps(record, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class ArticlesContentIndex(object):
+    """
+    Índice persistente (por fascículo) do conteúdo dos documentos registrados
+    (hash do XML + arquivos relacionados), usado para identificar os
+    documentos do pacote idênticos aos já registrados e evitar convertê-los
+    novamente.
+    Os dados do registro do fascículo também são copiados para os registros
+    dos documentos, por isso cada item guarda também o hash do registro do
+    fascículo (`record_hash`) e a versão da conversão (`VERSION`)
+    """
+
+    # alterar quando a conversão passar a gerar registros diferentes
+    VERSION = 1
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._items = None
+
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = {}
+            content = fs_utils.read_file(self.filename)
+            if content:
+                try:
+                    self._items = json.loads(content)
+                except ValueError:
+                    self._items = {}
+        return self._items
+
+    def is_registered(self, xml_name, content_hash, order, issue_hash):
+        item = self.items.get(xml_name)
+        return (
+            item is not None and
+            item.get("hash") == content_hash and
+            item.get("order") == order and
+            item.get("issue_hash") == issue_hash and
+            item.get("version") == self.VERSION
+        )
+
+    def register(self, xml_name, content_hash, order, issue_hash):
+        self.items[xml_name] = {
+            "hash": content_hash,
+            "order": order,
+            "issue_hash": issue_hash,
+            "version": self.VERSION,
+        }
+
+    def remove(self, xml_name):
+        self.items.pop(xml_name, None)
+
+    def save(self):
+        dirname = os.path.dirname(self.filename)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        fs_utils.write_file(
+            self.filename, json.dumps(self.items, indent=2, sort_keys=True))
+
+
 class IssueFiles(IssuePathsInSerial):
 
     def __init__(self, journal_files, issue_folder):
@@ -157,6 +227,13 @@ class IssueFiles(IssuePathsInSerial):
             except:
                 pass
 
+    @property
+    def content_index(self):
+        if not hasattr(self, '_content_index'):
+            self._content_index = ArticlesContentIndex(
+                os.path.join(self.base_xml_path, 'content_index.json'))
+        return self._content_index
+
     @property
     def base_source_xml_files(self):
         return [os.path.join(self.base_source_path, item)
@@ -298,7 +375,14 @@ class WebsiteFiles(object):
     def __init__(self, web_path, acron, issue):
         self.paths = IssuePathsInWebsite(web_path, acron, issue)
 
-    def get_files(self, package_files_path):
+    def get_files(self, package_files_path, skip_files=None):
+        """
+        Copia os arquivos do pacote para o sítio local.
+        Os arquivos de `skip_files` (documentos não modificados) somente são
+        copiados se estiverem ausentes no sítio
+        """
+        skip_files = set(skip_files or [])
+        propagation = fs_utils.FilesPropagation()
         msg = ['\n']
         msg.append('copying files from ' + package_files_path)
 
@@ -317,8 +401,11 @@ class WebsiteFiles(object):
                 continue
             name, ext = os.path.splitext(file_path)
             destination_path = path.get(ext)
+            if f in skip_files and os.path.isfile(
+                    os.path.join(destination_path or path['.img'], f)):
+                continue
             if destination_path is None:
-                shutil.copy(file_path, path['.img'])
+                propagation.propagate(file_path, path['.img'])
                 msg.append('  {} => {}'.format(f, path['.img']))
             elif ext == '.pdf':
                 pdf_filenames = [f]
@@ -326,7 +413,7 @@ class WebsiteFiles(object):
                 if new_pdf_filename:
                     pdf_filenames.append(new_pdf_filename)
                 for pdf_filename in pdf_filenames:
-                    shutil.copy(file_path, destination_path)
+                    propagation.propagate(file_path, destination_path)
                     msg.append('  {} => {}'.format(
                         f, os.path.join(destination_path, pdf_filename)))
             elif ext == '.xml':
@@ -337,8 +424,9 @@ class WebsiteFiles(object):
                     shutil.copy(file_path, destination_path)
                 msg.append('  {} => {}'.format(f, path[ext]))
             else:
-                shutil.copy(file_path, destination_path)
+                propagation.propagate(file_path, destination_path)
                 msg.append('  {} => {}'.format(f, path[ext]))
+        msg.append(str(propagation))
         return '\n'.join(['<p>{}</p>'.format(item) for item in msg])
 
     def _remove_dtd_url_schema(self, xml_file_path):
@@ -1,6 +1,10 @@
 # code: utf-8
 
 import os
+import json
+import time
+import logging
+import threading
 
 from prodtools.utils import fs_utils
 from prodtools import BIN_MARKUP_PATH
@@ -8,17 +12,53 @@ from prodtools import BIN_MARKUP_PATH
 
 JOURNALS_CSV_URL = 'http://static.scielo.org/sps/titles-tab-v2-utf-8.csv'
 
+# segundos
+MIN_REFRESH_INTERVAL = 60 * 60
+
+SNAPSHOT_VERSION = 1
+
+logger = logging.getLogger()
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
 
 class Journals(object):
 
-    def __init__(self, _ws_requester):
+    def __init__(self, _ws_requester, min_refresh_interval=MIN_REFRESH_INTERVAL):
         self.journals_url = JOURNALS_CSV_URL
         self.ws_requester = _ws_requester
+        self.min_refresh_interval = min_refresh_interval
 
     def update_journals_file(self):
-        data = self.ws_requester.request(self.journals_url)
-        if data:
-            fs_utils.write_file(self.downloaded_journals_filename, data)
+        """
+        Atualiza o arquivo CSV somente se foi alterado no servidor
+        (If-None-Match / If-Modified-Since) e se a última verificação foi
+        feita há mais de `min_refresh_interval` segundos
+        Retorna True se o arquivo foi atualizado
+        """
+        downloaded = os.path.isfile(self.downloaded_journals_filename)
+        info = self.download_info if downloaded else {}
+        if downloaded and (
+                time.time() - info.get("checked", 0) < self.min_refresh_interval):
+            return False
+
+        status, data, headers = self.ws_requester.conditional_request(
+            self.journals_url, info.get("etag"), info.get("last_modified"))
+        if status == 304:
+            info["checked"] = time.time()
+            self.download_info = info
+            return False
+        if not data:
+            return False
+        fs_utils.write_file(self.downloaded_journals_filename, data)
+        self.download_info = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "checked": time.time(),
+        }
+        logger.info("Journals: %s updated" % self.downloaded_journals_filename)
+        return True
 
     @property
     def downloaded_journals_filename(self):
@@ -26,3 +66,84 @@ class Journals(object):
         if not os.path.isdir(BIN_MARKUP_PATH):
             os.makedirs(BIN_MARKUP_PATH)
         return downloaded_filename
+
+    @property
+    def download_info_filename(self):
+        return os.path.splitext(self.downloaded_journals_filename)[0] + '.json'
+
+    @property
+    def download_info(self):
+        try:
+            with open(self.download_info_filename) as fp:
+                return json.load(fp)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    @download_info.setter
+    def download_info(self, info):
+        fs_utils.write_file(self.download_info_filename, json.dumps(info))
+
+
+def _source_signature(filename):
+    stat = os.stat(filename)
+    return [stat.st_size, stat.st_mtime]
+
+
+def parse_journals_file(filename):
+    """
+    Retorna as linhas válidas do CSV (colunas já sem espaços) e os índices
+    destas linhas por ISSN e por acrônimo
+    """
+    rows = []
+    by_issn = {}
+    by_acron = {}
+    for row in fs_utils.read_file_lines(filename)[1:]:
+        cols = row.split("\t")
+        if len(cols) >= 10:
+            item = [col.strip() for col in cols]
+            position = len(rows)
+            rows.append(item)
+            for issn in sorted(set(item[1:4])):
+                by_issn.setdefault(issn, []).append(position)
+            by_acron.setdefault(item[5], []).append(position)
+    return {"rows": rows, "issn": by_issn, "acron": by_acron}
+
+
+def snapshot_filename(filename):
+    return os.path.splitext(filename)[0] + '.snapshot.json'
+
+
+def journals_snapshot(filename):
+    """
+    Retorna o conteúdo de `filename` já interpretado e indexado
+    (ver `parse_journals_file`).
+    O resultado é gravado em `snapshot_filename(filename)` e mantido em
+    memória, então somente é gerado novamente quando o CSV muda
+    """
+    if not os.path.isfile(filename):
+        return parse_journals_file(filename)
+    signature = _source_signature(filename)
+    with _snapshots_lock:
+        cached = _snapshots.get(filename)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        snapshot = None
+        try:
+            with open(snapshot_filename(filename)) as fp:
+                snapshot = json.load(fp)
+        except (IOError, OSError, ValueError):
+            pass
+        if (snapshot is None or
+                snapshot.get("version") != SNAPSHOT_VERSION or
+                snapshot.get("source") != signature):
+            snapshot = parse_journals_file(filename)
+            snapshot["version"] = SNAPSHOT_VERSION
+            snapshot["source"] = signature
+            try:
+                with open(snapshot_filename(filename), "w") as fp:
+                    json.dump(snapshot, fp)
+            except (IOError, OSError) as e:
+                logger.info("Journals: unable to write snapshot %s" % e)
+        _snapshots[filename] = (signature, snapshot)
+        return snapshot
@@ -2,6 +2,7 @@
 
 import os
 import shutil
+import logging
 from tempfile import mkdtemp
 
 from prodtools import _
@@ -23,6 +24,9 @@ from prodtools.utils.dbm import dbm_isis
 from prodtools.db import ws_journals
 
 
+logger = logging.getLogger()
+
+
 class BaseManagerCreateDBError(Exception):
     ...
 
@@ -216,6 +220,9 @@ class RegisteredArticle(object):
 
 class ArticleRecords(object):
 
+    __slots__ = (
+        'article', 'article_files', 'i_record', '_metadata', 'common_data')
+
     def __init__(self, article, i_record, article_files):
         self.article = article
         self.article_files = article_files
@@ -840,6 +847,7 @@ class ArticlesManager(object):
         self.articles_aop_status = {}
         self.articles_aop_exclusion_status = {}
         self.articles_conversion_messages = {}
+        self.articles_skipped = []
         self.aop_pdf_replacements = {}
         self.xc_messages = []
         if self.issue_files.is_aop:
@@ -914,6 +922,8 @@ class ArticlesManager(object):
         status = {}
         status['converted'] = [xml_name for xml_name, result in self.articles_conversion_status.items() if result is True]
         status['not converted'] = [xml_name for xml_name, result in self.articles_conversion_status.items() if result is False]
+        if self.articles_skipped:
+            status['skipped'] = list(self.articles_skipped)
         return status
 
     @property
@@ -938,19 +948,36 @@ class ArticlesManager(object):
         status_items['aop'] = self.aop_db_manager.still_aop_items()
         return status_items
 
-    def convert_articles(self, xml_files, articles, i_record, create_windows_base):
+    def convert_articles(self, xml_files, articles, i_record, create_windows_base, content_hashes=None):
+        """
+        Converte os documentos aceitos.
+        `content_hashes` (xml_name: hash do XML + arquivos relacionados),
+        se informado, permite não converter novamente os documentos idênticos
+        aos já registrados com o mesmo registro de fascículo (`i_record`),
+        que são listados em `articles_skipped`
+        """
         self.articles_conversion_status = {}
         self.articles_aop_status = {}
         self.articles_aop_exclusion_status = {}
         self.articles_conversion_messages = {}
         self.articles_orders = {}
+        self.articles_skipped = []
+        content_hashes = content_hashes or {}
+        issue_hash = serial.record_hash(i_record)
         scilista_items = []
+        db_isis = self.base_manager.db_isis
+        launches, executed = db_isis.launches, db_isis.executed
 
         error = False
 
         for xml_name, article in articles.items():
             if not article.marked_to_delete:
                 self.articles_orders[xml_name] = article.order
+                if self.is_registered_content(
+                        xml_name, article, content_hashes.get(xml_name),
+                        issue_hash):
+                    self.skip_article(article, xml_name)
+                    continue
                 self.convert_article(article, i_record, xml_name)
                 if self.articles_conversion_status[xml_name] is False:
                     error = True
@@ -962,11 +989,53 @@ class ArticlesManager(object):
             if converted:
                 if create_windows_base:
                     self.base_manager.generate_windows_version()
-                self.issue_files.save_xml_files(xml_files)
+                self.issue_files.save_xml_files(
+                    [f for f in xml_files
+                     if os.path.basename(f)[:-4] not in self.articles_skipped])
+                self.update_content_index(
+                    articles, content_hashes, issue_hash)
                 scilista_items.extend(self.aop_db_manager.scilista_items)
                 scilista_items.append(self.issue_files.acron_issue_label)
+        logger.info(
+            "convert_articles %s: %s CISIS commands in %s processes",
+            self.issue_files.acron_issue_label,
+            db_isis.executed - executed, db_isis.launches - launches)
         return scilista_items
 
+    def is_registered_content(self, xml_name, article, content_hash,
+                              issue_hash):
+        if content_hash is None:
+            return False
+        article_files = serial.ArticleFiles(
+            self.issue_files, article.order, xml_name)
+        return (
+            os.path.isfile(article_files.id_filename) and
+            self.issue_files.content_index.is_registered(
+                xml_name, content_hash, article.order, issue_hash)
+        )
+
+    def skip_article(self, article, xml_name):
+        self.articles_skipped.append(xml_name)
+        self.articles_conversion_status[xml_name] = None
+        self.articles_conversion_messages[xml_name] = html_reports.p_message(
+            validation_status.STATUS_INFO + ': ' +
+            _('{order}.id was not updated because the document is identical '
+              'to the registered one. ').format(order=article.order))
+
+    def update_content_index(self, articles, content_hashes, issue_hash):
+        content_index = self.issue_files.content_index
+        for xml_name, article in articles.items():
+            if article.marked_to_delete:
+                content_index.remove(xml_name)
+            elif self.articles_conversion_status.get(xml_name) is True:
+                content_hash = content_hashes.get(xml_name)
+                if content_hash is None:
+                    content_index.remove(xml_name)
+                else:
+                    content_index.register(
+                        xml_name, content_hash, article.order, issue_hash)
+        content_index.save()
+
     def finish_conversion(self, i_record):
         self.base_manager.finish_conversion(i_record)
 
@@ -1077,30 +1146,13 @@ class BaseManager(object):
                 )
 
             try:
-                self.db_isis.id_file_to_db(
-                    self.issue_files.id_filename, tmpdb)
-            except Exception as e:
+                # os comandos CISIS são executados em um único processo
+                with self.db_isis.batch():
+                    self.append_id_files(tmpdb)
+            except dbm_isis.CISISRunCommandError as e:
                 raise BaseManagerCreateDBError(
-                    "Unable to append %s to %s: %s" %
-                    (self.issue_files.id_filename, tmpdb, e)
+                    "Unable to create %s: %s" % (tmpdb, e)
                 )
-
-            for f in os.listdir(self.issue_files.id_path):
-                try:
-                    if not f.endswith('.id') or f == "i.id":
-                        continue
-                    file_path = os.path.join(self.issue_files.id_path, f)
-                    if f == '00000.id':
-                        fs_utils.delete_file_or_folder(file_path)
-                        continue
-                    self.db_isis.append_id_file_to_db(
-                        file_path, tmpdb)
-                except Exception as e:
-                    try:
-                        with open(file_path + ".err", "w") as fp:
-                            fp.write(str(e))
-                    except:
-                        pass
             try:
                 shutil.copyfile(tmpdb + ".mst", self.issue_files.base + ".mst")
                 shutil.copyfile(tmpdb + ".xrf", self.issue_files.base + ".xrf")
@@ -1116,6 +1168,33 @@ class BaseManager(object):
                 except:
                     pass
 
+    def append_id_files(self, tmpdb):
+        try:
+            self.db_isis.id_file_to_db(
+                self.issue_files.id_filename, tmpdb)
+        except Exception as e:
+            raise BaseManagerCreateDBError(
+                "Unable to append %s to %s: %s" %
+                (self.issue_files.id_filename, tmpdb, e)
+            )
+
+        for f in os.listdir(self.issue_files.id_path):
+            try:
+                if not f.endswith('.id') or f == "i.id":
+                    continue
+                file_path = os.path.join(self.issue_files.id_path, f)
+                if f == '00000.id':
+                    fs_utils.delete_file_or_folder(file_path)
+                    continue
+                self.db_isis.append_id_file_to_db(
+                    file_path, tmpdb)
+            except Exception as e:
+                try:
+                    with open(file_path + ".err", "w") as fp:
+                        fp.write(str(e))
+                except:
+                    pass
+
     def article_records(self, i_record, article, article_files):
         _article_records = None
         if article.order != '00000':
@@ -1589,34 +1668,45 @@ class IssueAndTitleManager(object):
 class JournalsList(object):
 
     def __init__(self, downloaded_journals_filename):
-        self._journals = {}
-        for row in fs_utils.read_file_lines(downloaded_journals_filename)[1:]:
-            cols = row.split("\t")
-            if len(cols) >= 10:
-                item = [col.strip() for col in cols]
-                j = Journal()
-                j.collection_acron = item[0]
-                j.collection_name = item[4]
-                j.issn_id = item[1]
-                j.p_issn = item[2]
-                j.e_issn = item[3]
-                j.acron = item[5]
-                j.abbrev_title = item[6]
-                j.journal_title = item[7]
-                j.nlm_title = item[8]
-                j.publisher_name = item[9]
-                if len(item) == 12:
-                    j.license = item[11]
-                for issn in list(set([j.issn_id, j.p_issn, j.e_issn])):
-                    if issn not in self._journals.keys():
-                        self._journals[issn] = []
-                    self._journals[issn].append(j)
+        snapshot = ws_journals.journals_snapshot(downloaded_journals_filename)
+        self._rows = snapshot["rows"]
+        self._by_issn = snapshot["issn"]
+        self._by_acron = snapshot["acron"]
+        self._instances = {}
+
+    def _journal(self, position):
+        j = self._instances.get(position)
+        if j is None:
+            item = self._rows[position]
+            j = Journal()
+            j.collection_acron = item[0]
+            j.collection_name = item[4]
+            j.issn_id = item[1]
+            j.p_issn = item[2]
+            j.e_issn = item[3]
+            j.acron = item[5]
+            j.abbrev_title = item[6]
+            j.journal_title = item[7]
+            j.nlm_title = item[8]
+            j.publisher_name = item[9]
+            if len(item) == 12:
+                j.license = item[11]
+            self._instances[position] = j
+        return j
+
+    def get_journals_by_issn(self, issn):
+        return [self._journal(position)
+                for position in self._by_issn.get(issn, [])]
+
+    def get_journals_by_acron(self, acron):
+        return [self._journal(position)
+                for position in self._by_acron.get(acron, [])]
 
     def get_journal_instances(self, p_issn, e_issn, journal_title):
         journal_instances = []
         for issn in [p_issn, e_issn]:
             if issn is not None:
-                for j in self._journals.get(issn, []):
+                for j in self.get_journals_by_issn(issn):
                     journal_instances.append(j)
         return journal_instances
 
@@ -1624,7 +1714,7 @@ class JournalsList(object):
         journal = Journal()
         for issn in [p_issn, e_issn]:
             if issn is not None:
-                for j in self._journals.get(issn, []):
+                for j in self.get_journals_by_issn(issn):
                     journal.acron = update_list(journal.acron, j.acron)
                     journal.p_issn = update_list(journal.p_issn, j.p_issn)
                     journal.e_issn = update_list(journal.e_issn, j.e_issn)
@@ -1641,7 +1731,7 @@ class JournalsList(object):
         journal = Journal()
         for issn in [p_issn, e_issn]:
             if issn is not None:
-                for j in self._journals.get(issn, []):
+                for j in self.get_journals_by_issn(issn):
                     journal = j
                     break
         return journal
@@ -1696,7 +1786,9 @@ class RegisteredIssuesManager(object):
         # quando as bases não estão disponíveis (fora do contexto do XC),
         # é possível ter alguns dados de periódico usando um arquivo CSV
         # disponível em http://static.scielo.org/sps/titles-tab-v2-utf-8.csv
-        wsj = ws_journals.Journals(self.config.app_ws_requester)
+        wsj = ws_journals.Journals(
+            self.config.app_ws_requester,
+            self.config.journals_refresh_interval)
         wsj.update_journals_file()
         self.journals_list = JournalsList(wsj.downloaded_journals_filename)
 
@@ -205,7 +205,10 @@ def main():
         if not os.path.isdir(temp_path):
             os.makedirs(temp_path)
 
-    _ws_journals = ws_journals.Journals(configuration.app_ws_requester)
+    # pedido explicito do usuario: verifica o servidor sem esperar o
+    # intervalo minimo entre as verificacoes
+    _ws_journals = ws_journals.Journals(
+        configuration.app_ws_requester, min_refresh_interval=0)
     _ws_journals.update_journals_file()
 
     journals_collections = journals_by_collection(
@@ -96,8 +96,9 @@ class ArticlesConversion(object):
         },
     }
 
-    def __init__(self, registered_issue_data, pkg, pkg_eval_result, create_windows_base, web_app_path, web_app_site):
+    def __init__(self, registered_issue_data, pkg, pkg_eval_result, create_windows_base, web_app_path, web_app_site, skip_identical_xml=False):
         self.create_windows_base = create_windows_base
+        self.skip_identical_xml = skip_identical_xml
         self.registered_issue_data = registered_issue_data
         self.db = self.registered_issue_data.articles_db_manager
         self.local_web_app_path = web_app_path
@@ -119,7 +120,8 @@ class ArticlesConversion(object):
                 self.pkg_eval_result.accepted_xml_files,
                 self.pkg_eval_result.accepted_articles,
                 self.registered_issue_data.issue_models.record,
-                self.create_windows_base)
+                self.create_windows_base,
+                self.content_hashes)
             scilista_items.extend(self.updated_scilista_items)
             self.conversion_status.update(self.db.db_conversion_status)
 
@@ -129,6 +131,29 @@ class ArticlesConversion(object):
 
         return scilista_items
 
+    @property
+    def content_hashes(self):
+        """
+        Hash do conteúdo (XML + arquivos relacionados) dos documentos aceitos,
+        usado para não converter novamente os documentos idênticos aos
+        registrados, se SKIP_IDENTICAL_XML estiver habilitado
+        """
+        if not self.skip_identical_xml:
+            return None
+        return {
+            name: self.pkg.files[name].content_hash
+            for name in self.pkg_eval_result.accepted_articles.keys()
+            if name in self.pkg.files
+        }
+
+    @property
+    def skipped_files(self):
+        files = []
+        for name in getattr(self.db, 'articles_skipped', None) or []:
+            if name in self.pkg.files:
+                files.extend(self.pkg.files[name].files)
+        return files
+
     def register_pids_and_update_xmls(self, pid_manager: PIDVersionsManager) -> None:
         """Invoca o registro de PIDs em um banco de dados e logo após registra
         os PIDs nos documentos XMLs presentes no pacote."""
@@ -199,7 +224,8 @@ class ArticlesConversion(object):
                 self.local_web_app_path,
                 self.pkg.issue_data.acron,
                 self.pkg.issue_data.issue_label)
-            website_files.get_files(self.pkg.package_folder.path)
+            website_files.get_files(
+                self.pkg.package_folder.path, self.skipped_files)
             # no sítio local substitui o pdf de ex aop com o conteúdo do
             # documento do fascículo regular
             website_files.update_ex_aop_pdf_files(
@@ -439,6 +465,7 @@ class PkgProcessor(object):
     def make_package(self, pkg, GENERATE_PMC=False):
         registered_issue_data, pkg_eval_result = self.evaluate_package(pkg)
         self.report_result(pkg, pkg_eval_result, conversion=None)
+        pkg.release_articles()
         self.make_pmc_package(pkg, GENERATE_PMC)
         if not self.is_xml_generation:
             pkg.zip()
@@ -452,7 +479,7 @@ class PkgProcessor(object):
 
         registered_issue_data, pkg_eval_result = self.evaluate_package(pkg)
 
-        conversion = ArticlesConversion(registered_issue_data, pkg, pkg_eval_result, not self.config.interative_mode, self.config.local_web_app_path, self.config.web_app_site)
+        conversion = ArticlesConversion(registered_issue_data, pkg, pkg_eval_result, not self.config.interative_mode, self.config.local_web_app_path, self.config.web_app_site, self.config.skip_identical_xml)
 
         if self.config.pid_manager_info:
             conversion.new_register_pids_and_update_xmls(
@@ -518,9 +545,11 @@ class PkgProcessor(object):
                 self.config.local_web_app_path,
                 self.config.web_app_site)
 
+        min_articles = self.config.paginated_reports_min_articles
         reports = reports_maker.ReportsMaker(
             pkg, pkg_eval_result, assets_in_report, self.stage,
-            self.xpm_version, conversion)
+            self.xpm_version, conversion,
+            paginated=0 < min_articles <= len(pkg.articles))
 
         if not self.is_xml_generation:
             # gera o relatório, exceto quando está gerando XML a partir do Mkp
@@ -536,7 +565,8 @@ class PkgProcessor(object):
     def make_pmc_package(self, pkg, GENERATE_PMC):
         if GENERATE_PMC:
             logger.info("Make PMC Package")
-            pmc_package_maker = pmc_pkgmaker.PMCPackageMaker(pkg)
+            pmc_package_maker = pmc_pkgmaker.PMCPackageMaker(
+                pkg, self.config.pmc_package_max_workers)
             pmc_package_maker.make_package()
         else:
             logger.info(
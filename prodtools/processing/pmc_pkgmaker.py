@@ -2,11 +2,13 @@
 import logging
 import os
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 
 from prodtools import _
 from prodtools.utils import encoding
 from prodtools.utils import xml_utils
 from prodtools.reports import html_reports
+from prodtools.reports import validation_status
 from prodtools.validations import sps_xml_validators
 from prodtools.processing import xml_versions
 from prodtools.data import workarea
@@ -18,36 +20,88 @@ logger = logging.getLogger()
 
 class PMCPackageMaker(object):
 
-    def __init__(self, pkg):
+    def __init__(self, pkg, max_workers=None):
+        """
+        max_workers (int): número de processos que geram os documentos
+            do pacote PMC; None usa o número de processadores
+        """
         self.wk = pkg.wk
         self.article_items = pkg.articles
         self.outputs = pkg.outputs
         self.pkg_files = pkg.files
+        self.max_workers = max_workers
+
+    def _items(self):
+        for xml_name in sorted(self.article_items.keys()):
+            outputs = self.outputs[xml_name]
+            yield (
+                xml_name,
+                self.pkg_files[xml_name].filename,
+                outputs.report_path,
+                outputs.sgmxml_name,
+                os.path.join(self.wk.pmc_package_path, xml_name + '.xml'),
+            )
 
-    def make_package(self):
-        doit = False
+    def _make_items(self, items):
+        if self.max_workers == 1 or len(items) < 2:
+            # evita recarregar os XML em outros processos
+            return [
+                make_package_item(*item, doc=self.article_items[item[0]])
+                for item in items
+            ]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            # map mantém a ordem dos documentos
+            return list(executor.map(make_package_item, *zip(*items)))
 
+    def make_package(self):
         encoding.display_message('\n')
         encoding.display_message(_('Generating PMC Package'))
-        n = '/' + str(len(self.article_items))
-        index = 0
 
-        for xml_name, doc in self.article_items.items():
-            index += 1
+        items = list(self._items())
+        results = self._make_items(items)
+
+        n = '/' + str(len(items))
+        for index, (xml_name, done, error) in enumerate(results, 1):
             item_label = str(index) + n + ': ' + xml_name
+            if error:
+                item_label += ' ' + error
             encoding.display_message(item_label)
 
-            pmc_filename = os.path.join(
-                self.wk.pmc_package_path, xml_name + '.xml')
-
-            doit = PMCPackageItemMaker(
-                self.outputs[xml_name],
-                self.pkg_files[xml_name],
-                self.article_items[xml_name],
-                pmc_filename).make_package()
-
-        if doit:
+        if any(done for xml_name, done, error in results):
             workarea.MultiDocsPackageFolder(self.wk.pmc_package_path).zip()
+        return results
+
+
+def make_package_item(xml_name, scielo_xml_filepath, report_path,
+                      sgmxml_name, pmc_xml_filepath, doc=None):
+    """
+    Gera o documento do pacote PMC, executado nos processos de
+    `PMCPackageMaker`. Os erros ficam restritos ao documento e são
+    registrados no relatório PMC Style Checker.
+
+    Returns:
+        tuple: (xml_name, gerado (bool), erro)
+    """
+    outputs = workarea.DocumentOutputFiles(
+        xml_name, report_path, sgmxml_name)
+    try:
+        if doc is None:
+            xml, xml_error = xml_utils.load_xml(scielo_xml_filepath)
+            doc = article.Article(xml, xml_name)
+        done = PMCPackageItemMaker(
+            outputs,
+            workarea.DocumentPackageFiles(scielo_xml_filepath),
+            doc,
+            pmc_xml_filepath).make_package()
+    except Exception as e:
+        logger.exception("PMC Package %s: %s", xml_name, e)
+        error = "{}: {}".format(e.__class__.__name__, e)
+        html_reports.save(
+            outputs.pmc_style_report_filename, 'PMC Style Checker',
+            html_reports.p_message(
+                validation_status.STATUS_FATAL_ERROR + ' ' + error))
+        return xml_name, False, error
+    return xml_name, bool(done), None
 
 
 class PMCPackageItemMaker(object):
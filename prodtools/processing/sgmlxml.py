@@ -1,7 +1,10 @@
 # coding=utf-8
+import json
 import logging
 import os
 import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from copy import deepcopy
 
 from prodtools import _
@@ -619,6 +622,7 @@ class SGMLXML2SPSXML(object):
 
     def pack(self):
         blocking_error = None
+        self.blocking_error = None
         pkg = None
         try:
             """
@@ -633,10 +637,128 @@ class SGMLXML2SPSXML(object):
             blocking_error = str(e)
             logger.exception(e)
         finally:
+            self.blocking_error = blocking_error
             self._report(blocking_error, pkg)
         return pkg
 
 
+def find_sgmxml_files(path):
+    """
+    Retorna os arquivos .sgm.xml encontrados em `path` e suas subpastas,
+    em ordem alfabética
+    """
+    found = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        found.extend([
+            os.path.join(dirpath, filename)
+            for filename in filenames
+            if filename.endswith(".sgm.xml")
+        ])
+    return sorted(found)
+
+
+def convert_sgmxml(sgmxml_filepath, acron):
+    """
+    Converte um documento (SGMLXML2SPSXML.pack) e retorna o resultado (dict)
+    Executado nos processos de `SGMLXMLBatch`, por isso nunca levanta exceção
+    """
+    started = time.time()
+    result = {"sgmxml": sgmxml_filepath, "status": "failed"}
+    try:
+        sgmxml2xml = SGMLXML2SPSXML(sgmxml_filepath, acron)
+        result["report"] = (
+            sgmxml2xml.FILES.sgmxml_outputs.mkp2xml_report_filename)
+        pkg = sgmxml2xml.pack()
+        if pkg is None:
+            result["error"] = sgmxml2xml.blocking_error
+        else:
+            result["status"] = "done"
+            result["xml"] = sgmxml2xml.pkg_namer.dest_pkgfiles.basename
+            result["package"] = pkg.package_folder.path
+    except Exception as e:
+        logger.exception(e)
+        result["error"] = str(e)
+    result["seconds"] = round(time.time() - started, 3)
+    return result
+
+
+class SGMLXMLBatch(object):
+    """
+    Converte os arquivos .sgm.xml de uma pasta (e subpastas) em processos
+    paralelos. Grava o resultado de cada documento, à medida que terminam,
+    em `results_filename` (uma linha JSON por documento) e, ao final,
+    o resumo em `summary_filename`
+    """
+
+    def __init__(self, path, acron, max_workers=None,
+                 results_filename=None, summary_filename=None):
+        self.path = path
+        self.acron = acron
+        self.max_workers = max_workers
+        self.results_filename = results_filename or os.path.join(
+            path, "sgmxml_batch_results.jsonl")
+        self.summary_filename = summary_filename or os.path.join(
+            path, "sgmxml_batch_summary.json")
+
+    def _prepare_outputs(self, sgmxml_files):
+        # cria as pastas compartilhadas pelos documentos de um mesmo
+        # markup_xml antes de iniciar os processos
+        for output_path in set([
+                os.path.dirname(os.path.dirname(os.path.dirname(f)))
+                for f in sgmxml_files]):
+            workarea.MultiDocsPackageOuputs(output_path)
+            src_path = os.path.join(output_path, "src")
+            if not os.path.isdir(src_path):
+                os.makedirs(src_path)
+
+    def run(self):
+        started = time.time()
+        sgmxml_files = find_sgmxml_files(self.path)
+        self._prepare_outputs(sgmxml_files)
+        logger.info("SGMLXMLBatch: %i document(s)", len(sgmxml_files))
+        results = []
+        with open(self.results_filename, "w") as fp:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(convert_sgmxml, sgmxml, self.acron): sgmxml
+                    for sgmxml in sgmxml_files
+                }
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # o processo foi interrompido
+                        result = {
+                            "sgmxml": futures[future], "status": "failed",
+                            "error": str(e) or e.__class__.__name__}
+                    logger.info("SGMLXMLBatch: %s", result)
+                    fp.write(json.dumps(result) + "\n")
+                    fp.flush()
+                    results.append(result)
+        summary = self.summary(results, time.time() - started)
+        with open(self.summary_filename, "w") as fp:
+            json.dump(summary, fp, indent=2)
+        return summary
+
+    def summary(self, results, seconds):
+        results = sorted(results, key=lambda r: r["sgmxml"])
+        done = [r for r in results if r["status"] == "done"]
+        return {
+            "path": self.path,
+            "acron": self.acron,
+            "total": len(results),
+            "done": len(done),
+            "failed": len(results) - len(done),
+            "seconds": round(seconds, 3),
+            "documents_per_minute": round(
+                len(results) * 60 / seconds, 2) if seconds else 0,
+            "failures": [
+                {"sgmxml": r["sgmxml"], "error": r.get("error")}
+                for r in results if r["status"] != "done"],
+            "results": self.results_filename,
+        }
+
+
 class ImagesOriginReport(object):
 
     def __init__(self, images_origin, href_replacements, package_path):
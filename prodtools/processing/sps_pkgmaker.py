@@ -2,6 +2,8 @@
 import logging
 import os
 import shutil
+import time
+from copy import deepcopy
 from mimetypes import MimeTypes
 from urllib.request import pathname2url
 
@@ -32,85 +34,192 @@ class SPSXMLContent(xml_utils.SuitableXML):
     - Normalizações para pacotes que foram gerados por quaisquer ferramentas
     """
 
+    STYLED_TAGS = ('article-title', 'trans-title', 'kwd', 'source')
+
+    # remove atributos (elemento ou None para qualquer um, atributo, valor
+    # ou None para qualquer valor não vazio)
+    ATTRIBUTES_TO_REMOVE = (
+        ('comment', 'content-type', 'cited'),
+        ('article-title', '{http://www.w3.org/XML/1998/namespace}lang', None),
+        ('source', '{http://www.w3.org/XML/1998/namespace}lang', None),
+        (None, 'mime-subtype', 'replace'),
+    )
+    ATTRIBUTE_VALUES_TO_REPLACE = (
+        ('dtd-version', '3.0', '1.0'),
+        ('publication-type', 'conf-proc', 'confproc'),
+        ('publication-type', 'legaldoc', 'legal-doc'),
+        ('publication-type', 'web', 'webpage'),
+    )
+    # atributos dos nós alterados por normalize_nodes, além de fix_content
+    NORMALIZED_ATTRIBUTES = frozenset(
+        [attr for tag, attr, value in ATTRIBUTES_TO_REMOVE] +
+        [attr for attr, value, new_value in ATTRIBUTE_VALUES_TO_REPLACE] +
+        ['mimetype', 'contrib-id-type']
+    )
+
     def __init__(self, file_path):
         self.pkg_path = os.path.dirname(file_path)
+        self.timings = []
 
         xml_utils.SuitableXML.__init__(self, file_path)
         self._normalize()
 
     def _normalize(self):
+        """
+        Aplica as normalizações, em sequência, na árvore do XML,
+        sem serializá-la e carregá-la novamente entre as etapas.
+        Registra em `self.timings` a duração de cada etapa
+        """
         if self.xml is None:
             return
-        # remove elementos
-        xml_utils.remove_nodes(
-            self.xml, ".//institution[@content-type='normalized']")
-
-        for tag in ['article-title', 'trans-title', 'kwd', 'source']:
-            self.remove_styles_off_tagged_content(tag)
-
-        # remove atributos
-        self.remove_attributes()
-
-        # altera valor de elementos
-        self.remove_uri_off_contrib_id()
-
-        # altera valores de atributos
-        xml_utils.replace_attribute_values(
-            self.xml,
-            (
-                ('dtd-version', '3.0', '1.0'),
-                ('publication-type', 'conf-proc', 'confproc'),
-                ('publication-type', 'legaldoc', 'legal-doc'),
-                ('publication-type', 'web', 'webpage'),
-            )
+        steps = (
+            # remove elementos
+            ('remove_nodes', self.remove_nodes),
+            ('remove_styles_off_tagged_content',
+             self.remove_styles_off_tagged_content),
+            # remove atributos, altera valores de elementos e de atributos
+            ('normalize_nodes', self.normalize_nodes),
+            ('normalize_references', self.normalize_references),
         )
-        self.replace_mimetypes()
+        self.timings = []
+        for name, step in steps:
+            started = time.time()
+            step()
+            self.timings.append((name, time.time() - started))
+        logger.debug(
+            "SPSXMLContent._normalize %s: %s", self.filename,
+            ", ".join(
+                "{}={:.4f}s".format(name, seconds)
+                for name, seconds in self.timings))
 
-        self.fix_content()
-        self.normalize_references()
+    def remove_nodes(self):
+        xml_utils.remove_nodes(
+            self.xml, ".//institution[@content-type='normalized']")
 
-    def fix_content(self):
+    def normalize_nodes(self):
+        """
+        Percorre a árvore uma única vez aplicando em cada nó:
+        - remove_attributes
+        - remove_uri_off_contrib_id
+        - replace_attribute_values
+        - replace_mimetypes
+        - fix_content
+        """
+        root = self.xml.getroot()
+        # a raiz recebe apenas as correções de fix_content, as demais
+        # normalizações aplicam-se aos seus descendentes (xpath ".//")
+        self.fix_content(root)
+        for node in root.iterdescendants():
+            tag = node.tag
+            keys = isinstance(tag, str) and node.keys()
+            if keys:
+                if not self.NORMALIZED_ATTRIBUTES.isdisjoint(keys):
+                    self.remove_attributes(node)
+                    if tag == 'contrib-id':
+                        self.remove_uri_off_contrib_id(node)
+                    self.replace_attribute_values(node)
+                    self.replace_mimetypes(node)
+                self.fix_attributes(node)
+            text = node.text
+            tail = node.tail
+            if (text is not None and (tag == 'title' or
+                                      text_may_be_fixed(text)) or
+                    tail and text_may_be_fixed(tail)):
+                self.fix_texts(node)
+
+    def fix_content(self, node):
+        """
+        Conserta textos e atributos do nó, com o mesmo resultado que teriam
+        as substituições no XML serializado:
+        - 'http://creativecommons.org' por 'https://creativecommons.org'
+        - ' - </title>' por '</title>' e '<title> ' por '<title>'
+        - ' rid=" ' por ' rid="' e ' id=" ' por ' id="'
+        - '> :' por '>: '
         """
-        Conserta usando funcoes de str (melhorar futuramente)
+        if isinstance(node.tag, str):
+            self.fix_attributes(node)
+        self.fix_texts(node)
+
+    def fix_attributes(self, node):
+        for name, value in node.items():
+            new_value = value
+            if CREATIVECOMMONS in value:
+                new_value = fix_creativecommons(value)
+            if name in ('rid', 'id') and new_value.startswith(' '):
+                new_value = new_value[1:]
+            if new_value != value:
+                node.set(name, new_value)
+
+    def fix_texts(self, node):
+        if not isinstance(node.tag, str):
+            # comentário ou instrução de processamento
+            if node.text:
+                node.text = fix_creativecommons(node.text)
+        elif node.text is not None:
+            is_title = node.tag == 'title'
+            # texto vazio seria serializado como <tag></tag>
+            node.text = self._fix_text(
+                node.text,
+                ends_title=is_title and len(node) == 0,
+                starts_title=is_title and not node.keys(),
+            ) or None
+        if node.tail and node.getparent() is not None:
+            node.tail = self._fix_text(node.tail, self._ends_title(node))
+
+    def _ends_title(self, node):
         """
-        content = self.content
-        content = content.replace(
-            'http://creativecommons.org', 'https://creativecommons.org')
-        content = content.replace(
-            ' - </title>', '</title>').replace('<title> ', '<title>')
-        content = content.replace(' rid=" ', ' rid="')
-        content = content.replace(' id=" ', ' id="')
-        content = content.replace('> :', '>: ')
-        self.content = content
+        Indica se o `tail` de `node` é o final do conteúdo de `title`
+        """
+        parent = node.getparent()
+        return (parent is not None and parent.tag == 'title' and
+                node.getnext() is None)
 
-    def remove_uri_off_contrib_id(self):
-        if self.xml.find(".//contrib-id") is None:
+    def _fix_text(self, text, ends_title=False, starts_title=False):
+        """
+        Aplica em `text` (texto após um `>`) as substituições de fix_content
+        """
+        if not text:
+            return text
+        text = fix_creativecommons(text)
+        if ends_title and text.endswith(' - '):
+            text = text[:-3]
+        if starts_title and text.startswith(' '):
+            text = text[1:]
+        if text.startswith(' :'):
+            text = ': ' + text[2:]
+        return text
+
+    def remove_uri_off_contrib_id(self, node=None):
+        if node is None:
+            for node in self.xml.findall(".//contrib-id"):
+                self.remove_uri_off_contrib_id(node)
             return
         for contrib_id_type, uri in attributes.CONTRIB_ID_URLS.items():
-            xpath = ".//contrib-id[@contrib-id-type='{}']".format(
-                contrib_id_type)
-            for contrib_id in self.xml.findall(xpath):
-                if contrib_id.text and uri in contrib_id.text:
-                    contrib_id.text = contrib_id.text.replace(uri, "")
+            if node.get('contrib-id-type') != contrib_id_type:
+                continue
+            if node.text and uri in node.text:
+                node.text = node.text.replace(uri, "")
 
-    def remove_attributes(self):
+    def remove_attributes(self, node):
         """
         Remove atributos como:
         - @xml:lang de article-title e source
         - @content-type de comment
         """
-        xpath_and_attr = (
-            (".//comment[@content-type='cited']", 'content-type'),
-            (".//article-title[@{http://www.w3.org/XML/1998/namespace}lang]",
-             '{http://www.w3.org/XML/1998/namespace}lang'),
-            (".//source[@{http://www.w3.org/XML/1998/namespace}lang]",
-             '{http://www.w3.org/XML/1998/namespace}lang'),
-            (".//*[@mime-subtype='replace']", 'mime-subtype'),
-        )
-        for xpath, attr in xpath_and_attr:
-            xml_utils.remove_attribute(self.xml, xpath, attr)
+        for tag, attr, value in self.ATTRIBUTES_TO_REMOVE:
+            if tag is not None and node.tag != tag:
+                continue
+            if value is not None and node.get(attr) != value:
+                continue
+            if node.get(attr):
+                node.attrib.pop(attr)
 
-    def remove_styles_off_tagged_content(self, tag):
+    def replace_attribute_values(self, node):
+        for attr, value, new_value in self.ATTRIBUTE_VALUES_TO_REPLACE:
+            if node.get(attr) == value:
+                node.set(attr, new_value)
+
+    def remove_styles_off_tagged_content(self, *tags):
         """
         As tags de estilo não devem ser aplicadas no conteúdo inteiro de
         certos elementos. As tags de estilo somente podem destacar partes do
@@ -119,10 +228,14 @@ class SPSXMLContent(xml_utils.SuitableXML):
         <source><bold>texto</bold> texto texto</source> - aceitável
         """
         STYLES = ("bold", )
-        nodes = []
-        for style in STYLES:
-            nodes.extend(self.xml.xpath(".//{}[.//{}]".format(tag, style)))
-        for node in set(nodes):
+        nodes = [
+            node
+            for node in self.xml.getroot().iterdescendants(
+                *(tags or self.STYLED_TAGS))
+            if any(node.find(".//{}".format(style)) is not None
+                   for style in STYLES)
+        ]
+        for node in nodes:
             xml_utils.merge_siblings_style_tags_content(node, STYLES)
             xml_utils.remove_styles_off_tagged_content(node, STYLES)
 
@@ -131,31 +244,45 @@ class SPSXMLContent(xml_utils.SuitableXML):
             broken_ref = BrokenRef(ref)
             broken_ref.normalize()
 
-    def replace_mimetypes(self):
-        for node in self.xml.findall(".//*[@mimetype]"):
-            asset_filename = node.get("mimetype")
-            if asset_filename.startswith('replace'):
-                asset_filename = asset_filename.replace("replace", "")
-                file_path = os.path.join(self.pkg_path, asset_filename)
-                if os.path.isfile(file_path):
-                    guessed_type = mime.guessed_type(file_path)
-                else:
-                    try:
-                        location = pathname2url(file_path)
-                        guessed_type = mime.guessed_type(location)
-                    except Exception:
-                        guessed_type = None
-                if guessed_type and "/" in guessed_type:
-                    m, ms = guessed_type.split("/")
-                    node.set("mimetype", m)
-                    node.set("mime-subtype", ms)
+    def replace_mimetypes(self, node):
+        asset_filename = node.get("mimetype")
+        if asset_filename and asset_filename.startswith('replace'):
+            asset_filename = asset_filename.replace("replace", "")
+            file_path = os.path.join(self.pkg_path, asset_filename)
+            if os.path.isfile(file_path):
+                guessed_type = mime.guessed_type(file_path)
+            else:
+                try:
+                    location = pathname2url(file_path)
+                    guessed_type = mime.guessed_type(location)
+                except Exception:
+                    guessed_type = None
+            if guessed_type and "/" in guessed_type:
+                m, ms = guessed_type.split("/")
+                node.set("mimetype", m)
+                node.set("mime-subtype", ms)
+
+
+CREATIVECOMMONS = 'http://creativecommons.org'
+
+
+def fix_creativecommons(text):
+    return text.replace(CREATIVECOMMONS, 'https://creativecommons.org')
+
+
+def text_may_be_fixed(text):
+    """
+    Indica se `text` (texto após um `>`) pode ser alterado por
+    `SPSXMLContent.fix_content`
+    """
+    return (not text or text[:2] == ' :' or text[-3:] == ' - ' or
+            CREATIVECOMMONS in text)
 
 
 class BrokenRef(object):
 
     def __init__(self, tree):
         self.tree = tree
-        self.content = xml_utils.tostring(self.tree)
 
     def normalize(self):
         self.insert_label_text_in_mixed_citation_text()
@@ -180,12 +307,9 @@ class BrokenRef(object):
                 return
             if chapter_title is None and article_title is not None:
                 article_title.tag = "chapter-title"
-                article_title = book.find(".//article-title")
-                chapter_title = book.find(".//chapter-title")
+                chapter_title = article_title
             if source is None and chapter_title is not None:
                 chapter_title.tag = "source"
-                chapter_title = book.find(".//chapter-title")
-                source = book.find(".//source")
 
     def insert_ext_link_elements_in_mixed_citation(self):
         """
@@ -203,14 +327,47 @@ class BrokenRef(object):
                  if e.text]
         if not links:
             return
-        mixed_citation_text = xml_utils.tostring(mixed_citation)
+        inserted = set()
         for link in links:
-            mixed_citation_text = mixed_citation_text.replace(
-                link.text, xml_utils.tostring(link)
-            )
-        new_mixed_citation = xml_utils.etree.fromstring(mixed_citation_text)
-        parent = mixed_citation.getparent()
-        parent.replace(mixed_citation, new_mixed_citation)
+            if "&" in link.text or "<" in link.text or ">" in link.text:
+                # estes caracteres são representados por entidades no XML,
+                # então o texto do link não é encontrado como tal
+                continue
+            self._insert_ext_link(mixed_citation, link, inserted)
+        # mixed-citation era substituído por um novo elemento, sem `tail`
+        mixed_citation.tail = None
+
+    def _insert_ext_link(self, node, link, inserted):
+        """
+        Substitui, nos textos de `node` e de seus descendentes, as ocorrências
+        do texto de `link` por cópias de `link`, exceto nas cópias inseridas
+        anteriormente (`inserted`)
+        """
+        if not isinstance(node.tag, str):
+            # comentário ou instrução de processamento
+            if node.text and link.text in node.text:
+                node.text = node.text.replace(
+                    link.text, xml_utils.tostring(link))
+            return
+        if node.text and link.text in node.text:
+            parts = node.text.split(link.text)
+            node.text = parts[0] or None
+            for i, part in enumerate(parts[1:]):
+                node.insert(i, self._ext_link_copy(link, part, inserted))
+        for child in list(node):
+            if child not in inserted:
+                self._insert_ext_link(child, link, inserted)
+            if child.tail and link.text in child.tail:
+                parts = child.tail.split(link.text)
+                child.tail = parts[0] or None
+                for part in reversed(parts[1:]):
+                    child.addnext(self._ext_link_copy(link, part, inserted))
+
+    def _ext_link_copy(self, link, tail, inserted):
+        new_link = deepcopy(link)
+        new_link.tail = tail or None
+        inserted.add(new_link)
+        return new_link
 
     def insert_label_text_in_mixed_citation_text(self):
         """
@@ -259,7 +416,8 @@ class BrokenRef(object):
 
 class PackageMaker(object):
 
-    def __init__(self, pkg_path, output_path, optimise=False, package_name=None):
+    def __init__(self, pkg_path, output_path, optimise=False, package_name=None,
+                 max_loaded_articles=None):
         """
         Reempacota os arquivos de pacote SP,
         padronizando-os e/ou otimizando-os.
@@ -275,8 +433,13 @@ class PackageMaker(object):
 
             optimise (bool): gera imagens otimizadas para web
 
+            max_loaded_articles (int): limita a quantidade de documentos
+                mantidos em memória pelo pacote gerado (ver
+                `package.SPPackage`)
+
         """
         self.optimise = optimise
+        self.max_loaded_articles = max_loaded_articles
 
         # origem da pasta que pode conter 1 ou mais XML
         self.source_folder = workarea.MultiDocsPackageFolder(pkg_path)
@@ -442,5 +605,6 @@ class PackageMaker(object):
         print("Packed:", self.destination_path)
         pkg = package.SPPackage(self.destination_path,
                                 self.output_folder.output_path, _xml_names,
-                                sgmxml_name, optimised=self.optimise)
+                                sgmxml_name, optimised=self.optimise,
+                                max_loaded_articles=self.max_loaded_articles)
         return pkg
@@ -5,13 +5,27 @@ from prodtools import DTD_AND_XSL_PATH
 
 import configparser
 
-XPM_FILES = configparser.ConfigParser()
-XPM_FILES.read(os.path.join(DTD_AND_XSL_PATH, 'versions.ini'))
 
+_XPM_FILES = []
 
-DEFAULT_VERSION = XPM_FILES.sections()[0]
 
-valid_dtd_items = XPM_FILES.sections()
+def get_xpm_files():
+    """
+    Lê `versions.ini` no primeiro uso (e não ao importar o módulo)
+    """
+    if not _XPM_FILES:
+        xpm_files = configparser.ConfigParser()
+        xpm_files.read(os.path.join(DTD_AND_XSL_PATH, 'versions.ini'))
+        _XPM_FILES.append(xpm_files)
+    return _XPM_FILES[0]
+
+
+def default_version():
+    return get_xpm_files().sections()[0]
+
+
+def valid_dtd_items():
+    return get_xpm_files().sections()
 
 _SPS_VERSIONS = (
     ('None', [
@@ -86,15 +100,16 @@ def xsl_getter(sps_version):
     print("SPS version: %s" % sps_version)
     dtd_version = get_dtd_version(sps_version)
     return os.path.join(
-        DTD_AND_XSL_PATH, XPM_FILES[dtd_version]["folder"],
+        DTD_AND_XSL_PATH, get_xpm_files()[dtd_version]["folder"],
         'xsl', 'sgml2xml', 'sgml2xml.xsl'
     )
 
 
 def dtd_locations():
     locations = {}
-    for version in XPM_FILES.sections():
-        dtd_info = XPM_FILES[version]
+    xpm_files = get_xpm_files()
+    for version in xpm_files.sections():
+        dtd_info = xpm_files[version]
         dtd_id = dtd_info['dtd_id']
         if dtd_id not in locations.keys():
             locations[dtd_id] = [
@@ -113,10 +128,11 @@ class DTDFiles(object):
     def __init__(self, database_name, version):
         self.database_name = database_name
         self.version = version
-        if version in XPM_FILES:
-            self.data = XPM_FILES[version]
+        xpm_files = get_xpm_files()
+        if version in xpm_files:
+            self.data = xpm_files[version]
         else:
-            self.data = XPM_FILES[DEFAULT_VERSION]
+            self.data = xpm_files[default_version()]
 
     @property
     def real_dtd_path(self):
@@ -1,6 +1,8 @@
 # coding=utf-8
 
 import os
+import shutil
+import tempfile
 import webbrowser
 from datetime import datetime
 
@@ -14,6 +16,8 @@ from prodtools.reports import validation_status
 
 ENABLE_COMMENTS = False
 MathJax_PATH = './MathJax'
+# tamanho a partir do qual as tabelas em construção vão para o disco
+SPOOL_MAX_SIZE = 1024 * 1024
 
 
 class TabbedReport(object):
@@ -39,6 +43,25 @@ class TabbedReport(object):
                 content += tab_block(tab_id, c, style)
         return content
 
+    def write(self, writer, transform=None):
+        """
+        Grava em `writer` (ReportWriter) o mesmo conteúdo de
+        `report_content`, uma aba por vez.
+        O conteúdo da aba pode ser texto, ao qual é aplicado `transform`,
+        ou um objeto que se grava (ex.: HideAndShowBlocksReport)
+        """
+        writer.write(tabs_items([(tab_id, self.labels[tab_id]) for tab_id in self.tabs if self.tabbed_content.get(tab_id) is not None], self.pre_selected))
+        for tab_id in self.tabs:
+            c = self.tabbed_content.get(tab_id)
+            if c is not None:
+                style = self.style_selected if tab_id == self.pre_selected else self.style_not_selected
+                writer.write('<div id="tab-content-' + tab_id + '" class="' + style + '">')
+                if hasattr(c, 'write'):
+                    c.write(writer)
+                else:
+                    writer.write(c if transform is None else transform(c))
+                writer.write('</div>')
+
 
 class HideAndShowBlocksReport(object):
 
@@ -51,16 +74,21 @@ class HideAndShowBlocksReport(object):
         self.widths = widths
 
     @property
-    def content(self):
-        items = []
-        for i, data in zip(range(len(self.data)), self.data):
+    def items(self):
+        for i, data in enumerate(self.data):
             values, block = data
             values.append(block.links)
-            items.append(label_values(self.labels, values))
+            yield label_values(self.labels, values)
             if self.pdf_items is not None:
-                items.append({'pdf': self.pdf_items[i]})
-            items.append({'hidden': block.block})
-        return sheet(self.labels, items, table_style='reports-sheet', html_cell_content=self.html_cell_content, widths=self.widths)
+                yield {'pdf': self.pdf_items[i]}
+            yield {'hidden': block.block}
+
+    @property
+    def content(self):
+        return sheet(self.labels, list(self.items), table_style='reports-sheet', html_cell_content=self.html_cell_content, widths=self.widths)
+
+    def write(self, writer):
+        writer.write_sheet(self.labels, self.items, table_style='reports-sheet', html_cell_content=self.html_cell_content, widths=self.widths)
 
 
 class HideAndShowBlockItem(object):
@@ -84,16 +112,39 @@ class HideAndShowBlockItem(object):
     def block(self):
         return block_element(self.block_id, self.block_content, self.block_style, self.block_parent_id)
 
+    def page_link(self, href):
+        """
+        Link para o bloco publicado em outra página (ver `page_section`)
+        """
+        _link = link(href + '#' + self.block_id, self.label.replace(' ', '&#160;'))
+        if self.status != '':
+            _link += tag('span', self.status, 'smaller')
+        return tag('p', _link, 'report-link-' + self.block_style)
+
+    @property
+    def page_section(self):
+        return '<a name="' + self.block_id + '"/>' + tag('h2', self.label) + self.block_content
+
 
 class HideAndShowBlock(object):
 
     def __init__(self, block_parent_id, block_items):
+        self.block_parent_id = block_parent_id
+        self.items = block_items
         self.links = '<a name="' + block_parent_id + '"/>'
         self.block = ''
         for item in block_items:
             self.links += item.link
             self.block += item.block
 
+    def page_links(self, href):
+        return '<a name="' + self.block_parent_id + '"/>' + ''.join(
+            [item.page_link(href) for item in self.items])
+
+    @property
+    def page_content(self):
+        return ''.join([item.page_section for item in self.items])
+
 
 def report_date():
     procdate = datetime.now().isoformat()
@@ -228,16 +279,17 @@ def report_title(titles):
     return ''.join([tag('h1', item) for item in titles])
 
 
-def html(title, body):
-    has_math = '<mml:math' in body or ':math' in body
+def has_math_content(content):
+    return '<mml:math' in content or ':math' in content
+
+
+def html_header(title, has_math=False):
     s = ''
     s += '<html>'
     s += '<head>'
 
     if title is None:
         title = ''
-    if body is None:
-        body = ''
     if isinstance(title, list):
         s += '<meta charset="utf-8"/><title>' + ' - '.join(title) + '</title>'
     else:
@@ -249,20 +301,98 @@ def html(title, body):
     s += '<body>'
     s += report_date()
     s += report_title(title)
-    s += body
-    s += js_styles(has_math)
-    s += '</body>'
-    s += '</html>'
-
     return s
 
 
-def sheet(table_header, table_data, table_style='sheet', row_style=None, colums_styles={}, html_cell_content=[], widths=None):
+def html_footer(has_math=False):
+    return js_styles(has_math) + '</body>' + '</html>'
+
+
+def html(title, body):
+    if body is None:
+        body = ''
+    has_math = has_math_content(body)
+    return html_header(title, has_math) + body + html_footer(has_math)
+
+
+class ReportWriter(object):
+    """
+    Grava o relatório HTML diretamente no arquivo, à medida que as seções
+    são produzidas, sem montar o documento inteiro em memória.
+    O resultado é igual ao de `html(title, body)`, desde que `has_math`
+    seja informado (ver `has_math_content`)
+
+        with ReportWriter(filename, title) as writer:
+            writer.write(section)
+            writer.write_sheet(header, rows)
+    """
+
+    def __init__(self, filename, title, has_math=False):
+        self.filename = filename
+        self.title = title
+        self.has_math = has_math
+        self.size = 0
+        self._fp = None
+
+    def __enter__(self):
+        d = os.path.dirname(self.filename)
+        if d and not os.path.isdir(d):
+            os.makedirs(d)
+        self._fp = open(self.filename, 'w', encoding='utf-8')
+        self.write(html_header(self.title, self.has_math))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.write(html_footer(self.has_math))
+        finally:
+            self._fp.close()
+            self._fp = None
+
+    def write(self, content):
+        if content:
+            self._fp.write(content)
+            self.size += len(content)
+
+    def write_sheet(self, table_header, table_data, table_style='sheet', row_style=None, colums_styles={}, html_cell_content=[], widths=None):
+        """
+        Equivale a `write(sheet(...))`, mas `table_data` pode ser um
+        iterador e as linhas não são mantidas em memória
+        """
+        table_header = sheet_header(table_header, html_cell_content)
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='w+', encoding='utf-8') as spool:
+            # assim como em `tag`, o elemento externo é 'div' se a tabela
+            # contém '</p>'
+            has_p = False
+            size = 0
+            try:
+                for piece in iter_sheet(table_header, table_data, table_style, row_style, colums_styles, html_cell_content, widths):
+                    has_p = has_p or '</p>' in piece
+                    size += len(piece)
+                    spool.write(piece)
+            except Exception as e:
+                encoding.report_exception('html_reports.ReportWriter.write_sheet()', e, (table_header, ))
+                return
+            tag_name = 'div' if has_p else 'p'
+            spool.seek(0)
+            self.write('<' + tag_name + '>')
+            shutil.copyfileobj(spool, self._fp)
+            self.size += size
+            self.write('</' + tag_name + '>')
+
+
+def sheet_header(table_header, html_cell_content=[]):
     if ENABLE_COMMENTS is True:
         html_cell_content.append(_('why it is not a valid message?'))
     else:
         if _('why it is not a valid message?') in table_header:
             table_header = [item for item in table_header if item != _('why it is not a valid message?')]
+    return table_header
+
+
+def sheet(table_header, table_data, table_style='sheet', row_style=None, colums_styles={}, html_cell_content=[], widths=None):
+    table_header = sheet_header(table_header, html_cell_content)
     r = ''
     try:
         r = sheet_build(table_header, table_data, table_style, row_style, colums_styles, html_cell_content, widths)
@@ -324,14 +454,35 @@ def sheet_column_value(data, width, is_html_format, _color_text=False):
 
 
 def sheet_build(table_header, table_rows_data, table_style='sheet', style4row=None, columns_styles={}, html_cell_content=[], widths=None):
-    _color_text = (table_style == 'sheet')
+    return tag('p', ''.join(iter_sheet(table_header, table_rows_data, table_style, style4row, columns_styles, html_cell_content, widths)))
+
+
+def iter_sheet(table_header, table_rows_data, table_style='sheet', style4row=None, columns_styles={}, html_cell_content=[], widths=None):
+    """
+    Produz, em partes, a tabela de `sheet_build` (sem o elemento externo)
+    `table_rows_data` pode ser um iterador
+    """
     th = ''.join([tag('th', label, 'th') for label in table_header])
-    if len(table_rows_data) == 0:
+    yield '<table' + attr('class', table_style) + '>'
+    yield tag('thead', tag('tr', th))
+    yield '<tbody>'
+    empty = True
+    for row in iter_sheet_rows(table_header, table_rows_data, table_style, style4row, columns_styles, html_cell_content, widths):
+        empty = False
+        yield row
+    if empty:
         table_rows_data = [{table_header[-1]: '-' for item in table_header}]
+        for row in iter_sheet_rows(table_header, table_rows_data, table_style, style4row, columns_styles, html_cell_content, widths):
+            yield row
+    yield '</tbody>'
+    yield '</table>'
+
+
+def iter_sheet_rows(table_header, table_rows_data, table_style='sheet', style4row=None, columns_styles={}, html_cell_content=[], widths=None):
+    _color_text = (table_style == 'sheet')
     if widths is None:
         w = str(int(float(100) / len(table_header)))
         widths = {label: w for label in table_header}
-    rows = ''
     for row_data in table_rows_data:
         if len(row_data) == 1 and len(table_header) > 1:
             key = list(row_data.keys())[0]
@@ -340,7 +491,7 @@ def sheet_build(table_header, table_rows_data, table_style='sheet', style4row=No
             else:
                 columns = '<td colspan="' + str(len(table_header)) + '">' + row_data.get(key) + '</td>'
         elif len(table_header) <= len(row_data):
-            columns = ''
+            columns = []
             for label in table_header:
                 col_style = sheet_col_style(label, columns_styles)
 
@@ -351,10 +502,10 @@ def sheet_build(table_header, table_rows_data, table_style='sheet', style4row=No
                         col_value = ' - '
                 else:
                     col_value = sheet_column_value(row_data.get(label), widths[label], (label in html_cell_content), _color_text)
-                columns += sheet_column(col_value, style=col_style, width=widths[label])
+                columns.append(sheet_column(col_value, style=col_style, width=widths[label]))
+            columns = ''.join(columns)
         row_style = sheet_row_style(table_header, style4row, columns)
-        rows += sheet_row(columns, row_style)
-    return tag('p', tag('table', tag('thead', tag('tr', th)) + tag('tbody', rows), table_style))
+        yield sheet_row(columns, row_style)
 
 
 def break_words(value, width=40):
@@ -474,11 +625,10 @@ def format_html_data(value, width=70):
 
 
 def save(filename, title, body, teste=None):
-    r = html(title, body)
-    d = os.path.dirname(filename)
-    if not os.path.isdir(d):
-        os.makedirs(d)
-    fs_utils.write_file(filename, r)
+    if body is None:
+        body = ''
+    with ReportWriter(filename, title, has_math_content(body)) as writer:
+        writer.write(body)
 
 
 def get_message_style(value, default=''):
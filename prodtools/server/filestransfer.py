@@ -1,39 +1,105 @@
 # coding=utf-8
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from prodtools.utils import remote_server
 
 
+logger = logging.getLogger()
+
+
+class TransferSummary(object):
+    """
+    Resultado das transferências de um pacote (fascículo) para os servidores
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.results = []
+        self.seconds = 0
+
+    @property
+    def failures(self):
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def ok(self):
+        return len(self.failures) == 0
+
+    @property
+    def bytes(self):
+        return sum([result.bytes for result in self.results])
+
+    def __str__(self):
+        lines = [
+            "{}: {} transfers, {} failures, {} bytes, {:.2f}s".format(
+                self.name, len(self.results), len(self.failures),
+                self.bytes, self.seconds)
+        ]
+        lines.extend([str(result) for result in self.results])
+        return '\n'.join(lines)
+
+
 class SciELOWebFilesTransfer(object):
 
     def __init__(self, config, _logger=None):
         self.config = config
+        self.logger = _logger or logger
         if self.config.is_enabled_transference:
             self.servers = [remote_server.RemoteServer(server, self.config.transference_user, _logger) for server in self.config.transference_servers]
 
+    def _transfer(self, name, tasks):
+        """
+        Executa as transferências (server, source, dest, copy_folder)
+        simultaneamente, limitadas a `transference_max_workers`
+        """
+        summary = TransferSummary(name)
+        started = time.time()
+        if tasks:
+            max_workers = min(
+                self.config.transference_max_workers, len(tasks))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        server.transfer, source, dest, copy_folder,
+                        self.config.transference_retries)
+                    for server, source, dest, copy_folder in tasks
+                ]
+                summary.results = [future.result() for future in futures]
+        summary.seconds = time.time() - started
+        if summary.ok:
+            self.logger.info(str(summary))
+        else:
+            self.logger.error(str(summary))
+        return summary
+
     def transfer_files(self, acron, issue_id, folders):
         if self.config.is_enabled_transference:
             issue_id_path = acron + '/' + issue_id
+            tasks = []
             for server in self.servers:
                 for folder in folders:
                     dest_path = self.config.remote_web_app_path + folder + issue_id_path
                     source_path = self.config.local_web_app_path + folder + issue_id_path
-                    server.run_remote_mkdirs(dest_path)
-                    server.run_rsync(source_path, dest_path)
+                    tasks.append((server, source_path, dest_path, False))
+            return self._transfer(acron + ' ' + issue_id, tasks)
 
     def transfer_website_files(self, acron, issue_id):
         folders = ['/htdocs/img/revistas/', '/bases/pdf/', '/bases/xml/']
-        self.transfer_files(acron, issue_id, folders)
+        return self.transfer_files(acron, issue_id, folders)
 
     def transfer_report_files(self, acron, issue_id):
         folders = ['/htdocs/reports/']
-        self.transfer_files(acron, issue_id, folders)
+        return self.transfer_files(acron, issue_id, folders)
 
     def transfer_website_bases(self):
         if self.config.is_enabled_transference:
             dest_path = self.config.remote_web_app_path + '/bases/'
             folders = ['artigo', 'issue', 'newissue', 'title']
+            tasks = []
             for server in self.servers:
-                server.run_remote_mkdirs(dest_path)
                 for folder in folders:
                     source_path = self.config.local_web_app_path + '/bases/' + folder
-                    server.run_scp(source_path, dest_path)
+                    tasks.append((server, source_path, dest_path, True))
+            return self._transfer('bases', tasks)
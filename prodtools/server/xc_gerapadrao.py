@@ -1,5 +1,7 @@
 # coding=utf-8
 import os
+import json
+import time
 import logging
 
 from datetime import datetime
@@ -10,13 +12,30 @@ from prodtools.server import filestransfer
 
 logger = logging.getLogger()
 
+# segundos
+LOCK_MAX_AGE = 12 * 60 * 60
+MAX_RUNS_RECORDED = 50
+
 
 class GeraPadraoStatusManager:
+    """
+    Situação do GeraPadrao (`permission_file`) e bloqueio entre processos
+    (`fs_utils.FileLock`)
+    """
 
-    def __init__(self, permission_file):
+    def __init__(self, permission_file, lock_max_age=LOCK_MAX_AGE):
         self.permission_file = permission_file
+        self.lock = fs_utils.FileLock(permission_file + '.lock', lock_max_age)
         self._status = None
 
+    @property
+    def lock_file(self):
+        return self.lock.lock_file
+
+    @property
+    def lock_owner(self):
+        return self.lock.owner
+
     @property
     def status(self):
         _status = None
@@ -32,6 +51,19 @@ class GeraPadraoStatusManager:
         with open(self.permission_file, 'w') as fp:
             fp.write(value)
 
+    def acquire(self):
+        """
+        Retorna True se obteve o bloqueio
+        """
+        if not self.lock.acquire():
+            return False
+        self.status = "running"
+        return True
+
+    def release(self):
+        self.status = "FINISHED"
+        self.lock.release()
+
     def block(self):
         self.status = "running"
 
@@ -40,6 +72,8 @@ class GeraPadraoStatusManager:
 
     @property
     def is_free(self):
+        if os.path.isfile(self.lock_file):
+            return self.lock.is_free
         return self.status == 'FINISHED' or self.status != 'running'
 
 
@@ -49,19 +83,46 @@ class Scilista:
         self.scilista_file = scilista_file
 
     def consume_collection_scilista(self):
+        """
+        Renomeia (operação atômica) a scilista antes de lê-la, para que os
+        itens acrescentados durante a leitura fiquem para a próxima vez
+        """
+        consuming = self.scilista_file + '.consuming'
         try:
-            content = fs_utils.read_file(self.scilista_file)
+            if not os.path.isfile(consuming):
+                os.rename(self.scilista_file, consuming)
+            content = fs_utils.read_file(consuming) or ''
         except (IOError, OSError, ValueError, TypeError):
             content = ''
         else:
-            fs_utils.delete_file_or_folder(self.scilista_file)
+            fs_utils.delete_file_or_folder(consuming)
         return content
 
+    def restore(self, scilista_content):
+        """
+        Devolve itens não processados para a scilista
+        """
+        if scilista_content.strip():
+            fs_utils.append_file(self.scilista_file, scilista_content.strip())
+
+
+def coalesce_scilista(scilista_content):
+    """
+    Retorna os itens ("acron issue" ou "acron issue del") sem repetição,
+    na ordem da primeira ocorrência; para o mesmo fascículo prevalece a
+    última ação
+    """
+    items = {}
+    for row in scilista_content.split('\n'):
+        parts = row.split()
+        if len(parts) < 2:
+            continue
+        items[tuple(parts[:2])] = ' '.join(parts)
+    return list(items.values())
+
 
 def sort_scilista(scilista_content):
-    scilista_items = list(set([item.strip()
-                               for item in scilista_content.split('\n')
-                               if len(item) if ' ' in item]))
+    scilista_items = coalesce_scilista(scilista_content)
     scilista_items = ([item
                        for item in scilista_items
                        if item.endswith('pr')] +
@@ -71,6 +132,90 @@ def sort_scilista(scilista_content):
     return '\n'.join(scilista_items) + '\n'
 
 
+class GeraPadraoState(object):
+    """
+    Registra, para cada fascículo, a "assinatura" da base (nome, tamanho e
+    data dos arquivos de <serial>/<acron>/<issue>/base) na última execução
+    bem sucedida, e a duração e as quantidades de cada execução
+    """
+
+    def __init__(self, state_file, serial_path):
+        self.state_file = state_file
+        self.serial_path = serial_path
+        self._data = self._read()
+
+    def _read(self):
+        try:
+            with open(self.state_file) as fp:
+                data = json.load(fp)
+        except (IOError, OSError, ValueError, TypeError):
+            data = {}
+        data.setdefault("built", {})
+        data.setdefault("runs", [])
+        return data
+
+    def save(self):
+        temp = self.state_file + '.tmp'
+        with open(temp, 'w') as fp:
+            json.dump(self._data, fp, indent=1, sort_keys=True)
+        os.replace(temp, self.state_file)
+
+    @property
+    def runs(self):
+        return self._data["runs"]
+
+    def signature(self, item):
+        acron, issue = item.split()[:2]
+        base_path = os.path.join(self.serial_path or '', acron, issue, 'base')
+        if not os.path.isdir(base_path):
+            return None
+        signature = []
+        for name in sorted(os.listdir(base_path)):
+            stat = os.stat(os.path.join(base_path, name))
+            signature.append([name, stat.st_size, stat.st_mtime])
+        return signature
+
+    def is_unchanged(self, item):
+        if item.endswith(' del'):
+            return False
+        signature = self.signature(item)
+        return signature is not None and self._data["built"].get(item) == signature
+
+    def select(self, scilista_content):
+        """
+        Retorna (itens a processar, itens sem alteração desde a última
+        execução bem sucedida)
+        """
+        selected = []
+        skipped = []
+        for item in coalesce_scilista(scilista_content):
+            if self.is_unchanged(item):
+                skipped.append(item)
+            else:
+                selected.append(item)
+        return selected, skipped
+
+    def register_success(self, items):
+        for item in items:
+            if not item.endswith(' del'):
+                self._data["built"][item] = self.signature(item)
+            else:
+                self._data["built"].pop(item[:-4], None)
+
+    def register_run(self, started, items, built, skipped, status):
+        run = {
+            "started": datetime.fromtimestamp(started).isoformat(),
+            "duration": round(time.time() - started, 3),
+            "items": items,
+            "built": built,
+            "skipped": skipped,
+            "status": status,
+        }
+        self._data["runs"] = (self.runs + [run])[-MAX_RUNS_RECORDED:]
+        logger.info("GeraPadrao: %s", run)
+        return run
+
+
 class GeraPadrao:
 
     def __init__(self, collection_acron, config, mailer):
@@ -78,8 +223,11 @@ class GeraPadrao:
         self.config = config
         self.mailer = mailer
         self.status_manager = GeraPadraoStatusManager(
-            self.config.gerapadrao_permission_file)
+            self.config.gerapadrao_permission_file,
+            self.config.gerapadrao_lock_max_age)
         self.col_scilista = Scilista(self.config.collection_scilista)
+        self.state = GeraPadraoState(
+            self.config.gerapadrao_state_file, self.config.serial_path)
 
     @property
     def now(self):
@@ -87,25 +235,52 @@ class GeraPadrao:
 
     @property
     def command(self):
-        return 'cd {};./GeraPadrao.bat;echo FINISHED>{}'.format(
-                self.config.gerapadrao_proc_path,
-                self.config.gerapadrao_permission_file)
+        # o status do comando é o do GeraPadrao.bat; o FINISHED é gravado
+        # por GeraPadraoStatusManager.release
+        return 'cd {} && ./GeraPadrao.bat'.format(
+                self.config.gerapadrao_proc_path)
 
     def run(self):
-        if self.status_manager.is_free:
-            self.status_manager.block()
-            scilista_content = self.col_scilista.consume_collection_scilista()
-            if scilista_content:
-                self.config.update_title_and_issue()
-                scilista_content = sort_scilista(scilista_content)
-                fs_utils.write_file(
-                    self.config.gerapadrao_scilista, scilista_content)
-                self._gerapadrao(scilista_content)
+        """
+        Executa o GeraPadrao enquanto houver itens na scilista da coleção.
+        Os itens acumulados durante uma execução são agrupados na seguinte
+        e os fascículos cuja base não mudou desde a última execução bem
+        sucedida são ignorados
+        """
+        if not self.status_manager.acquire():
+            self.mail_gerapadrao_is_busy()
+            return
+        try:
+            while self._run_once():
+                pass
+        finally:
+            self.status_manager.release()
+
+    def _run_once(self):
+        scilista_content = self.col_scilista.consume_collection_scilista()
+        if not scilista_content.strip():
+            return False
+        started = time.time()
+        items, skipped = self.state.select(scilista_content)
+        status = None
+        if items:
+            self.config.update_title_and_issue()
+            scilista_content = sort_scilista('\n'.join(items))
+            fs_utils.write_file(
+                self.config.gerapadrao_scilista, scilista_content)
+            status = self._gerapadrao(scilista_content)
+            if status == 0:
+                self.state.register_success(items)
                 self._update_web_site(scilista_content)
             else:
-                self.status_manager.free()
-        else:
-            self.mail_gerapadrao_is_busy()
+                # os itens voltam para a scilista
+                self.col_scilista.restore(scilista_content)
+        self.state.register_run(
+            started, len(items) + len(skipped), len(items), len(skipped),
+            status)
+        self.state.save()
+        # não insiste após uma falha
+        return status in (None, 0)
 
     def _gerapadrao(self, scilista_content):
         if self.mailer is not None:
@@ -120,8 +295,9 @@ class GeraPadrao:
         logger.info('inicio gerapadrao acron: %s', self.collection_acron)
         logger.info(command)
         logger.info(scilista_content)
-        os.system(command)
-        logger.info('fim gerapadrao acron: %s', self.collection_acron)
+        status = os.system(command)
+        logger.info('fim gerapadrao acron: %s (%s)', self.collection_acron, status)
+        return status
 
     def _update_web_site(self, scilista_content):
         if self.config.is_enabled_transference:
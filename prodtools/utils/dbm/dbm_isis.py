@@ -1,6 +1,7 @@
 # coding=utf-8
 
 import os
+import re
 import html
 import logging
 
@@ -207,23 +208,179 @@ class IDFile(object):
                 "Nao foi possivel escrever o arquivo %s: %s", filename, e)
 
 
+class CISISCommand(object):
+    """
+    Comando CISIS reunido em um lote, com a saída e o código de retorno
+    obtidos depois da execução do lote (`status` None: não executado)
+    """
+
+    __slots__ = ("cisis", "cmd", "output", "status")
+
+    def __init__(self, cisis, cmd):
+        self.cisis = cisis
+        self.cmd = cmd
+        self.output = None
+        self.status = None
+
+
+class CISISBatch(object):
+    """
+    Reúne os comandos CISIS (`CISIS.run_cmd`) executados enquanto o lote
+    está ativo e os executa, na ordem em que foram reunidos, em um único
+    processo de shell, ao sair do bloco `with`.
+    A saída e o código de retorno de cada comando são separados por
+    marcadores inseridos após cada comando do script.
+    As bases removidas por `CISIS.delete_when_done` o são após a execução
+
+        with ucisis.batch():
+            ucisis.append_id_file_to_db(id_filename, db_filename)
+    """
+
+    MARKER = "CISIS_BATCH_STATUS"
+    MARKER_PATTERN = re.compile(r"{} (\d+) (-?\d+)\r?\n?".format(MARKER))
+
+    def __init__(self, *cisis_items):
+        self.cisis_items = [c for c in cisis_items if c is not None]
+        self.commands = []
+        self.executed = []
+        self._to_delete = []
+
+    def __enter__(self):
+        for cisis in self.cisis_items:
+            cisis.batch = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for cisis in self.cisis_items:
+            cisis.batch = None
+        self.run()
+
+    def add(self, cisis, cmd):
+        command = CISISCommand(cisis, cmd)
+        self.commands.append(command)
+        return command
+
+    def delete_when_done(self, delete, db_file_path):
+        self._to_delete.append((delete, db_file_path))
+
+    def script(self, commands):
+        """
+        Retorna o nome e o conteúdo do script que executa `commands`,
+        cada um seguido da exibição do marcador e do seu código de retorno
+        """
+        if os.name == "nt":
+            lines = ["@echo off"]
+            status = "%errorlevel%"
+            ext = ".bat"
+        else:
+            lines = []
+            status = "$?"
+            ext = ".sh"
+        for i, command in enumerate(commands):
+            lines.append(command.cmd)
+            lines.append("echo {} {} {}".format(self.MARKER, i, status))
+        return ext, "\n".join(lines) + "\n"
+
+    def parse_output(self, commands, output):
+        """
+        Atribui a cada comando a sua saída e o seu código de retorno
+        """
+        parts = self.MARKER_PATTERN.split(output)
+        for i in range(0, len(parts) - 1, 3):
+            command = commands[int(parts[i + 1])]
+            command.output = parts[i]
+            if command.output.endswith("\n"):
+                command.output = command.output[:-1]
+            command.status = int(parts[i + 2])
+
+    def run(self):
+        """
+        Executa os comandos reunidos até o momento e remove as bases
+        indicadas para remoção
+        """
+        commands, self.commands = self.commands, []
+        if commands:
+            ext, content = self.script(commands)
+            script = NamedTemporaryFile(
+                mode="w", suffix=ext, delete=False)
+            try:
+                with script:
+                    script.write(content)
+                if os.name == "nt":
+                    cmd = '"{}"'.format(script.name)
+                else:
+                    cmd = "sh {}".format(script.name)
+                commands[0].cisis.launches += 1
+                try:
+                    output = system.run_command(cmd)
+                except OSError as e:
+                    raise CISISRunCommandError(
+                        "Executed %s. Got %s" %
+                        ("; ".join(c.cmd for c in commands), e))
+            finally:
+                fs_utils.delete_file_or_folder(script.name)
+            self.parse_output(commands, output)
+            for command in commands:
+                command.cisis.executed += 1
+                if command.status is None:
+                    logger.error(
+                        "CISISBatch: not executed %s", command.cmd)
+                elif command.status != 0:
+                    logger.error(
+                        "CISISBatch: %s returned %s: %s",
+                        command.cmd, command.status, command.output)
+            self.executed.extend(commands)
+        to_delete, self._to_delete = self._to_delete, []
+        for delete, db_file_path in to_delete:
+            delete(db_file_path)
+        return commands
+
+
 class CISIS(object):
 
     def __init__(self, cisis_path):
         self.cisis_path = None
         if os.path.exists(cisis_path):
             self.cisis_path = cisis_path
+        # lote ativo (`CISISBatch`) que reúne os comandos para executá-los
+        # em um único processo
+        self.batch = None
+        # quantidade de processos iniciados e de comandos executados
+        self.launches = 0
+        self.executed = 0
 
     def run_cmd(self, cmd_name, *args):
+        """
+        Executa o comando e retorna sua saída ou, se há um lote ativo,
+        o reúne aos comandos do lote e retorna o `CISISCommand`
+        """
         cmd = os.path.join(self.cisis_path, cmd_name) + " " + " ".join(args)
+        if self.batch is not None:
+            return self.batch.add(self, cmd)
+        self.launches += 1
+        self.executed += 1
         try:
             return system.run_command(cmd)
         except OSError as e:
             raise CISISRunCommandError("Executed %s. Got %s" % (cmd, e))
 
+    def get_output(self, cmd_name, *args):
+        """
+        Executa o comando imediatamente, pois sua saída é necessária,
+        após executar os comandos reunidos no lote ativo
+        """
+        batch = self.batch
+        if batch is not None:
+            batch.run()
+        self.batch = None
+        try:
+            return self.run_cmd(cmd_name, *args)
+        finally:
+            self.batch = batch
+
     @property
     def is_available(self):
-        output = self.run_cmd("mx", "what")
+        output = self.get_output("mx", "what")
         return output and output.startswith('CISIS')
 
     def crunchmf(self, mst_filename, wmst_filename):
@@ -245,12 +402,21 @@ class CISIS(object):
             temp = id_filename.replace('.id', u'')
             self.id2i(id_filename, temp)
             self.append(temp, mst_filename)
-            self.delete(temp)
+            self.delete_when_done(temp)
 
     def delete(self, db_file_path):
         fs_utils.delete_file_or_folder(db_file_path + '.mst')
         fs_utils.delete_file_or_folder(db_file_path + '.xrf')
 
+    def delete_when_done(self, db_file_path):
+        """
+        Remove a base depois que os comandos do lote ativo forem executados
+        """
+        if self.batch is None:
+            self.delete(db_file_path)
+        else:
+            self.batch.delete_when_done(self.delete, db_file_path)
+
     def i2id(self, mst_filename, id_filename):
         self.run_cmd("i2id", mst_filename, ">", id_filename)
 
@@ -282,7 +448,7 @@ class CISIS(object):
     def is_readable(self, mst_filename):
         if os.path.isfile(mst_filename + '.mst'):
             try:
-                result = self.run_cmd("mx", mst_filename, "+control now")
+                result = self.get_output("mx", mst_filename, "+control now")
             except CISISRunCommandError as e:
                 raise CISISIsReadableError(
                     "Unable to check %s is readable: %s" %
@@ -304,6 +470,21 @@ class UCISIS(object):
     def is_available(self):
         return self.cisis1660.is_available or self.cisis1030.is_available
 
+    @property
+    def launches(self):
+        return self.cisis1030.launches + self.cisis1660.launches
+
+    @property
+    def executed(self):
+        return self.cisis1030.executed + self.cisis1660.executed
+
+    def batch(self):
+        """
+        Retorna o lote (`CISISBatch`) que reúne os comandos executados
+        no bloco `with` para executá-los em um único processo
+        """
+        return CISISBatch(self.cisis1030, self.cisis1660)
+
     def cisis(self, mst_filename):
         if os.path.isfile(mst_filename + '.mst'):
             if self.cisis1030.is_readable(mst_filename):
@@ -373,23 +554,26 @@ class UCISIS(object):
         self.update_indexes(db_filename, fst_filename)
 
     def get_records(self, db_filename, expr=None):
-        temp_dir = None
+        """
+        Retorna os registros de `db_filename` ou os que atendem a `expr`.
+        Os arquivos temporários são criados fora da pasta da base,
+        que é apenas lida
+        """
+        temp_dir = mkdtemp()
         if expr is None:
             base = db_filename
         else:
-            temp_dir = mkdtemp()
             base = os.path.join(temp_dir, os.path.basename(db_filename))
             self.search(db_filename, expr, base)
 
         r = []
-        id_filename = base + '.id'
+        id_filename = os.path.join(
+            temp_dir, os.path.basename(db_filename) + '.id')
         if os.path.isfile(base + '.mst'):
             self.i2id(base, id_filename)
             r = self.idfile.read(id_filename)
 
-        if temp_dir:
-            fs_utils.delete_file_or_folder(temp_dir)
-        fs_utils.delete_file_or_folder(id_filename)
+        fs_utils.delete_file_or_folder(temp_dir)
         return r
 
     def create_id_file(self, id_filename, records, content_formatter=None):
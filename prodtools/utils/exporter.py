@@ -1,16 +1,29 @@
 import zipfile
 import os
 import re
+import json
+import time
 import shutil
 import logging
 import tempfile
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from ftplib import FTP, all_errors
 from datetime import datetime
 
+from prodtools.utils import fs_utils
+
 
 exp_logger = logging.getLogger(__name__)
 
+UPLOAD_MAX_WORKERS = 2
+UPLOAD_RETRIES = 3
+UPLOAD_BACKOFF = 5
+# segundos até uma nova tentativa de envio dos que falharam
+UPLOAD_RETRY_INTERVAL = 10 * 60
+# segundos após os quais um bloqueio é considerado abandonado
+LOCK_MAX_AGE = 2 * 60 * 60
+
 
 class Exporter(object):
 
@@ -28,6 +41,35 @@ class Exporter(object):
         else:
             return server, user, password, self._data.get("remote_path")
 
+    @property
+    def outbox_path(self):
+        """
+        Pasta onde ficam os pacotes aguardando o envio por FTP.
+        Os pacotes que permanecem nesta pasta (ex.: após reiniciar o
+        processo) são enviados novamente, por isso ela deve ser persistente
+        e é obrigatória para o envio por FTP
+        """
+        path = self._data.get("outbox_path")
+        if not path:
+            exp_logger.error("Exporter: Missing outbox_path Configuration")
+            return
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        return path
+
+    @property
+    def uploader(self):
+        ftp_configuration = self.ftp_configuration
+        outbox_path = ftp_configuration and self.outbox_path
+        if outbox_path:
+            return get_uploader(outbox_path, *ftp_configuration)
+
+    def upload_status(self):
+        uploader = self.uploader
+        if uploader:
+            return uploader.status()
+        return {}
+
     @property
     def copy_configuration(self):
         try:
@@ -68,16 +110,27 @@ class Exporter(object):
             exp_logger.info("Exporter: Missing Configuration")
             return
 
+        outbox_path = None
+        if not destination_path:
+            outbox_path = self.outbox_path
+            if not outbox_path:
+                return
+
         zip_file_path = self.zip(source_path, zip_filename)
 
         if zip_file_path:
             dest_path = destination_path or os.path.dirname(zip_file_path)
+            if outbox_path:
+                dest_path = outbox_path
 
             final_file_path = self._preppend_time_to_destination_filename(
                 dest_path, zip_file_path
             )
             exp_logger.info("Exporter: move %s to %s", zip_file_path, final_file_path)
             shutil.move(zip_file_path, final_file_path)
+            if os.path.dirname(zip_file_path) != dest_path:
+                shutil.rmtree(
+                    os.path.dirname(zip_file_path), ignore_errors=True)
             if os.path.isfile(final_file_path):
                 exp_logger.info("Exporter: %s created", final_file_path)
             else:
@@ -119,47 +172,302 @@ class Exporter(object):
         background.start()
 
 
-class AsyncFTP(threading.Thread):
-    def __init__(self, local_file_path, server, user, password, remote_path, timeout=60):
-        threading.Thread.__init__(self)
-        self.local_file_path = local_file_path
+class UploadJob(object):
+    """
+    Situação do envio de um arquivo
+    """
+    PENDING = "pending"
+    UPLOADING = "uploading"
+    DONE = "done"
+    FAILED = "failed"
+    # enviado ou sendo enviado por outro processo
+    SKIPPED = "skipped"
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.name = os.path.basename(file_path)
+        self.size = self.file_size()
+        self.state = self.PENDING
+        self.attempts = 0
+        self.seconds = 0
+        self.error = None
+        self.future = None
+
+    def file_size(self):
+        try:
+            return os.path.getsize(self.file_path)
+        except OSError:
+            # já enviado e removido por outro processo
+            return 0
+
+    @property
+    def throughput(self):
+        """
+        bytes / segundo
+        """
+        if self.state == self.DONE and self.seconds:
+            return self.size / self.seconds
+        return 0
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "state": self.state,
+            "size": self.size,
+            "attempts": self.attempts,
+            "seconds": round(self.seconds, 3),
+            "throughput": round(self.throughput),
+            "error": self.error,
+            "date": datetime.now().isoformat(),
+        }
+
+
+class FTPUploader(object):
+    """
+    Envia por FTP os arquivos da pasta `outbox_path`, usando no máximo
+    `max_workers` conexões simultâneas e tentando novamente, com intervalos
+    crescentes, em caso de falha.
+    O arquivo somente é removido da pasta após ser enviado, então os envios
+    pendentes são retomados por `resume` e os que falharam são agendados
+    novamente após `retry_interval` segundos.
+    Vários processos podem usar a mesma pasta: cada arquivo é enviado
+    somente pelo processo que obtém o seu bloqueio (`<arquivo>.lock`) e
+    somente um processo por vez retoma os envios (`outbox.lock`).
+    O resultado de cada envio é registrado em `outbox_path/uploads.log`
+    """
+
+    def __init__(self, outbox_path, server, user, password, remote_path,
+                 max_workers=UPLOAD_MAX_WORKERS, retries=UPLOAD_RETRIES,
+                 backoff=UPLOAD_BACKOFF, timeout=60,
+                 retry_interval=UPLOAD_RETRY_INTERVAL):
+        self.outbox_path = outbox_path
         self.server = server
+        self.port = 21
+        if ':' in server:
+            self.server, port = server.split(':')
+            self.port = int(port)
         self.user = user
         self.password = password
         self.remote_path = remote_path
+        self.retries = retries
+        self.backoff = backoff
         self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.jobs = {}
+        self.futures = []
+        self._timers = []
+        # liberação do bloqueio da pasta após os envios retomados
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
 
-    def run(self):
-        exp_logger.info("FTP.START")
+    @property
+    def log_file_path(self):
+        return os.path.join(self.outbox_path, "uploads.log")
+
+    def submit(self, file_path):
+        """
+        Agenda o envio de `file_path`, que é movido para `outbox_path`
+        Retorna UploadJob
+        """
+        if os.path.dirname(os.path.abspath(file_path)) != os.path.abspath(self.outbox_path):
+            shutil.move(file_path, self.outbox_path)
+            file_path = os.path.join(
+                self.outbox_path, os.path.basename(file_path))
+        with self._lock:
+            job = self.jobs.get(os.path.basename(file_path))
+            if job is not None and job.state in (job.PENDING, job.UPLOADING):
+                return job
+            job = UploadJob(file_path)
+            self.jobs[job.name] = job
+            job.future = self._executor.submit(self._upload, job)
+            self.futures.append(job.future)
+        return job
+
+    def resume(self):
+        """
+        Agenda o envio dos arquivos que permaneceram em `outbox_path`,
+        se nenhum outro processo o está fazendo. O bloqueio da pasta é
+        liberado quando esses envios terminam
+        """
+        outbox_lock = fs_utils.FileLock(
+            os.path.join(self.outbox_path, "outbox.lock"), LOCK_MAX_AGE)
+        if not outbox_lock.acquire():
+            exp_logger.info(
+                "Exporter: %s is being resumed by another process",
+                self.outbox_path)
+            return []
         try:
-            ftp = FTP(self.server, self.user, self.password, self.timeout)
-        except all_errors as e:
-            exp_logger.info(e)
+            jobs = [
+                self.submit(os.path.join(self.outbox_path, name))
+                for name in sorted(os.listdir(self.outbox_path))
+                if name.endswith(".zip")
+            ]
+        except Exception:
+            outbox_lock.release()
+            raise
+        futures = list(set(
+            job.future for job in jobs if job.future is not None))
+        pending = [len(futures)]
+
+        def release(future):
+            with self._lock:
+                pending[0] -= 1
+                done = pending[0] == 0
+            if done:
+                outbox_lock.release()
+                self._resumed.set()
+
+        if not futures:
+            outbox_lock.release()
+            return jobs
+        self._resumed.clear()
+        for future in futures:
+            future.add_done_callback(release)
+        return jobs
+
+    def wait(self):
+        for future in list(self.futures):
+            future.result()
+        self._resumed.wait()
+
+    def close(self):
+        """
+        Cancela as novas tentativas agendadas
+        """
+        with self._lock:
+            timers, self._timers = self._timers, []
+        for timer in timers:
+            timer.cancel()
+
+    def _schedule_retry(self, job):
+        if self.retry_interval is None:
             return
+        timer = threading.Timer(
+            self.retry_interval, self.submit, [job.file_path])
+        timer.daemon = True
+        with self._lock:
+            self._timers = [t for t in self._timers if t.is_alive()]
+            self._timers.append(timer)
+        timer.start()
+
+    def status(self):
+        with self._lock:
+            return {name: job.as_dict() for name, job in self.jobs.items()}
+
+    def _upload(self, job):
+        file_lock = fs_utils.FileLock(job.file_path + ".lock", LOCK_MAX_AGE)
+        if not file_lock.acquire():
+            job.state = job.SKIPPED
+            job.error = "uploading by another process"
+            self._log(job)
+            return job
+        try:
+            if not os.path.isfile(job.file_path):
+                job.state = job.SKIPPED
+                job.error = "uploaded by another process"
+                self._log(job)
+                return job
+            job.size = job.file_size()
+            return self._upload_file(job)
+        finally:
+            file_lock.release()
+
+    def _upload_file(self, job):
+        started = time.time()
+        job.state = job.UPLOADING
+        for attempt in range(self.retries + 1):
+            job.attempts = attempt + 1
+            try:
+                self._send(job.file_path)
+            except all_errors as e:
+                job.error = str(e)
+                exp_logger.info(
+                    "FTP: Unable to send %s (attempt %i): %s",
+                    job.file_path, job.attempts, e)
+                if attempt < self.retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+            else:
+                job.error = None
+                job.state = job.DONE
+                break
+        else:
+            job.state = job.FAILED
+        job.seconds = time.time() - started
+        if job.state == job.DONE:
+            try:
+                os.unlink(job.file_path)
+            except OSError:
+                exp_logger.info(
+                    "Exporter: Unable to delete: %s" % job.file_path)
+        self._log(job)
+        if job.state == job.FAILED:
+            self._schedule_retry(job)
+        return job
+
+    def _send(self, local_file_path):
+        exp_logger.info("FTP.START")
+        ftp = FTP(timeout=self.timeout)
         try:
+            ftp.connect(self.server, self.port)
+            ftp.login(self.user, self.password)
             if self.remote_path:
                 ftp.cwd(self.remote_path)
-            exp_logger.info("ftp " + self.local_file_path)
-            remote_name = os.path.basename(self.local_file_path)
-            with open(self.local_file_path, 'rb') as f:
-                try:
-                    exp_logger.info("FTP.STOR %s - start" % remote_name)
-                    ftp.storbinary('STOR {}'.format(remote_name), f)
-                    exp_logger.info("FTP.STOR %s - end" % remote_name)
-                except all_errors:
-                    exp_logger.info(
-                        'FTP: Unable to send %s to %s' %
-                        (self.local_file_path, remote_name), exc_info=True)
-        except all_errors as e:
-            exp_logger.info("all_errors as e")
-
-            exp_logger.info(e)
+            remote_name = os.path.basename(local_file_path)
+            with open(local_file_path, 'rb') as f:
+                exp_logger.info("FTP.STOR %s - start" % remote_name)
+                ftp.storbinary('STOR {}'.format(remote_name), f)
+                exp_logger.info("FTP.STOR %s - end" % remote_name)
         finally:
             ftp.close()
             exp_logger.info("FTP.END")
-            try:
-                os.unlink(self.local_file_path)
-                shutil.rmtree(os.path.dirname(self.local_file_path))
-            except OSError:
-                exp_logger.info(
-                    "Exporter: Unable to delete temp: %s" % self.local_file_path)
+
+    def _log(self, job):
+        data = job.as_dict()
+        exp_logger.info("Exporter: upload %s", data)
+        with self._lock:
+            with open(self.log_file_path, "a") as fp:
+                fp.write(json.dumps(data) + "\n")
+
+
+_uploaders = {}
+_uploaders_lock = threading.Lock()
+
+
+def get_uploader(outbox_path, server, user, password, remote_path):
+    """
+    Retorna o FTPUploader de `outbox_path`, criado uma única vez por processo
+    Ao ser criado, retoma os envios pendentes
+    """
+    key = os.path.abspath(outbox_path)
+    with _uploaders_lock:
+        uploader = _uploaders.get(key)
+        if uploader is None:
+            uploader = FTPUploader(
+                outbox_path, server, user, password, remote_path)
+            _uploaders[key] = uploader
+            uploader.resume()
+    return uploader
+
+
+class AsyncFTP(object):
+    """
+    Agenda o envio de `local_file_path` no FTPUploader da pasta onde o
+    arquivo se encontra, sem bloquear quem o chama
+    """
+
+    def __init__(self, local_file_path, server, user, password, remote_path):
+        self.local_file_path = local_file_path
+        self.server = server
+        self.user = user
+        self.password = password
+        self.remote_path = remote_path
+        self.job = None
+
+    def start(self):
+        uploader = get_uploader(
+            os.path.dirname(self.local_file_path),
+            self.server, self.user, self.password, self.remote_path)
+        self.job = uploader.submit(self.local_file_path)
+        return self.job
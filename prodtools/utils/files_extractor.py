@@ -1,7 +1,7 @@
 # coding=utf-8
-## {{{ http://code.activestate.com/recipes/576714/ (r2)
 import os
 import tarfile
+import time
 import zipfile
 import logging
 
@@ -9,6 +9,129 @@ import logging
 logger = logging.getLogger()
 
 
+MAX_TOTAL_SIZE = 8 * 1024 ** 3
+MAX_MEMBERS = 50000
+MAX_COMPRESSION_RATIO = 200
+# arquivos pequenos (ex.: XML com muitos espaços) podem ter taxas de
+# compressão altas e legítimas, por isso a taxa só é avaliada a partir daqui
+MIN_SIZE_TO_CHECK_RATIO = 10 * 1024 ** 2
+BLOCK_SIZE = 1024 * 1024
+
+
+class ExtractionError(Exception):
+    pass
+
+
+class ExtractionLimits(object):
+    """
+    Limites aplicados antes de extrair um pacote
+    """
+
+    def __init__(self, max_total_size=MAX_TOTAL_SIZE, max_members=MAX_MEMBERS,
+                 max_compression_ratio=MAX_COMPRESSION_RATIO):
+        self.max_total_size = max_total_size
+        self.max_members = max_members
+        self.max_compression_ratio = max_compression_ratio
+
+    def check_ratio(self, name, size, compressed_size):
+        if size < MIN_SIZE_TO_CHECK_RATIO or not compressed_size:
+            return
+        if size / compressed_size > self.max_compression_ratio:
+            raise ExtractionError(
+                "%s: compression ratio exceeds %s" %
+                (name, self.max_compression_ratio))
+
+    def check(self, archive_size, members):
+        files = [m for m in members if not m.is_dir]
+        if len(members) > self.max_members:
+            raise ExtractionError(
+                "number of members (%i) exceeds %i" %
+                (len(members), self.max_members))
+        total_size = sum([m.size for m in files])
+        if total_size > self.max_total_size:
+            raise ExtractionError(
+                "total size (%i) exceeds %i" %
+                (total_size, self.max_total_size))
+        for m in files:
+            self.check_ratio(m.name, m.size, m.compressed_size)
+        self.check_ratio("archive", total_size, archive_size)
+        return total_size
+
+
+class ExtractionResult(object):
+
+    def __init__(self, path):
+        self.path = path
+        self.files = []
+        self.size = 0
+        self.seconds = 0
+
+    @property
+    def throughput(self):
+        """
+        bytes / segundo
+        """
+        if self.seconds:
+            return self.size / self.seconds
+        return 0
+
+    def __str__(self):
+        return "%s: %i files, %i bytes, %.3fs, %.2f MB/s" % (
+            self.path, len(self.files), self.size, self.seconds,
+            self.throughput / 1024 ** 2)
+
+
+class ArchiveMember(object):
+
+    def __init__(self, name, size, compressed_size, is_dir, info):
+        self.name = name
+        self.size = size
+        self.compressed_size = compressed_size
+        self.is_dir = is_dir
+        self.info = info
+
+
+class ZipArchive(object):
+
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path, 'r')
+
+    def members(self):
+        return [
+            ArchiveMember(
+                info.filename, info.file_size, info.compress_size,
+                info.is_dir(), info)
+            for info in self.archive.infolist()
+        ]
+
+    def open(self, member):
+        return self.archive.open(member.info)
+
+    def close(self):
+        self.archive.close()
+
+
+class TarArchive(object):
+
+    def __init__(self, path, mode):
+        self.archive = tarfile.open(path, mode)
+
+    def members(self):
+        # somente arquivos regulares e diretórios;
+        # links e dispositivos são ignorados
+        return [
+            ArchiveMember(info.name, info.size, None, info.isdir(), info)
+            for info in self.archive.getmembers()
+            if info.isfile() or info.isdir()
+        ]
+
+    def open(self, member):
+        return self.archive.extractfile(member.info)
+
+    def close(self):
+        self.archive.close()
+
+
 def is_compressed_file(path):
     r = False
     if path.endswith('.zip'):
@@ -20,30 +143,97 @@ def is_compressed_file(path):
     return r
 
 
-def extract_file(path, to_directory='.'):
-    r = False
-
+def open_archive(path):
     if path.endswith('.zip'):
-        opener, mode = zipfile.ZipFile, 'r'
+        return ZipArchive(path)
     elif path.endswith('.tar.gz') or path.endswith('.tgz'):
-        opener, mode = tarfile.open, 'r:gz'
+        return TarArchive(path, 'r:gz')
     elif path.endswith('.tar.bz2') or path.endswith('.tbz'):
-        opener, mode = tarfile.open, 'r:bz2'
-    else:
-        raise ValueError("Could not extract `%s` as no appropriate extractor is found" % path)
-    cwd = os.getcwd()
-    os.chdir(to_directory)
+        return TarArchive(path, 'r:bz2')
+    raise ValueError("Could not extract `%s` as no appropriate extractor is found" % path)
+
+
+def member_path(to_directory, name, flatten=False):
+    """
+    Retorna o caminho de destino de um membro do pacote.
+    Com `flatten`, os arquivos da raiz e dos diretórios do primeiro nível
+    são gravados diretamente em `to_directory` e os demais são ignorados
+    (retorna None)
+    """
+    parts = [p for p in name.replace('\\', '/').split('/') if p not in ('', '.')]
+    if not parts or '..' in parts or ':' in parts[0]:
+        raise ExtractionError("%s: invalid member name" % name)
+    if flatten:
+        if len(parts) > 2:
+            return None
+        parts = parts[-1:]
+    return os.path.join(to_directory, *parts)
+
+
+def copy_member(source, target_path, member, limits, result):
+    written = 0
+    with open(target_path, 'wb') as fp:
+        for block in iter(lambda: source.read(BLOCK_SIZE), b''):
+            written += len(block)
+            if written > member.size:
+                raise ExtractionError(
+                    "%s: content is larger than declared" % member.name)
+            if result.size + written > limits.max_total_size:
+                raise ExtractionError(
+                    "total size exceeds %i" % limits.max_total_size)
+            fp.write(block)
+    return written
+
+
+def extract_archive(path, to_directory='.', limits=None, flatten=False):
+    """
+    Extrai `path` em `to_directory` sem alterar o diretório corrente
+    Os membros são validados com `limits` antes de gravar qualquer arquivo
+    Retorna ExtractionResult; levanta ExtractionError se o pacote excede
+    os limites ou contém nomes inválidos
+    """
+    limits = limits or ExtractionLimits()
+    result = ExtractionResult(path)
+    started = time.time()
+    archive = open_archive(path)
     try:
-        file = opener(path, mode)
-        try:
-            file.extractall()
-        finally:
-            file.close()
-        r = True
-    except IOError:
-        logger.error('extract_file: Invalid file ' + path)
-        r = False
+        members = archive.members()
+        limits.check(os.path.getsize(path), members)
+        targets = [
+            (member, member_path(to_directory, member.name, flatten))
+            for member in members
+        ]
+        for member, target_path in targets:
+            if target_path is None:
+                continue
+            if member.is_dir:
+                if not flatten and not os.path.isdir(target_path):
+                    os.makedirs(target_path)
+                continue
+            dirname = os.path.dirname(target_path)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            source = archive.open(member)
+            try:
+                result.size += copy_member(
+                    source, target_path, member, limits, result)
+            finally:
+                source.close()
+            result.files.append(target_path)
     finally:
-        os.chdir(cwd)
-        return r
-## end of http://code.activestate.com/recipes/576714/ }}}
+        archive.close()
+    result.seconds = time.time() - started
+    logger.info("extract_file: %s" % result)
+    return result
+
+
+def extract_file(path, to_directory='.', limits=None, flatten=False):
+    try:
+        extract_archive(path, to_directory, limits, flatten)
+    except (IOError, OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+        logger.error('extract_file: Invalid file %s: %s' % (path, e))
+        return False
+    except ExtractionError as e:
+        logger.error('extract_file: Rejected file %s: %s' % (path, e))
+        return False
+    return True
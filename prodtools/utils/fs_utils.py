@@ -1,8 +1,11 @@
 # coding=utf-8
 import sys
 import os
+import json
+import time
+import socket
+import hashlib
 import shutil
-import tempfile
 import logging
 from zipfile import ZipFile
 from datetime import datetime
@@ -17,6 +20,8 @@ except NameError:
     FileNotFoundError = IOError
 
 
+logger = logging.getLogger()
+
 os_path_join = os.path.join
 python_version = sys.version_info.major
 
@@ -103,25 +108,16 @@ def move_file(src, dest):
 
 
 def extract_package(compressed_file, dest_path):
-    temp_dir = tempfile.mkdtemp()
-    if files_extractor.extract_file(compressed_file, temp_dir):
-        if os.path.exists(dest_path):
-            delete_file_or_folder(dest_path)
-        os.makedirs(dest_path)
-        # eliminate folders
-        for item in os.listdir(temp_dir):
-            item_path = os_path_join(temp_dir, item)
-            if os.path.isfile(item_path):
-                shutil.move(item_path, dest_path)
-            elif os.path.isdir(item_path):
-                for f in os.listdir(item_path):
-                    file_path = os_path_join(item_path, f)
-                    if os.path.isfile(file_path):
-                        shutil.move(file_path, dest_path)
-                shutil.rmtree(item_path)
-        shutil.rmtree(temp_dir)
-        return True
-    return False
+    """
+    Extrai o pacote em `dest_path`, que é recriado.
+    Os arquivos de diretórios do primeiro nível são gravados diretamente em
+    `dest_path`
+    """
+    if os.path.exists(dest_path):
+        delete_file_or_folder(dest_path)
+    os.makedirs(dest_path)
+    return files_extractor.extract_file(
+        compressed_file, dest_path, flatten=True)
 
 
 def unzip(compressed_filename, destination_path):
@@ -147,7 +143,7 @@ def zip(zip_filename, files):
         os.makedirs(dest_path)
     try:
         zipf = ZipFile(zip_filename, 'w')
-        for item in list(set(files)):
+        for item in sorted(set(files)):
             zipf.write(item, arcname=os.path.basename(item))
         zipf.close()
     except:
@@ -161,6 +157,184 @@ def zip_report(report_filename):
     return zip_path
 
 
+def files_hash(files, block_size=1024 * 1024):
+    """
+    Retorna o sha256 do conteúdo de `files`, considerando também o nome
+    (basename) de cada arquivo, para que renomear um arquivo altere o resultado
+    """
+    _hash = hashlib.sha256()
+    for file_path in files:
+        _hash.update(os.path.basename(file_path).encode("utf-8"))
+        _hash.update(b"\0")
+        with open(file_path, "rb") as fp:
+            for block in iter(lambda: fp.read(block_size), b""):
+                _hash.update(block)
+        _hash.update(b"\0")
+    return _hash.hexdigest()
+
+
+# ioctl do Linux que cria um "reflink" (cópia copy-on-write)
+FICLONE = 0x40049409
+
+
+def _reflink(src, dest):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as src_fp, open(dest, "wb") as dest_fp:
+            fcntl.ioctl(dest_fp.fileno(), FICLONE, src_fp.fileno())
+    except (IOError, OSError):
+        if os.path.isfile(dest):
+            os.unlink(dest)
+        return False
+    return True
+
+
+def _hardlink(src, dest):
+    try:
+        os.link(src, dest)
+    except (AttributeError, NotImplementedError, OSError):
+        return False
+    return True
+
+
+class FilesPropagation(object):
+    """
+    Propaga arquivos (pdf, imagens etc) de uma pasta para outra usando
+    reflink quando origem e destino estão no mesmo sistema de arquivos e,
+    caso contrário, copiando o conteúdo.
+    Hardlink só é usado se `hardlinks=True`, ou seja, quando nem a origem
+    nem o destino são reescritos no próprio arquivo (`open(path, "w")`),
+    pois, ao compartilharem o mesmo inode, a escrita em um altera o outro.
+    O destino é sempre removido antes, para que a sua substituição não
+    altere o conteúdo de outro que compartilhe os mesmos dados.
+    Contabiliza os bytes que deixaram de ser copiados.
+    """
+
+    def __init__(self, use_links=True, hardlinks=False):
+        self.use_links = use_links
+        self.hardlinks = hardlinks
+        self.reflinked = 0
+        self.linked = 0
+        self.copied = 0
+        self.bytes_copied = 0
+        self.bytes_avoided = 0
+
+    def propagate(self, src, dest):
+        """
+        Equivale a `shutil.copy(src, dest)`; `dest` pode ser uma pasta
+        Retorna o caminho do arquivo criado
+        """
+        if os.path.isdir(dest):
+            dest = os.path.join(dest, os.path.basename(src))
+        if os.path.isfile(dest):
+            if os.path.samefile(src, dest):
+                return dest
+            os.unlink(dest)
+        size = os.path.getsize(src)
+        if self.use_links and _reflink(src, dest):
+            self.reflinked += 1
+            self.bytes_avoided += size
+        elif self.use_links and self.hardlinks and _hardlink(src, dest):
+            self.linked += 1
+            self.bytes_avoided += size
+        else:
+            shutil.copyfile(src, dest)
+            self.copied += 1
+            self.bytes_copied += size
+        return dest
+
+    def __str__(self):
+        return (
+            "files: {} reflinked, {} hardlinked, {} copied | "
+            "bytes: {} avoided, {} copied".format(
+                self.reflinked, self.linked, self.copied,
+                self.bytes_avoided, self.bytes_copied))
+
+
+class FileLock(object):
+    """
+    Bloqueio entre processos: `lock_file` é criado de forma atômica (O_EXCL)
+    com os dados do processo que o obteve. É considerado abandonado se é
+    mais antigo que `max_age` (segundos) ou se o processo que o criou (na
+    mesma máquina) já terminou
+    """
+
+    def __init__(self, lock_file, max_age):
+        self.lock_file = lock_file
+        self.max_age = max_age
+
+    def _create(self):
+        try:
+            fd = os.open(
+                self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except (IOError, OSError):
+            return False
+        with os.fdopen(fd, 'w') as fp:
+            json.dump({
+                "pid": os.getpid(),
+                "host": socket.gethostname(),
+                "time": time.time()}, fp)
+        return True
+
+    @property
+    def owner(self):
+        try:
+            with open(self.lock_file) as fp:
+                return json.load(fp)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def is_stale(self, owner):
+        if owner is None:
+            # bloqueio em criação ou ilegível: confia na data do arquivo
+            try:
+                return time.time() - os.path.getmtime(self.lock_file) > self.max_age
+            except OSError:
+                return True
+        if time.time() - owner.get("time", 0) > self.max_age:
+            return True
+        if owner.get("host") == socket.gethostname():
+            try:
+                os.kill(owner.get("pid"), 0)
+            except ProcessLookupError:
+                return True
+            except (OSError, TypeError):
+                return False
+        return False
+
+    @property
+    def is_free(self):
+        return (
+            not os.path.isfile(self.lock_file) or
+            self.is_stale(self.owner)
+        )
+
+    def acquire(self):
+        """
+        Retorna True se obteve o bloqueio, removendo antes um abandonado
+        """
+        if self._create():
+            return True
+        owner = self.owner
+        if not self.is_stale(owner):
+            return False
+        logger.info("removing stale lock %s %s", self.lock_file, owner)
+        try:
+            os.unlink(self.lock_file)
+        except OSError:
+            pass
+        return self._create()
+
+    def release(self):
+        try:
+            os.unlink(self.lock_file)
+        except OSError:
+            pass
+
+
 def last_modified_datetime(filename):
     return datetime.fromtimestamp(os.path.getmtime(filename))
 
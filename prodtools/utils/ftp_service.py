@@ -1,139 +1,402 @@
 # coding=utf-8
-from ftplib import FTP
+from ftplib import FTP, all_errors
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
+import threading
+import time
 
 from prodtools.utils import encoding
 
 
 actions = []
+actions_lock = threading.Lock()
+
+PACKAGES_EXTENSIONS = ('.zip', '.tgz')
 
 
 def register_action(action):
     encoding.display_message(action)
-    actions.append(action)
+    with actions_lock:
+        actions.append(action)
+
+
+class DownloadResult(object):
+    """
+    Resultado do download de um arquivo do servidor FTP
+    O conteúdo é baixado em `partial_file_path` e, quando completo,
+    movido para `local_file_path`.
+    Se o servidor não informa o tamanho (SIZE), o arquivo somente é
+    considerado completo se a transferência (RETR) foi confirmada (226)
+    """
+
+    def __init__(self, remote_path, local_file_path, remote_size,
+                 partial_file_path=None):
+        self.remote_path = remote_path
+        self.local_file_path = local_file_path
+        self.partial_file_path = partial_file_path or local_file_path + '.part'
+        self.remote_size = remote_size
+        self.remote_mtime = None
+        self.resumed_from = 0
+        self.downloaded = 0
+        self.seconds = 0
+        self.attempts = 0
+        self.transferred = False
+        self.finished = False
+        self.deleted = False
+        self.error = None
+
+    @property
+    def name(self):
+        return os.path.basename(self.local_file_path)
+
+    @property
+    def metadata_file_path(self):
+        return self.partial_file_path + '.json'
+
+    @property
+    def metadata(self):
+        """
+        Identifica o arquivo remoto do qual o parcial é uma parte
+        """
+        return {
+            "remote_path": self.remote_path,
+            "remote_size": self.remote_size,
+            "remote_mtime": self.remote_mtime,
+        }
+
+    @property
+    def local_size(self):
+        if os.path.isfile(self.local_file_path):
+            return os.path.getsize(self.local_file_path)
+        return 0
+
+    @property
+    def partial_size(self):
+        if os.path.isfile(self.partial_file_path):
+            return os.path.getsize(self.partial_file_path)
+        return 0
+
+    @property
+    def is_downloaded(self):
+        if self.error is not None:
+            return False
+        if self.remote_size is None:
+            return self.transferred and os.path.isfile(self.partial_file_path)
+        return self.partial_size == self.remote_size
+
+    @property
+    def is_complete(self):
+        if self.error is not None or not self.finished:
+            return False
+        if self.remote_size is None:
+            return self.transferred and os.path.isfile(self.local_file_path)
+        return self.local_size == self.remote_size
+
+    @property
+    def throughput(self):
+        """
+        bytes / segundo
+        """
+        if self.seconds:
+            return self.downloaded / self.seconds
+        return 0
+
+    def __str__(self):
+        return (
+            "{name}: {size} bytes (resumed from {resumed_from}), "
+            "{seconds:.2f}s, {throughput:.2f} MB/s, attempts: {attempts}, "
+            "deleted: {deleted}{error}".format(
+                name=self.remote_path, size=self.local_size,
+                resumed_from=self.resumed_from, seconds=self.seconds,
+                throughput=self.throughput / 1024 ** 2,
+                attempts=self.attempts, deleted=self.deleted,
+                error='' if self.error is None else ', error: %s' % self.error))
 
 
 class FTPService(object):
 
-    def __init__(self, server, user, pswd):
+    def __init__(self, server, user, pswd, max_workers=4, retries=3,
+                 timeout=60):
         self.user = user
         self.pswd = pswd
-        self.ftp = FTP(server)
+        self.server = server
+        self.port = 21
+        if ':' in server:
+            self.server, port = server.split(':')
+            self.port = int(port)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.timeout = timeout
+        self.results = []
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self.ftp = None
 
     @property
     def registered_actions(self):
-        return '\n'.join(actions)
+        with actions_lock:
+            return '\n'.join(actions)
+
+    def connect(self):
+        ftp = FTP()
+        ftp.connect(self.server, self.port, timeout=self.timeout)
+        r = ftp.login(self.user, self.pswd)
+        register_action(r)
+        ftp.voidcmd('TYPE I')
+        return ftp
+
+    def _thread_connection(self, reconnect=False):
+        """
+        Cada thread usa a sua própria conexão
+        """
+        ftp = getattr(self._local, 'ftp', None)
+        if reconnect and ftp is not None:
+            self._close(ftp)
+            ftp = None
+        if ftp is None:
+            ftp = self.connect()
+            self._local.ftp = ftp
+            with self._connections_lock:
+                self._connections.append(ftp)
+        return ftp
+
+    def _close(self, ftp):
+        try:
+            ftp.quit()
+        except all_errors:
+            ftp.close()
+        with self._connections_lock:
+            if ftp in self._connections:
+                self._connections.remove(ftp)
+
+    def close(self):
+        for ftp in list(self._connections):
+            self._close(ftp)
+        self._local = threading.local()
 
     def download_files(self, local_path, path_in_ftp_server):
+        """
+        Baixa, usando até `max_workers` conexões simultâneas, os pacotes
+        (.zip, .tgz) encontrados em `path_in_ftp_server` e nas suas subpastas.
+        O nome do arquivo local é formado pelo caminho remoto relativo a
+        `path_in_ftp_server` (subpastas separadas por "_"), assim pacotes de
+        mesmo nome em subpastas diferentes não se sobrepõem.
+        O conteúdo é baixado na pasta `local_path` + "_partial" e, quando
+        completo, movido para `local_path`. Downloads interrompidos são
+        retomados (REST) somente se o arquivo parcial é do mesmo arquivo
+        remoto (caminho, tamanho e data de modificação); senão são descartados.
+        O arquivo remoto somente é apagado se o tamanho do arquivo baixado
+        é igual ao do remoto ou, se o servidor não informa o tamanho, se
+        foi baixado na primeira tentativa, com a transferência confirmada.
+        Retorna os nomes dos arquivos baixados
+        """
         if not os.path.isdir(local_path):
             os.makedirs(local_path)
-        os.chdir(local_path)
+        partial_path = local_path.rstrip('/\\') + '_partial'
+        if not os.path.isdir(partial_path):
+            os.makedirs(partial_path)
 
-        r = self.ftp.login(self.user, self.pswd)
-        register_action(r)
-        downloaded_files = self.download_files_of_subdir(local_path, path_in_ftp_server, False)
+        self.ftp = self.connect()
+        try:
+            remote_files = self.list_packages(self.ftp, path_in_ftp_server)
+        finally:
+            self.ftp.close()
+        register_action(
+            'Files to download:\n' +
+            '\n'.join([path for path, size in remote_files]) + '\n' +
+            str(len(remote_files)) + ' files')
+
+        items = []
+        names = set()
+        for remote_path, remote_size in remote_files:
+            name = local_file_name(path_in_ftp_server, remote_path, names)
+            names.add(name)
+            items.append((
+                os.path.join(local_path, name), remote_path, remote_size,
+                os.path.join(partial_path, name)))
 
-        r = self.ftp.close()
+        self.results = []
+        if items:
+            max_workers = min(self.max_workers, len(items))
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    self.results = list(executor.map(
+                        lambda item: self.download_and_delete_file(*item),
+                        items))
+            finally:
+                self.close()
         register_action('ftp finished')
 
+        downloaded_files = [
+            result.name for result in self.results if result.is_complete]
         register_action(';\n'.join(downloaded_files))
         return downloaded_files
 
-    def download_files_of_subdir(self, local_path, path_in_ftp_server, delete_path_in_ftp_server=False):
-        levels = len(path_in_ftp_server.split('/'))
-        downloaded_files = []
-
-        exist_ftp_folder = False
-        if '/' in path_in_ftp_server:
-            exist_ftp_folder = True
-        else:
-            if path_in_ftp_server in self.ftp.nlst():
-                exist_ftp_folder = True
+    def list_packages(self, ftp, path_in_ftp_server):
+        """
+        Retorna [(caminho, tamanho)] dos pacotes de `path_in_ftp_server`
+        As subpastas são percorridas recursivamente
+        """
+        try:
+            items = ftp.nlst(path_in_ftp_server)
+        except all_errors:
+            register_action('not found: ' + path_in_ftp_server)
+            return []
+        found = []
+        for item in items:
+            name = item.replace('\\', '/').split('/')[-1]
+            if name in ('.', '..', ''):
+                continue
+            path = path_in_ftp_server.rstrip('/') + '/' + name
+            if name.endswith(PACKAGES_EXTENSIONS):
+                found.append((path, self.remote_size(ftp, path)))
+            else:
+                # supposed to be a folder
+                found.extend(self.list_packages(ftp, path))
+        return found
 
-        if exist_ftp_folder:
-            # go to ftp directory
-            try:
-                register_action('try to go to ' + path_in_ftp_server)
-                r = self.ftp.cwd(path_in_ftp_server)
-                register_action(r)
-
-                # download files
-                files_or_folders = self.ftp.nlst()
-                register_action('Files/Folders to download:\n' + '\n'.join(files_or_folders) + '\n' + str(len(files_or_folders)) + ' files/folders')
-                for item in files_or_folders:
-                    if item.endswith('.zip') or item.endswith('.tgz'):
-                        # must be a file
-                        downloaded_file = self.download_and_delete_file(local_path, item)
-                        if len(downloaded_file) > 0:
-                            downloaded_files.append(downloaded_file)
-                    else:
-                        # supposed to be a folder
-                        downloaded_files += self.download_files_of_subdir(local_path, item, False)
-
-                # up level
-                for i in range(0, levels):
-                    r = self.ftp.cwd('..')
-                    register_action(r)
+    def remote_size(self, ftp, path):
+        try:
+            return ftp.size(path)
+        except all_errors:
+            return None
 
-                if delete_path_in_ftp_server:
-                    r = self.ftp.rmd(path_in_ftp_server)
-                register_action(r)
-            except:
-                register_action('not found: ' + path_in_ftp_server)
-        else:
-            register_action('not found: ' + path_in_ftp_server)
+    def remote_mtime(self, ftp, path):
+        try:
+            return ftp.voidcmd('MDTM ' + path)[4:].strip()
+        except all_errors:
+            return None
 
-        return downloaded_files
+    def _prepare_partial_file(self, result):
+        """
+        Mantém o arquivo parcial de um download anterior somente se for
+        do mesmo arquivo remoto, cujos tamanho e data de modificação são
+        conhecidos. Caso contrário, descarta-o.
+        """
+        metadata = None
+        if os.path.isfile(result.metadata_file_path):
+            try:
+                with open(result.metadata_file_path) as fp:
+                    metadata = json.load(fp)
+            except (IOError, OSError, ValueError):
+                metadata = None
+        resumable = (
+            metadata == result.metadata and
+            result.remote_size is not None and
+            result.remote_mtime is not None and
+            result.partial_size <= result.remote_size
+        )
+        if not resumable and os.path.isfile(result.partial_file_path):
+            register_action(
+                result.remote_path + ': discarded partial file ' +
+                result.partial_file_path)
+            os.unlink(result.partial_file_path)
+        with open(result.metadata_file_path, 'w') as fp:
+            json.dump(result.metadata, fp)
+        result.resumed_from = result.partial_size
 
-    def download_and_delete_file(self, local_path, file):
-        downloaded_file = ''
-        r = self.ftp.retrbinary('RETR ' + file, open(file, 'wb').write)
+    def _retrieve(self, ftp, remote_path, result):
+        """
+        Baixa o arquivo remoto, continuando do arquivo parcial somente se
+        o tamanho do remoto é conhecido; senão, baixa-o novamente
+        """
+        offset = result.partial_size
+        if result.remote_size is None or offset > result.remote_size:
+            offset = 0
+        mode = 'ab' if offset else 'wb'
+        result.transferred = False
+        with open(result.partial_file_path, mode) as fp:
+            def write(block):
+                fp.write(block)
+                result.downloaded += len(block)
+            r = ftp.retrbinary(
+                'RETR ' + remote_path, write, rest=offset or None)
         register_action(r)
-        file_path = os.path.join(local_path, file)
-        if os.path.exists(file_path):
+        result.transferred = r.startswith('226')
 
-            statinfo = os.stat(file_path)
-            register_action(str(statinfo.st_size))
+    def _finish(self, result):
+        """
+        Move o arquivo baixado da pasta de parciais para a pasta de destino
+        """
+        os.replace(result.partial_file_path, result.local_file_path)
+        if os.path.isfile(result.metadata_file_path):
+            os.unlink(result.metadata_file_path)
+        result.finished = True
 
-            downloaded_file = file
-            r = self.ftp.delete(file)
-            register_action(r)
-        return downloaded_file
+    def download_and_delete_file(self, local_file_path, remote_path,
+                                 remote_size=None, partial_file_path=None):
+        result = DownloadResult(
+            remote_path, local_file_path, remote_size, partial_file_path)
+        started = time.time()
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            result.error = None
+            try:
+                ftp = self._thread_connection(reconnect=attempt > 0)
+                if attempt == 0:
+                    result.remote_mtime = self.remote_mtime(ftp, remote_path)
+                    self._prepare_partial_file(result)
+                if not result.finished:
+                    if not result.is_downloaded:
+                        self._retrieve(ftp, remote_path, result)
+                    if result.is_downloaded:
+                        self._finish(result)
+                if result.is_complete:
+                    if result.remote_size is None:
+                        register_action(
+                            remote_path + ': size was not verified')
+                        if attempt > 0:
+                            # sem o tamanho, não há como garantir que
+                            # a cópia local, obtida após uma falha,
+                            # está completa: mantém o arquivo remoto
+                            register_action(
+                                remote_path + ': not deleted')
+                            break
+                    r = ftp.delete(remote_path)
+                    register_action(r)
+                    result.deleted = True
+                    break
+                result.error = 'size mismatch: {} != {}'.format(
+                    result.partial_size, result.remote_size)
+            except all_errors as e:
+                result.error = str(e)
+            register_action(
+                '{} (attempt {}): {}'.format(
+                    remote_path, result.attempts, result.error))
+        result.seconds = time.time() - started
+        register_action(str(result))
+        return result
 
     def list_content(self, path_in_ftp_server):
-        r = self.ftp.login(self.user, self.pswd)
-        register_action(r)
-        files_list = self.list_content_of_files_of_subdir(path_in_ftp_server)
-
-        r = self.ftp.close()
+        self.ftp = self.connect()
+        try:
+            files_list = [
+                path for path, size in self.list_packages(
+                    self.ftp, path_in_ftp_server)]
+        finally:
+            self.ftp.close()
         register_action('ftp finished')
 
         encoding.display_message(';\n'.join(files_list))
         return files_list
 
-    def list_content_of_files_of_subdir(self, path_in_ftp_server):
-        levels = len(path_in_ftp_server.split('/'))
-        items_in_ftp = []
-        # go to ftp directory
-        register_action('go to ' + path_in_ftp_server)
-        r = self.ftp.cwd(path_in_ftp_server)
-        register_action(r)
 
-        # download files
-        files_or_folders = self.ftp.nlst()
-        register_action('Files/Folders in FTP:' + '\n'.join(files_or_folders) + '\n' + str(len(files_or_folders)) + ' files/folders')
-        for folder_or_file in files_or_folders:
-            if os.path.isdir(folder_or_file):
-                items_in_ftp += self.list_content_of_files_of_subdir(folder_or_file)
-            else:
-                items_in_ftp.append(folder_or_file)
-            # up level
-        for i in range(0, levels):
-            r = self.ftp.cwd('..')
-            register_action(r)
-
-        register_action(r)
-        return items_in_ftp
+def local_file_name(path_in_ftp_server, remote_path, used_names=()):
+    """
+    Retorna o nome do arquivo local de `remote_path`: o caminho relativo a
+    `path_in_ftp_server`, com as subpastas separadas por "_", e, se já
+    usado, acrescido de um número
+    """
+    relative = remote_path[len(path_in_ftp_server.rstrip('/')):].lstrip('/')
+    name = relative.replace('/', '_')
+    root, ext = os.path.splitext(name)
+    i = 0
+    while name in used_names:
+        i += 1
+        name = '{}-{}{}'.format(root, i, ext)
+    return name
 
 
 def download_files(ftp_server, user, password, ftp_folder, destination_path):
@@ -1,49 +1,139 @@
 # coding=utf-8
+import os
+import re
+import subprocess
+import time
 
-from prodtools.utils import system
+
+RSYNC_TRANSFERRED_BYTES = re.compile(
+    r"Total transferred file size: ([\d,.]+) bytes")
+
+
+class TransferResult(object):
+    """
+    Resultado da transferência de uma pasta para um servidor
+    """
+
+    def __init__(self, server, source, dest):
+        self.server = server
+        self.source = source
+        self.dest = dest
+        self.command = None
+        self.exit_code = None
+        self.output = ''
+        self.bytes = 0
+        self.seconds = 0
+        self.attempts = 0
+
+    @property
+    def ok(self):
+        return self.exit_code == 0
+
+    def __str__(self):
+        return (
+            "{status} {server}: {source} => {dest} | exit code: {exit_code} "
+            "| {bytes} bytes | {seconds:.2f}s | attempts: {attempts}".format(
+                status="OK" if self.ok else "FAILURE",
+                server=self.server, source=self.source, dest=self.dest,
+                exit_code=self.exit_code, bytes=self.bytes,
+                seconds=self.seconds, attempts=self.attempts))
+
+
+def execute(args, timeout=None):
+    """
+    Executa o comando sem shell e retorna (exit code, saída)
+    """
+    try:
+        completed = subprocess.run(
+            args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            universal_newlines=True, timeout=timeout)
+    except (OSError, subprocess.SubprocessError) as e:
+        return 127, str(e)
+    return completed.returncode, completed.stdout
+
+
+def rsync_transferred_bytes(output):
+    found = RSYNC_TRANSFERRED_BYTES.search(output or '')
+    if found:
+        return int(re.sub(r"[,.]", "", found.group(1)))
+    return 0
 
 
 class RemoteServer(object):
+    """
+    `server` pode ser `host` ou `host:port`.
+    Se `server` for o caminho absoluto de uma pasta local, os caminhos de
+    destino são criados dentro desta pasta (útil para testes)
+    """
 
     def __init__(self, server, user, _logger=None):
         self.server = server
         self.user = user
         self.logger = _logger
         self.port = None
-        if ':' in server:
+        if ':' in server and not os.path.isabs(server):
             self.server, self.port = server.split(':')
 
-    def run_cmd(self, cmd):
-        if self.logger is not None:
-            self.logger.info(cmd)
-        try:
-            system.run_command(cmd)
-            if self.logger is not None:
-                self.logger.info('done')
-        except:
-            if self.logger is not None:
-                self.logger.error('failure')
-
     @property
-    def rsync_port_param(self):
-        return '' if self.port is None else ' -e "ssh -p {}" '.format(self.port)
+    def is_local(self):
+        return os.path.isabs(self.server)
 
-    @property
-    def scp_port_param(self):
-        return '' if self.port is None else ' -P {} '.format(self.port)
-
-    @property
-    def ssh_port_param(self):
-        return '' if self.port is None else ' -p {} '.format(self.port)
+    def target(self, dest):
+        if self.is_local:
+            return os.path.join(self.server, dest.lstrip('/'))
+        return self.user + '@' + self.server + ':' + dest
 
-    def run_remote_mkdirs(self, path):
-        cmd = 'ssh ' + self.user + '@' + self.server + self.ssh_port_param + ' "mkdir -p ' + path + '"'
-        self.run_cmd(cmd)
+    def mkdirs(self, path):
+        if self.is_local:
+            path = self.target(path)
+            try:
+                if not os.path.isdir(path):
+                    os.makedirs(path)
+            except OSError as e:
+                return 1, str(e)
+            return 0, ''
+        args = ['ssh']
+        if self.port is not None:
+            args.extend(['-p', self.port])
+        args.extend([self.user + '@' + self.server, 'mkdir -p ' + path])
+        return execute(args)
 
-    def run_rsync(self, source, dest):
-        cmd = 'nohup rsync ' + self.rsync_port_param + '-CrvK ' + source + '/* ' + self.user + '@' + self.server + ':' + dest + '&\n'
-        self.run_cmd(cmd)
+    def rsync_command(self, source, dest, copy_folder=False):
+        """
+        Com `copy_folder`, a pasta `source` é copiada para dentro de `dest`;
+        caso contrário, somente o conteúdo de `source`
+        """
+        args = ['rsync', '-CrK', '--stats']
+        if self.port is not None and not self.is_local:
+            args.extend(['-e', 'ssh -p {}'.format(self.port)])
+        if copy_folder:
+            args.append(source.rstrip('/'))
+        else:
+            args.append(source.rstrip('/') + '/')
+        args.append(self.target(dest))
+        return args
 
-    def run_scp(self, source, dest):
-        cmd = 'nohup scp ' + self.scp_port_param + '-r ' + source + ' ' + self.user + '@' + self.server + ':' + dest + '&\n'
-        self.run_cmd(cmd)
+    def transfer(self, source, dest, copy_folder=False, retries=2, backoff=1):
+        """
+        Transfere `source` para `dest`, tentando novamente em caso de falha
+        Retorna TransferResult
+        """
+        result = TransferResult(self.server, source, dest)
+        started = time.time()
+        for attempt in range(retries + 1):
+            result.attempts = attempt + 1
+            result.exit_code, result.output = self.mkdirs(dest)
+            if result.ok:
+                result.command = self.rsync_command(source, dest, copy_folder)
+                result.exit_code, result.output = execute(result.command)
+            if result.ok:
+                result.bytes = rsync_transferred_bytes(result.output)
+                break
+            if self.logger is not None:
+                self.logger.error(
+                    "%s (attempt %i): %s", self.server, result.attempts,
+                    result.output)
+            if attempt < retries:
+                time.sleep(backoff * 2 ** attempt)
+        result.seconds = time.time() - started
+        return result
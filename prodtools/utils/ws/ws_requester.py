@@ -64,6 +64,48 @@ def try_request(url, timeout=30, debug=False, force_error=False):
     return (response, http_error_proxy_auth, error_message)
 
 
+def try_conditional_request(url, etag=None, last_modified=None, timeout=30):
+    """
+    Faz a requisição enviando If-None-Match / If-Modified-Since
+    Retorna (status, conteúdo, headers, http_error_proxy_auth, error_message)
+    status 304 indica que o conteúdo não mudou
+    """
+    req = Request(url)
+    if etag:
+        req.add_header('If-None-Match', etag)
+    if last_modified:
+        req.add_header('If-Modified-Since', last_modified)
+    status = None
+    response = None
+    headers = {}
+    http_error_proxy_auth = None
+    error_message = ''
+    try:
+        r = urlopen(req, timeout=timeout)
+        status = r.getcode()
+        headers = dict(r.headers.items())
+        response = encoding.decode(r.read())
+    except HTTPError as e:
+        status = e.code
+        if e.code == 304:
+            headers = dict(e.headers.items())
+        else:
+            if e.code == 407:
+                http_error_proxy_auth = e.code
+            error_message = e.read()
+    except URLError as e:
+        if '10061' in str(e.reason):
+            http_error_proxy_auth = e.reason
+        error_message = 'URLError'
+    except Exception as e:
+        error_message = 'Unknown: ' + str(e)
+    if error_message != '':
+        encoding.debugging(
+            'ws_requester.try_conditional_request()',
+            (url, error_message, status, http_error_proxy_auth))
+    return (status, response, headers, http_error_proxy_auth, error_message)
+
+
 class WebServicesRequester(object):
 
     def __init__(self, active=True, proxy_data=None):
@@ -102,6 +144,24 @@ class WebServicesRequester(object):
             self.requests[url] = response
         return response
 
+    def conditional_request(self, url, etag=None, last_modified=None,
+                            timeout=30):
+        """
+        Retorna (status, conteúdo, headers)
+        Não usa o cache de `self.requests`, pois o objetivo é saber se o
+        conteúdo remoto mudou
+        """
+        if self.active is False:
+            return (None, None, {})
+        status, response, headers, http_error_proxy_auth, error_message = \
+            try_conditional_request(url, etag, last_modified, timeout)
+        if http_error_proxy_auth is not None and self.proxy_info is not None:
+            self.proxy_info = ws_proxy.ask_data(self.proxy_info.server, self.proxy_info.port)
+            ws_proxy.registry_proxy_opener(self.proxy_info.handler_data)
+            status, response, headers, http_error_proxy_auth, error_message = \
+                try_conditional_request(url, etag, last_modified, timeout)
+        return (status, response, headers)
+
     def json_result_request(self, url, timeout=30, debug=False):
         if self.active is False:
             return None
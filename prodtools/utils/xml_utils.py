@@ -1,7 +1,10 @@
 # coding=utf-8
 import os
+import re
 import html
-from io import StringIO
+import functools
+import threading
+from io import StringIO, BytesIO
 
 from lxml import etree
 
@@ -49,15 +52,35 @@ class Entity2Char:
         ('&gt;', '<REPLACEENT>gt</REPLACEENT>'),
         ('&amp;gt;', '<REPLACEENT>gt</REPLACEENT>'),
     )
+    LT_GT_REPLACEMENTS = dict(LT + GT)
+    LT_GT_ENTITIES = re.compile(
+        "|".join(re.escape(find) for find, replace in LT + GT))
+
+    # trecho iniciado por "&" até o próximo espaço, tab, quebra de linha ou
+    # "<", caracteres que não fazem parte de entidades, ou seja, a conversão
+    # de um trecho independe do restante do conteúdo
+    ENTITIES_TEXT = re.compile('&[^\t\n\f <]*')
 
     def __init__(self):
-        pass
+        self._converted = functools.lru_cache(maxsize=4096)(
+            self._convert_entities)
 
     def convert(self, content):
+        """
+        Converte as entidades percorrendo o conteúdo uma única vez
+        e convertendo apenas os trechos que as contêm
+        """
         if '&' not in content:
             return content
-        for find, replace in self.LT + self.GT:
-            content = content.replace(find, replace)
+        return self.ENTITIES_TEXT.sub(
+            lambda match: self._converted(match.group()), content)
+
+    def _convert_entities(self, content):
+        """
+        Converte as entidades de `content`, mantendo lt e gt
+        """
+        content = self.LT_GT_ENTITIES.sub(
+            lambda match: self.LT_GT_REPLACEMENTS[match.group()], content)
         content = html.unescape(content)
         content = html.unescape(content)
         if "&" in content:
@@ -107,6 +130,47 @@ class Entity2Char:
 entity2char = Entity2Char()
 
 
+# espaços em sequência ou outros caracteres de espaço, que não " "
+SPACES_TO_NORMALIZE = re.compile(r"\s\s|[^\S ]")
+XML_DECLARATION_ENCODING = re.compile(
+    br"""^\s*<\?xml[^>]*?encoding\s*=\s*["']([A-Za-z0-9._-]+)["']""")
+
+
+def xml_declared_encoding(content):
+    """
+    Retorna a codificação declarada em `<?xml ... encoding="..."?>`
+    no início de `content` (bytes) ou None
+    """
+    match = XML_DECLARATION_ENCODING.match(content[:200])
+    if match:
+        return match.group(1).decode("ascii")
+
+
+def read_xml_file(file_path):
+    """
+    Lê o arquivo uma única vez e retorna seu conteúdo decodificado como
+    utf-8 ou, se não for possível, com a codificação declarada no XML ou
+    iso-8859-1 (com as quebras de linha como na leitura em modo texto)
+    """
+    with open(file_path, "rb") as fp:
+        content = fp.read()
+    try:
+        text = content.decode("utf-8")
+    except UnicodeError:
+        text = None
+        declared = xml_declared_encoding(content)
+        if declared:
+            try:
+                text = content.decode(declared)
+            except (LookupError, UnicodeError):
+                pass
+        if text is None:
+            text = content.decode("iso-8859-1")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
 class SuitableXML(object):
     """
     XML adequado / aceitável
@@ -127,11 +191,7 @@ class SuitableXML(object):
         self.filename = None
         if os.path.isfile(str_or_filepath):
             self.filename = str_or_filepath
-            try:
-                str_or_filepath = fs_utils.read_file(self.filename)
-            except UnicodeError:
-                str_or_filepath = fs_utils.read_file(
-                    self.filename, encode="iso-8859-1")
+            str_or_filepath = read_xml_file(self.filename)
         self.original = str_or_filepath
         self.content = str_or_filepath
 
@@ -180,7 +240,8 @@ class SuitableXML(object):
         xml_content = self._content
         # padroniza os espaços, necessário pois há casos em que
         # foram inseridos quebras de linha dentro de conteúdo de elementos
-        xml_content = " ".join([word for word in xml_content.split() if word])
+        if SPACES_TO_NORMALIZE.search(xml_content):
+            xml_content = " ".join(xml_content.split())
 
         # remove "junk" (texto após a última tag)
         if not xml_content.endswith('>'):
@@ -258,18 +319,39 @@ def get_xml_object(file_path, xml_parser=None):
     """
     parser = xml_parser
     if parser is None:
-        parser = etree.XMLParser(remove_blank_text=True)
+        parser = get_parser(remove_blank_text=True)
     return etree.parse(file_path, parser)
 
 
+# compartilhado pelas threads (a XSL compilada pode ser aplicada
+# simultaneamente por várias threads)
+_xslt_cache = {}
+_xslt_cache_lock = threading.Lock()
+
+
+def get_xslt(xsl_file_path):
+    """
+    Retorna a XSL compilada, que é mantida em memória (pelo processo)
+    enquanto o arquivo não for alterado
+    """
+    path = os.path.abspath(xsl_file_path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime, stat.st_size)
+    with _xslt_cache_lock:
+        xslt = _xslt_cache.get(key)
+        if xslt is None:
+            for k in [k for k in _xslt_cache.keys() if k[0] == path]:
+                del _xslt_cache[k]
+            xslt = _xslt_cache[key] = etree.XSLT(etree.parse(path))
+    return xslt
+
+
 def transform(xml_obj, xsl_file_path):
     """
     Aplica uma XSL dada pelo arquivo em uma árvore de XML
     O resutado é um `lxml.etree._XSLTResultTree`
     """
-    xslt_doc = etree.parse(xsl_file_path)
-    XSLT = etree.XSLT(xslt_doc)
-    return XSLT(xml_obj)
+    return get_xslt(xsl_file_path)(xml_obj)
 
 
 def validate(xml_obj, dtd_external_id=None, dtd_file_path=None):
@@ -370,6 +452,30 @@ def tostring(node, pretty_print=False, with_tail=False):
                 ))
 
 
+_parsers = threading.local()
+
+
+def get_parser(remove_blank_text=False, recover=False, validate=False):
+    """
+    Retorna o `etree.XMLParser` com as opções dadas, criado uma única vez
+    por thread e reusado nas chamadas seguintes
+    (uma instância de parser não pode ser usada por threads simultâneas)
+    """
+    key = (bool(remove_blank_text), bool(recover), bool(validate))
+    parsers = getattr(_parsers, "items", None)
+    if parsers is None:
+        parsers = _parsers.items = {}
+    parser = parsers.get(key)
+    if parser is None:
+        parser = parsers[key] = etree.XMLParser(
+            remove_blank_text=remove_blank_text,
+            resolve_entities=True,
+            recover=recover,
+            dtd_validation=validate
+        )
+    return parser
+
+
 def load_xml(str_or_filepath, remove_blank_text=False, validate=False, recover=False):
     """
     Retorna uma árvore de XML e erros (se ocorrer ao carregá-lo)
@@ -379,12 +485,7 @@ def load_xml(str_or_filepath, remove_blank_text=False, validate=False, recover=F
     remove_blank_text:
         remove os espaços entre dois elementos
     """
-    parser = etree.XMLParser(
-        remove_blank_text=remove_blank_text,
-        resolve_entities=True,
-        recover=recover,
-        dtd_validation=validate
-    )
+    parser = get_parser(remove_blank_text, recover, validate)
     try:
         xml = None
         errors = None
@@ -400,7 +501,8 @@ def load_xml(str_or_filepath, remove_blank_text=False, validate=False, recover=F
             if str_or_filepath.startswith('<?') and '?>' in str_or_filepath:
                 str_or_filepath = str_or_filepath[str_or_filepath.find(
                     '?>')+2:].strip()
-            xml = etree.parse(StringIO(str_or_filepath), parser)
+            xml = etree.parse(
+                BytesIO(encoding.encode(str_or_filepath)), parser)
     except (etree.XMLSyntaxError,
             FileNotFoundError,
             ValueError, TypeError) as e:
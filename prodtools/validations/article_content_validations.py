@@ -237,7 +237,7 @@ class ArticleContentValidation(object):
 
     @property
     def dtd_version(self):
-        return data_validations.is_expected_value('@dtd-version', self.article.dtd_version, xml_versions.valid_dtd_items)
+        return data_validations.is_expected_value('@dtd-version', self.article.dtd_version, xml_versions.valid_dtd_items())
 
     @property
     def article_type(self):
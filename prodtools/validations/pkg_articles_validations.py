@@ -41,7 +41,7 @@ class PkgArticlesValidationsReports(object):
         return items
 
     @property
-    def detailed_report(self):
+    def detailed_report_labels(self):
         labels = [_('filename'), 'order', _('article'), 'aop pid/related', _('reports')]
         widths = {}
         widths[_('filename')] = '10'
@@ -49,29 +49,60 @@ class PkgArticlesValidationsReports(object):
         widths[_('article')] = '60'
         widths['aop pid/related'] = '10'
         widths[_('reports')] = '10'
+        return labels, widths
+
+    def detailed_report_values(self, new_name):
+        a_validations = self.pkg_articles_validations[new_name]
+        values = []
+        values.append(new_name)
+        if a_validations.article_display_report is None:
+            values.append('')
+            values.append('')
+            values.append('')
+        else:
+            article = a_validations.article_display_report.article
+            values.append(article.order)
+            values.append(a_validations.article_display_report.table_of_contents)
+            related = {}
+            for k, v in {'article-id(previous-pid)': article.previous_pid, 'related': [item.get('xml', '') for item in article.related_articles]}.items():
+                if v is not None:
+                    if len(v) > 0:
+                        related[k] = v
+            values.append(related)
+        return values
+
+    @property
+    def detailed_report(self):
+        labels, widths = self.detailed_report_labels
         items = []
         for new_name, a_validations in sorted(self.pkg_articles_validations.items()):
             hide_and_show_block_items = a_validations.hide_and_show_block('view-reports-', new_name)
-            values = []
-            values.append(new_name)
-            if a_validations.article_display_report is None:
-                values.append('')
-                values.append('')
-                values.append('')
-            else:
-                article = a_validations.article_display_report.article
-                values.append(article.order)
-                values.append(a_validations.article_display_report.table_of_contents)
-                related = {}
-                for k, v in {'article-id(previous-pid)': article.previous_pid, 'related': [item.get('xml', '') for item in article.related_articles]}.items():
-                    if v is not None:
-                        if len(v) > 0:
-                            related[k] = v
-                values.append(related)
-            items.append((values, hide_and_show_block_items))
+            items.append((self.detailed_report_values(new_name), hide_and_show_block_items))
         report = html_reports.HideAndShowBlocksReport(labels, items, html_cell_content=[_('article')], widths=widths)
         return report.content
 
+    def detailed_report_index(self, page_links):
+        """
+        Versão leve de `detailed_report`: os relatórios de cada documento
+        ficam em páginas próprias (ver `articles_blocks`) e `page_links`
+        contém os links para elas (new_name: links)
+        """
+        labels, widths = self.detailed_report_labels
+        items = []
+        for new_name in sorted(self.pkg_articles_validations.keys()):
+            values = self.detailed_report_values(new_name)
+            values.append(page_links.get(new_name, ''))
+            items.append(html_reports.label_values(labels, values))
+        return html_reports.sheet(labels, items, table_style='reports-sheet', html_cell_content=[_('article'), labels[-1]], widths=widths)
+
+    def articles_blocks(self):
+        """
+        Gera, um documento por vez, (new_name, HideAndShowBlock) com os
+        relatórios do documento
+        """
+        for new_name, a_validations in sorted(self.pkg_articles_validations.items()):
+            yield new_name, a_validations.hide_and_show_block('view-reports-', new_name)
+
     @property
     def validations(self):
         _validations = list(self.pkg_articles_validations.values())
@@ -73,7 +73,7 @@ class PackageEvaluator(object):
     def evaluate(self):
         return PackageEvaluationResult(
             group_validations_report=self.group_validations_report,
-            individual_validations_report=self.pkg_validations_reports.detailed_report,
+            pkg_validations_reports=self.pkg_validations_reports,
             xml_file_paths=self.xml_file_paths,
             blocking_errors=self.blocking_errors,
             merging_result_reports=self.merging_reports.errors_reports,
@@ -83,12 +83,12 @@ class PackageEvaluator(object):
 
 class PackageEvaluationResult(object):
 
-    def __init__(self, group_validations_report, individual_validations_report,
+    def __init__(self, group_validations_report, pkg_validations_reports,
                  xml_file_paths,
                  blocking_errors, merging_result_reports, docs_merger
                  ):
         self.group_validations_report = group_validations_report
-        self.individual_validations_report = individual_validations_report
+        self.pkg_validations_reports = pkg_validations_reports
         self.blocking_errors = blocking_errors
         self.merging_result_reports = merging_result_reports
         self.excluded_orders = docs_merger.excluded_orders
@@ -99,6 +99,13 @@ class PackageEvaluationResult(object):
         self.accepted_xml_files = [xml_file_paths[k]
                                    for k in self.accepted_articles.keys()]
 
+    @property
+    def individual_validations_report(self):
+        if not hasattr(self, '_individual_validations_report'):
+            self._individual_validations_report = (
+                self.pkg_validations_reports.detailed_report)
+        return self._individual_validations_report
+
 
 class DocsMergingReports(object):
 
@@ -16,8 +16,10 @@ from . import validations as validations_module
 
 class ReportsMaker(object):
 
-    def __init__(self, pkg, pkg_eval_result, assets_in_report, stage, xpm_version=None, conversion=None):
+    def __init__(self, pkg, pkg_eval_result, assets_in_report, stage, xpm_version=None, conversion=None, paginated=False):
         self.pkg_eval_result = pkg_eval_result
+        # os relatórios de cada documento ficam em páginas próprias
+        self.paginated = paginated
         self.conversion = conversion
         self.xpm_version = xpm_version
         self.stage = stage
@@ -50,6 +52,10 @@ class ReportsMaker(object):
             'website': _('Website'),
         }
         self.validations = validations_module.ValidationsResult()
+        # links para as páginas dos documentos e quantidade de erros nelas,
+        # obtidos ao gravá-las (ver `save_articles_reports`)
+        self._articles_pages_links = None
+        self._articles_numbers = {}
 
     @property
     def report_components(self):
@@ -65,7 +71,8 @@ class ReportsMaker(object):
         if self.conversion is not None:
             components['xc-validations'] = self.xc_validations
 
-        self.validations.message = ''.join(list(components.values()))
+        self.validations.message = ''.join(components.values())
+        self.validations.add_numbers(self._articles_numbers)
 
         components['summary-report'] += error_msg_subtitle() + self.validations.statistics_display(False)
         if self.conversion is not None:
@@ -86,8 +93,33 @@ class ReportsMaker(object):
 
     @property
     def individual_validations_report(self):
+        if self.paginated:
+            return self.pkg_eval_result.pkg_validations_reports.detailed_report_index(
+                self.articles_pages_links)
         return self.pkg_eval_result.individual_validations_report
 
+    @property
+    def articles_pages_links(self):
+        """
+        Links para as páginas dos documentos (new_name: links), que são
+        gravadas se ainda não o foram
+        """
+        if self._articles_pages_links is None:
+            self.save_articles_reports()
+        return self._articles_pages_links
+
+    @property
+    def articles_reports_location(self):
+        return os.path.splitext(self.report_location)[0] + '_articles'
+
+    def article_report_location(self, new_name):
+        return os.path.join(self.articles_reports_location, new_name + '.html')
+
+    def article_report_link(self, new_name):
+        return '/'.join(
+            [os.path.basename(self.articles_reports_location),
+             new_name + '.html'])
+
     @property
     def aff_report(self):
         return self.pkg_articles_data_report.articles_affiliations_report
@@ -148,17 +180,66 @@ class ReportsMaker(object):
             os.path.basename(self.report_location))
 
     def save_report(self, display=True):
-        html_reports.save(
-            self.report_location, self.report_title, self.content, self.stage)
+        """
+        Grava as páginas dos documentos, se `paginated`, e o relatório,
+        uma aba por vez, sem montar o documento inteiro em memória
+        (ver `content`)
+        """
+        self.save_articles_reports()
+        components = self.report_components
+        footnote = self.footnote
+        has_math = any(
+            [html_reports.has_math_content(c)
+             for c in list(components.values()) + [footnote]])
+        tabbed_report = html_reports.TabbedReport(
+            self.labels, self.tabs, components, self.tab)
+        with html_reports.ReportWriter(
+                self.report_location, self.report_title, has_math) as writer:
+            tabbed_report.write(writer, self.replace_assets_paths)
+            writer.write(footnote)
         if display is True:
             html_reports.display_report(self.report_location)
         msg = _('Saved report: {f}').format(f=self.report_location)
         encoding.display_message(msg)
 
+    def save_articles_reports(self):
+        """
+        Grava a página de cada documento assim que é gerada, sem mantê-las
+        em memória: guarda somente os links para o índice e a quantidade
+        de erros. As páginas de uma execução anterior são removidas
+        """
+        if os.path.isdir(self.articles_reports_location):
+            shutil.rmtree(self.articles_reports_location)
+        self._articles_pages_links = {}
+        self._articles_numbers = {}
+        if not self.paginated:
+            return
+        back = html_reports.tag('p', html_reports.link(
+            '../' + os.path.basename(self.report_location),
+            self.report_title or os.path.basename(self.report_location)))
+        reports = self.pkg_eval_result.pkg_validations_reports
+        for name, block in reports.articles_blocks():
+            self._articles_pages_links[name] = block.page_links(
+                self.article_report_link(name))
+            content = label_errors(block.page_content)
+            for status, number in validations_module.content_numbers(
+                    content).items():
+                self._articles_numbers[status] = (
+                    self._articles_numbers.get(status, 0) + number)
+            with html_reports.ReportWriter(
+                    self.article_report_location(name),
+                    [self.report_title or '', name],
+                    html_reports.has_math_content(content)) as writer:
+                writer.write(back)
+                writer.write(self.replace_assets_paths(content))
+
     @property
     def content(self):
         tabbed_report = html_reports.TabbedReport(self.labels, self.tabs, self.report_components, self.tab)
-        content = tabbed_report.report_content
+        content = self.replace_assets_paths(tabbed_report.report_content)
+        return content + self.footnote
+
+    def replace_assets_paths(self, content):
         origin = ['{IMG_PATH}', '{PDF_PATH}', '{XML_PATH}', '{RES_PATH}', '{REP_PATH}']
         replac = [self.assets_in_report.img_link,
                   self.assets_in_report.pdf_link,
@@ -167,7 +248,7 @@ class ReportsMaker(object):
                   self.assets_in_report.report_path]
         for o, r in zip(origin, replac):
             content = content.replace(o, r or '')
-        return content + self.footnote
+        return content
 
     @property
     def processing_result_location(self):
@@ -329,6 +410,15 @@ class CollectionAssetsInReport(object):
         if not os.path.isdir(self.serial_report_path):
             os.makedirs(self.serial_report_path)
         shutil.copy(report_file_path, self.serial_report_path)
+        articles_reports_path = (
+            os.path.splitext(report_file_path)[0] + '_articles')
+        if os.path.isdir(articles_reports_path):
+            dest = os.path.join(
+                self.serial_report_path,
+                os.path.basename(articles_reports_path))
+            if os.path.isdir(dest):
+                shutil.rmtree(dest)
+            shutil.copytree(articles_reports_path, dest)
 
         if self.web_url:
             # se há o site remoto, os xml não estão acessíveis mesmo
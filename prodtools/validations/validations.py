@@ -62,10 +62,15 @@ class ValidationsResult(object):
         self.calculate_numbers()
 
     def calculate_numbers(self):
-        for status, style_checker_error_type in zip(validation_status.STATUS_LEVEL_ORDER, validation_status.STYLE_CHECKER_ERROR_TYPES):
-            self.numbers[status] = self.message.count(status)
-            if style_checker_error_type != '':
-                self.numbers[status] += number_after_words(self.message, style_checker_error_type)
+        self.numbers.update(content_numbers(self.message))
+
+    def add_numbers(self, numbers):
+        """
+        Soma às quantidades da mensagem as de um conteúdo que não faz parte
+        dela (ver `content_numbers`)
+        """
+        for status, number in numbers.items():
+            self.numbers[status] = self.numbers.get(status, 0) + number
 
     def total(self):
         return sum([item for item in self.numbers.values()])
@@ -131,6 +136,18 @@ class ValidationsFile(ValidationsResult):
             self._message = ''
 
 
+def content_numbers(content):
+    """
+    Retorna a quantidade de mensagens de cada tipo (status) em `content`
+    """
+    numbers = {}
+    for status, style_checker_error_type in zip(validation_status.STATUS_LEVEL_ORDER, validation_status.STYLE_CHECKER_ERROR_TYPES):
+        numbers[status] = content.count(status)
+        if style_checker_error_type != '':
+            numbers[status] += number_after_words(content, style_checker_error_type)
+    return numbers
+
+
 def number_after_words(content, text='Total of errors = '):
     n = 0
     if text in content:
@@ -163,7 +163,9 @@ class Reception(object):
         except (IndexError, TypeError):
             package_name = None
 
-        package_maker = PackageMaker(source, output, optimise=optimise, package_name=package_name)
+        package_maker = PackageMaker(
+            source, output, optimise=optimise, package_name=package_name,
+            max_loaded_articles=self.proc.config.max_loaded_articles)
         return package_maker.pack()
 
     def convert_package(self, package_path, optimise=False):
@@ -296,6 +298,8 @@ class Reception(object):
         temp_path = os_path_join(temp_path, proc_id)
         queue_path = os_path_join(queue_path, proc_id)
         pkg_paths = []
+        # os pacotes arquivados não são reescritos e o temporário é removido
+        propagation = fs_utils.FilesPropagation(hardlinks=True)
 
         for path in (temp_path, queue_path):
             if os.path.isdir(path):
@@ -323,7 +327,7 @@ class Reception(object):
             if archive_path:
                 if not os.path.isdir(archive_path):
                     os.makedirs(archive_path)
-                shutil.copy(tmp_pkg_path, archive_path)
+                propagation.propagate(tmp_pkg_path, archive_path)
 
             extracted = fs_utils.extract_package(tmp_pkg_path, queued_pkg_path)
             if extracted:
@@ -338,6 +342,7 @@ class Reception(object):
                 invalid_pkg_files.append(pkg_name)
                 fs_utils.delete_file_or_folder(queued_pkg_path)
         fs_utils.delete_file_or_folder(temp_path)
+        logger.info("Archived packages: %s", propagation)
 
         return (pkg_paths, invalid_pkg_files)
 
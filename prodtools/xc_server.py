@@ -3,7 +3,6 @@ import logging
 import logging.config
 import argparse
 
-from prodtools import xc
 from prodtools.utils.logging_config import LOGGING_CONFIG
 
 
@@ -35,6 +34,9 @@ def main():
     call_gerapadrao = args.gerapadrao
     optimise = args.optimise
 
+    # importado apenas aqui, para que --help e erros de uso sejam rápidos
+    from prodtools import xc
+
     reception = xc.Reception(collection_acron)
 
     if call_download:
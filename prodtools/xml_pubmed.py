@@ -4,8 +4,10 @@ import logging.config
 import sys
 import os
 import argparse
+import json
 import shutil
-import tkinter as tk
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 """
 Usado pelo scielo/xml_scielo/...
@@ -81,6 +83,7 @@ def load_articles(filenames):
 class InputForm(object):
 
     def __init__(self, tkFrame, default_path):
+        import tkinter as tk
 
         self.tkFrame = tkFrame
         self.selected_xml_folder = None
@@ -172,7 +175,13 @@ class InputForm(object):
 
 class IssueStuff(object):
 
-    def __init__(self, ucisis, issue_path, from_date, final_date):
+    def __init__(self, ucisis, issue_path, from_date, final_date,
+                 read_only=False):
+        """
+        read_only (bool): lê a base do número no próprio local, sem copiá-la
+            para a pasta temporária e sem atualizar seus índices
+        """
+        self.read_only = read_only
         self.from_date = from_date
         self.final_date = final_date
         self.ucisis = ucisis
@@ -204,14 +213,20 @@ class IssueStuff(object):
         self.pubmed_folder_in_acron = os.path.join(
             self.serial_path, self.acron, 'PubMed')
 
-        for ext in ('.mst', '.xrf'):
-            shutil.copyfile(
-                self.articles_db_filename + ext, self.tmp_db_filename + ext)
+        if read_only:
+            self.tmp_db_filename = self.articles_db_filename
+        else:
+            for ext in ('.mst', '.xrf'):
+                shutil.copyfile(
+                    self.articles_db_filename + ext,
+                    self.tmp_db_filename + ext)
 
     @property
     def articles_metadata(self):
         if self._articles_meta is None:
-            self._articles_meta = ArticlesDB(self.ucisis, self.tmp_db_filename).articles(self.from_date, self.final_date)
+            self._articles_meta = ArticlesDB(
+                self.ucisis, self.tmp_db_filename, self.read_only).articles(
+                    self.from_date, self.final_date)
         return self._articles_meta
 
     @property
@@ -224,16 +239,29 @@ class IssueStuff(object):
 
 class ArticlesDB(object):
 
-    def __init__(self, ucisis, db_filename):
+    def __init__(self, ucisis, db_filename, read_only=False):
 
         self.isis_db = None
         self.db_filename = db_filename
+        self.read_only = read_only
         if os.path.isfile(db_filename + '.mst'):
             self.isis_db = ucisis
-            self.isis_db.update_indexes(db_filename, FST_ARTICLE)
+            if not read_only:
+                self.isis_db.update_indexes(db_filename, FST_ARTICLE)
         else:
             print('Not found: ' + db_filename)
 
+    def _issue_and_articles_records(self):
+        if self.read_only:
+            # sem índices: lê todos os registros (na ordem do MFN) e
+            # seleciona os mesmos que 'tp=i or tp=h'
+            return [
+                record
+                for record in self.isis_db.get_records(self.db_filename)
+                if record.get('706') in ('i', 'h')
+            ]
+        return self.isis_db.get_records(self.db_filename, 'tp=i or tp=h')
+
     def articles(self, from_date=None, final_date=None):
         items = {}
         int_from_date = 0
@@ -246,8 +274,7 @@ class ArticlesDB(object):
             if final_date != '':
                 int_final_date = int(final_date)
         if self.isis_db is not None:
-            h_records = self.isis_db.get_records(
-                self.db_filename, 'tp=i or tp=h')
+            h_records = self._issue_and_articles_records()
             #h_records = [record for record in h_records if record.get('706') in 'ih']
 
             issn_id = h_records[0].get('35')
@@ -386,6 +413,83 @@ class PubMedXMLMaker(object):
                     os.path.join(self.issue_stuff.temp_path, item))
 
 
+def get_ucisis():
+    config = xc_config.Configuration()
+    return dbm_isis.UCISIS(
+        dbm_isis.CISIS(config.cisis1030), dbm_isis.CISIS(config.cisis1660))
+
+
+def export_issue(issue_path, from_date, final_date, debug=False):
+    """
+    Gera o XML PubMed de um número, lendo sua base sem copiá-la.
+    Executado nos processos de `PubMedBatch`, por isso nunca levanta exceção
+    """
+    started = time.time()
+    result = {"issue_path": issue_path, "status": "failed"}
+    try:
+        if not os.path.isdir(issue_path):
+            raise ValueError(_('issue path is not a folder'))
+        ucisis = get_ucisis()
+        if not ucisis.is_available:
+            raise ValueError(_('cisis expected'))
+        issue_stuff = IssueStuff(
+            ucisis, issue_path, from_date, final_date, read_only=True)
+        pubmed_xml_maker = PubMedXMLMaker(issue_stuff, XSL)
+        pubmed_xml_maker.debug = debug
+        pubmed_xml_maker.execute_procedures()
+        result["articles"] = len(issue_stuff.articles_metadata or {})
+        result["pubmed_filename"] = pubmed_xml_maker.pubmed_filename
+        result["status"] = "done"
+    except Exception as e:
+        logger.exception("PubMed %s: %s", issue_path, e)
+        result["error"] = str(e)
+    result["seconds"] = round(time.time() - started, 3)
+    return result
+
+
+class PubMedBatch(object):
+    """
+    Gera um XML PubMed para cada número de `issues_paths`,
+    em processos paralelos
+    """
+
+    def __init__(self, issues_paths, from_date, final_date, max_workers=None,
+                 debug=False):
+        self.issues_paths = issues_paths
+        self.from_date = from_date
+        self.final_date = final_date
+        self.max_workers = max_workers
+        self.debug = debug
+
+    def _export(self):
+        args = [
+            (issue_path, self.from_date, self.final_date, self.debug)
+            for issue_path in self.issues_paths
+        ]
+        if self.max_workers == 1 or len(args) < 2:
+            return [export_issue(*item) for item in args]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(export_issue, *zip(*args)))
+
+    def run(self):
+        started = time.time()
+        results = self._export()
+        seconds = time.time() - started
+        return {
+            "issues": len(results),
+            "done": len([r for r in results if r["status"] == "done"]),
+            "failed": len([r for r in results if r["status"] != "done"]),
+            "seconds": round(seconds, 3),
+            "issues_seconds": round(sum(r["seconds"] for r in results), 3),
+            "results": results,
+        }
+
+
+def read_issues_list(filename):
+    with open(filename) as fp:
+        return [line.strip() for line in fp if line.strip()]
+
+
 def main():
 
     parser = argparse.ArgumentParser(description='XML PubMed cli utility')
@@ -403,11 +507,35 @@ def main():
     parser.add_argument('--debug', action='store_true',
                         help='to register log')
     parser.add_argument('--loglevel', default='WARNING')
+    parser.add_argument(
+        '--issues', default='',
+        help='file which contains a list of issue directories (one per line)'
+             ' to export in batch. Their databases are read in place')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of processes for --issues')
+    parser.add_argument('--summary', default='',
+                        help='file to save the --issues summary (JSON)')
 
     args = parser.parse_args()
 
     logger.setLevel(args.loglevel.upper())
 
+    if args.issues:
+        summary = PubMedBatch(
+            read_issues_list(args.issues), args.from_date, args.final_date,
+            args.workers, args.debug).run()
+        if args.summary:
+            with open(args.summary, "w") as fp:
+                json.dump(summary, fp, indent=2)
+        for result in summary["results"]:
+            print("{} {} {}s {}".format(
+                result["status"], result["issue_path"], result["seconds"],
+                result.get("pubmed_filename") or result.get("error")))
+        print("{} issues: {} done, {} failed, {}s".format(
+            summary["issues"], summary["done"], summary["failed"],
+            summary["seconds"]))
+        return
+
     issue_path = args.issue_path
     from_date = args.from_date
     final_date = args.final_date
@@ -443,6 +571,9 @@ def main():
 
 
 def read_form_inputs(default_path=None):
+    # importado apenas quando o formulário é usado
+    import tkinter as tk
+
     tk_root = tk.Tk()
     tk_root.title('XML 2 PubMed')
 
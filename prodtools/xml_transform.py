@@ -9,7 +9,6 @@ parameters:
     - transfErrorFileName
 """
 from __future__ import print_function, unicode_literals
-import argparse
 import os
 import logging
 from logging.config import dictConfig
@@ -20,6 +19,7 @@ from prodtools.utils.xml_utils import (
 )
 
 from prodtools.utils.logging_config import LOGGING_CONFIG
+from prodtools.xml_transform_client import arguments_parser
 
 
 dictConfig(LOGGING_CONFIG)
@@ -28,38 +28,23 @@ logger = logging.getLogger()
 
 
 def main():
-    parser = argparse.ArgumentParser(
-        description='XML Transformer for Markup cli utility')
-    parser.add_argument(
-        "xml_filepath",
-        help="filesystem path to the XML")
-    parser.add_argument(
-        "xsl_filepath",
-        help="filesystem path to the XSL"
-    )
-    parser.add_argument(
-        "result_filepath",
-        help="filesystem path to the transformation result")
-    parser.add_argument(
-        "ctrl_filepath",
-        help="filesystem path to the control file"
-    )
-    parser.add_argument(
-        "err_filepath",
-        help="filesystem path to the error report")
-
-    parser.add_argument('--loglevel', default='WARNING')
-
+    parser = arguments_parser()
     args = parser.parse_args()
 
     logger.setLevel(args.loglevel.upper())
 
-    ctrl_filepath = args.ctrl_filepath
-    err_filepath = args.err_filepath
-    result_filepath = args.result_filepath
-    xml_filepath = args.xml_filepath
-    xsl_filepath = args.xsl_filepath
+    transform_file(
+        args.xml_filepath, args.xsl_filepath, args.result_filepath,
+        args.ctrl_filepath, args.err_filepath)
+
 
+def transform_file(xml_filepath, xsl_filepath, result_filepath,
+                   ctrl_filepath, err_filepath):
+    """
+    Aplica a XSL e grava o resultado (iso-8859-1), o arquivo de controle
+    e, se houver, o de erro.
+    Usado pelo comando e pelo servidor (`xml_transform_server`)
+    """
     for f in (ctrl_filepath, err_filepath, result_filepath):
         if os.path.exists(f):
             try:
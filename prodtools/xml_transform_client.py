@@ -0,0 +1,100 @@
+# coding=utf-8
+"""
+Cliente leve de `xml_transform_server`, com os mesmos parâmetros de
+`xml_transform`. Se o servidor não está disponível, faz a transformação
+localmente, como `xml_transform`; também quando o servidor recusa a
+requisição.
+
+O endereço do servidor é dado pela variável de ambiente
+PRODTOOLS_XML_TRANSFORM_SERVER (host:porta, padrão 127.0.0.1:52101)
+"""
+from __future__ import print_function, unicode_literals
+import argparse
+import json
+import os
+import socket
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 52101
+CONNECTION_TIMEOUT = 0.5
+# a transformação de documentos grandes pode demorar
+RESPONSE_TIMEOUT = 600
+
+FILEPATHS = (
+    "xml_filepath", "xsl_filepath", "result_filepath",
+    "ctrl_filepath", "err_filepath")
+
+
+def arguments_parser():
+    parser = argparse.ArgumentParser(
+        description='XML Transformer for Markup cli utility')
+    parser.add_argument(
+        "xml_filepath",
+        help="filesystem path to the XML")
+    parser.add_argument(
+        "xsl_filepath",
+        help="filesystem path to the XSL"
+    )
+    parser.add_argument(
+        "result_filepath",
+        help="filesystem path to the transformation result")
+    parser.add_argument(
+        "ctrl_filepath",
+        help="filesystem path to the control file"
+    )
+    parser.add_argument(
+        "err_filepath",
+        help="filesystem path to the error report")
+
+    parser.add_argument('--loglevel', default='WARNING')
+    return parser
+
+
+def server_address():
+    address = os.environ.get("PRODTOOLS_XML_TRANSFORM_SERVER")
+    if not address:
+        return DEFAULT_HOST, DEFAULT_PORT
+    host, _, port = address.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
+
+
+def request_transformation(paths, address=None):
+    """
+    Envia a requisição ao servidor
+    Retorna a resposta (dict) ou None se o servidor não está disponível
+    """
+    try:
+        conn = socket.create_connection(
+            address or server_address(), timeout=CONNECTION_TIMEOUT)
+    except (OSError, ValueError):
+        return None
+    try:
+        conn.settimeout(RESPONSE_TIMEOUT)
+        request = {
+            name: os.path.abspath(paths[name]) for name in FILEPATHS}
+        conn.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        response = conn.makefile("rb").readline()
+        response = json.loads(response.decode("utf-8"))
+        if not isinstance(response, dict) or "status" not in response:
+            return None
+        return response
+    except (OSError, ValueError):
+        return None
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    args = arguments_parser().parse_args(argv)
+    response = request_transformation(vars(args))
+    if response is None or response["status"] != "done":
+        # servidor indisponível ou requisição recusada
+        from prodtools import xml_transform
+        xml_transform.logger.setLevel(args.loglevel.upper())
+        xml_transform.transform_file(
+            *[getattr(args, name) for name in FILEPATHS])
+
+
+if __name__ == "__main__":
+    main()
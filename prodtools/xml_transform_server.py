@@ -0,0 +1,156 @@
+# coding=utf-8
+"""
+Servidor local (127.0.0.1) para `xml_transform`, que mantém o
+interpretador, o lxml e as XSL já compiladas em memória.
+As requisições são feitas por `xml_transform_client`, que tem os mesmos
+parâmetros de `xml_transform`.
+
+O servidor não tem autenticação: só aceita endereços locais (loopback) e
+só grava os arquivos de resultado na pasta do XML ou, se informadas,
+nas pastas de --allowed-path.
+
+Uso:
+    python -m prodtools.xml_transform_server [--port 52101] [--preload file.xsl]
+        [--allowed-path folder]
+"""
+from __future__ import print_function, unicode_literals
+import argparse
+import ipaddress
+import json
+import logging
+import os
+import socket
+import socketserver
+import time
+
+from prodtools import xml_transform
+from prodtools.utils.xml_utils import get_xslt
+from prodtools.xml_transform_client import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    FILEPATHS,
+)
+
+
+logger = logging.getLogger()
+
+INPUT_FILEPATHS = FILEPATHS[:2]
+OUTPUT_FILEPATHS = FILEPATHS[2:]
+
+
+def is_loopback(host):
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def is_inside(path, folder):
+    return os.path.commonpath([path, folder]) == folder
+
+
+def validate_paths(paths, allowed_paths=None):
+    """
+    Verifica os caminhos recebidos pelo servidor: devem ser absolutos,
+    o XML e a XSL devem existir e os arquivos de resultado, que são
+    apagados e gravados, devem estar na pasta do XML ou, se informadas,
+    em `allowed_paths`
+    Lança ValueError se algum caminho não é aceito
+    """
+    for name in FILEPATHS:
+        if not os.path.isabs(paths[name]):
+            raise ValueError("{} is not absolute".format(name))
+    for name in INPUT_FILEPATHS:
+        if not os.path.isfile(paths[name]):
+            raise ValueError("{} is not a file".format(name))
+    folders = [
+        os.path.realpath(folder)
+        for folder in allowed_paths or
+        [os.path.dirname(paths["xml_filepath"])]
+    ]
+    for name in OUTPUT_FILEPATHS:
+        path = paths[name]
+        if os.path.islink(path) or os.path.isdir(path):
+            raise ValueError("{} is not a regular file".format(name))
+        real_path = os.path.realpath(path)
+        if not any(is_inside(real_path, folder) for folder in folders):
+            raise ValueError("{} is not in an allowed path".format(name))
+
+
+class XMLTransformRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Recebe uma linha JSON com os caminhos dos arquivos (`FILEPATHS`)
+    e responde com uma linha JSON com `status` e `seconds`
+    """
+
+    def handle(self):
+        started = time.time()
+        response = {"status": "done"}
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            paths = {name: request[name] for name in FILEPATHS}
+            validate_paths(paths, self.server.allowed_paths)
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"status": "invalid request", "error": str(e)}
+        else:
+            xml_transform.transform_file(
+                *[paths[name] for name in FILEPATHS])
+            self.server.transformations += 1
+        response["seconds"] = round(time.time() - started, 4)
+        logger.info("xml_transform_server: %s", response)
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class XMLTransformServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, preload=None,
+                 allowed_paths=None):
+        if not is_loopback(host):
+            raise ValueError(
+                "xml_transform_server only accepts loopback addresses, "
+                "not {}".format(host))
+        socketserver.ThreadingTCPServer.__init__(
+            self, (host, port), XMLTransformRequestHandler)
+        self.transformations = 0
+        self.allowed_paths = [
+            os.path.abspath(path) for path in allowed_paths or []]
+        for xsl_file_path in preload or []:
+            get_xslt(xsl_file_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='XML Transformer server for Markup')
+    parser.add_argument(
+        '--host', default=DEFAULT_HOST,
+        help="loopback address (the server has no authentication)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        '--preload', action='append', default=[],
+        help="XSL to compile at start up")
+    parser.add_argument(
+        '--allowed-path', action='append', default=[],
+        help="folder where the results may be written "
+             "(default: the folder of each XML)")
+    parser.add_argument('--loglevel', default='WARNING')
+    args = parser.parse_args()
+
+    logger.setLevel(args.loglevel.upper())
+
+    if not is_loopback(args.host):
+        parser.error("--host must be a loopback address")
+    server = XMLTransformServer(
+        args.host, args.port, args.preload, args.allowed_path)
+    print("xml_transform_server: {}:{}".format(*server.server_address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,11 @@ import logging
 from logging.config import dictConfig
 
 from prodtools import _
-from prodtools import form
-from prodtools.config import config
-from prodtools.processing.sgmlxml import SGMLXML2SPSXML
-from prodtools.processing import pkg_processors
-from prodtools.processing.sps_pkgmaker import PackageMaker
 from prodtools.utils.logging_config import LOGGING_CONFIG
 
+# os módulos de processamento (lxml, packtools, SQLAlchemy etc) são
+# importados apenas quando usados, para que o comando inicie rapidamente
+
 
 dictConfig(LOGGING_CONFIG)
 
@@ -20,16 +18,25 @@ logger = logging.getLogger()
 
 
 def display_form(stage):
+    from prodtools import form
     form.display_form(stage == 'xc', None, call_make_package_from_form)
 
 
 def execute(INTERATIVE, xml_list, GENERATE_PMC, sgmxml=None, acron=None,
             optimise_images_for_web=False):
+    from prodtools.config import config
+    from prodtools.processing import pkg_processors
+    from prodtools.processing.sgmlxml import SGMLXML2SPSXML
+    from prodtools.processing.sps_pkgmaker import PackageMaker
+
+    configuration = config.Configuration()
     if xml_list:
         stage = 'xpm'
         xml_path = os.path.dirname(xml_list[0])
-        pkg_maker = PackageMaker(xml_path, xml_path + "_" + stage,
-                                 optimise=optimise_images_for_web)
+        pkg_maker = PackageMaker(
+            xml_path, xml_path + "_" + stage,
+            optimise=optimise_images_for_web,
+            max_loaded_articles=configuration.max_loaded_articles)
         pkg = pkg_maker.pack(xml_list)
     elif sgmxml:
         stage = 'xml'
@@ -37,12 +44,26 @@ def execute(INTERATIVE, xml_list, GENERATE_PMC, sgmxml=None, acron=None,
         sgmxml2xml = SGMLXML2SPSXML(sgmxml, acron)
         pkg = sgmxml2xml.pack()
 
-    configuration = config.Configuration()
     proc = pkg_processors.PkgProcessor(configuration, INTERATIVE, stage)
     proc.make_package(pkg, stage == "xml" or GENERATE_PMC)
     print('...'*3)
 
 
+def execute_batch(path, acron, max_workers=None):
+    """
+    Converte todos os .sgm.xml de `path` (e subpastas)
+    """
+    from prodtools.processing.sgmlxml import SGMLXMLBatch
+
+    summary = SGMLXMLBatch(path, acron, max_workers).run()
+    print(_("Total of documents") + ": {}".format(summary["total"]))
+    print("done: {}".format(summary["done"]))
+    print("failed: {}".format(summary["failed"]))
+    print("{} docs/min".format(summary["documents_per_minute"]))
+    print(summary["results"])
+    return summary
+
+
 def call_make_package_from_form(xml_path, GENERATE_PMC=False, optimise=False):
     xml_list = [os.path.join(xml_path, item)
                 for item in os.listdir(xml_path) if item.endswith('.xml')]
@@ -101,6 +122,13 @@ def main():
     parser.add_argument('--pmc', action='store_true',
                         help='generates also PMC package')
 
+    parser.add_argument('--batch', action='store_true',
+                        help='converts all the .sgm.xml files found in '
+                             'xml_path (folder) and its subfolders')
+
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of processes for --batch')
+
     parser.add_argument('--loglevel', default='WARNING')
 
     args = parser.parse_args()
@@ -113,7 +141,13 @@ def main():
     INTERATIVE = not args.auto
     GENERATE_PMC = args.pmc
 
-    if not xml_path and INTERATIVE:
+    if args.batch:
+        if not os.path.isdir(xml_path) or not acron:
+            print(_('Inform the folder and the acron'))
+            parser.print_usage()
+        else:
+            execute_batch(xml_path, acron, args.workers)
+    elif not xml_path and INTERATIVE:
         display_form("xpm")
     else:
         sgmxml, xml_list, errors = evaluate_xml_path(xml_path)
@@ -0,0 +1,61 @@
+# coding=utf-8
+"""
+Mede o tempo por referência do conserto das referências (BrokenRef)
+de um documento com muitas referências de livros cujos links devem ser
+inseridos em mixed-citation.
+
+Uso:
+    python -m tests.benchmarks.bench_broken_refs [--references 300] [--runs 5]
+"""
+import argparse
+import time
+
+from prodtools.processing.sps_pkgmaker import BrokenRef
+from prodtools.utils import xml_utils
+
+
+REF = """<ref id="B{n}"><label>{n}</label><mixed-citation>Costa A, Lima B. Title of the book {n}. 2nd ed. Rio de Janeiro: Editora; 2010. <italic>Available from</italic>: http://www.example.org/books/{n} (cited 2020 Jan 5).</mixed-citation>
+<element-citation publication-type="book">
+<person-group person-group-type="author"><name><surname>Costa</surname><given-names>A</given-names></name><name><surname>Lima</surname><given-names>B</given-names></name></person-group>
+<article-title>Title of the book {n}</article-title>
+<edition>2nd</edition><publisher-loc>Rio de Janeiro</publisher-loc><publisher-name>Editora</publisher-name><year>2010</year>
+<comment>Available from: <ext-link ext-link-type="uri" xlink:href="http://www.example.org/books/{n}">http://www.example.org/books/{n}</ext-link></comment>
+<date-in-citation content-type="access-date">2020 Jan 5</date-in-citation>
+</element-citation></ref>"""
+
+DOCUMENT = """<article xmlns:xlink="http://www.w3.org/1999/xlink"><back><ref-list>{}</ref-list></back></article>"""
+
+
+def document(references):
+    return DOCUMENT.format(
+        "\n".join(REF.format(n=n) for n in range(1, references + 1)))
+
+
+def measure(content):
+    xml = xml_utils.etree.fromstring(content)
+    started = time.time()
+    for ref in xml.findall(".//ref"):
+        BrokenRef(ref).normalize()
+    return time.time() - started
+
+
+def run(references, runs):
+    content = document(references)
+    seconds = sorted(measure(content) for i in range(runs))[runs // 2]
+    return {
+        "references": references,
+        "seconds": round(seconds, 4),
+        "us_per_reference": round(seconds * 1e6 / references, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--references", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(run(args.references, args.runs))
+
+
+if __name__ == "__main__":
+    main()
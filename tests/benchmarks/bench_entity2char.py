@@ -0,0 +1,78 @@
+# coding=utf-8
+"""
+Mede a vazão (MB/s) da conversão de entidades (Entity2Char.convert)
+sobre o conteúdo dos XML de um pacote sintético, no qual foram inseridas
+entidades numéricas, nomeadas, incompletas e duplamente codificadas.
+
+Uso:
+    python -m tests.benchmarks.bench_entity2char [--articles 5] [--references 300] [--runs 5]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+from prodtools.utils import fs_utils
+from prodtools.utils.xml_utils import Entity2Char
+from tests.benchmarks import sps_package
+
+
+# trechos dos documentos sintéticos e os textos com entidades que os
+# substituem
+ENTITIES = (
+    ("Costa", "Co&#x73;ta"),
+    ("Lima", "L&iacute;ma"),
+    ("Title of", "T&iacute;tulo &amp; title &#8212; of"),
+    ("Saude", "Sa&uacute;de"),
+    ("Paragraph", "Par&aacute;grafo &lt;1&gt; &amp;amp; &ccedil;&atilde;o"),
+    ("the text", "o texto &eacute &#233 &amp;ccedil; &ge."),
+)
+
+
+def contents(xml_files):
+    items = []
+    for xml_file in xml_files:
+        content = fs_utils.read_file(xml_file)
+        for text, new in ENTITIES:
+            content = content.replace(text, new)
+        items.append(content)
+    return items
+
+
+def measure(items):
+    entity2char = Entity2Char()
+    started = time.time()
+    for content in items:
+        entity2char.convert(content)
+    return time.time() - started
+
+
+def run(articles, references, runs):
+    path = tempfile.mkdtemp()
+    try:
+        items = contents(sps_package.create_sps_package(
+            path, articles, references, figures=2, languages=2))
+    finally:
+        shutil.rmtree(path)
+    size = sum(len(content.encode("utf-8")) for content in items)
+    seconds = sorted(measure(items) for i in range(runs))[runs // 2]
+    return {
+        "documents": len(items),
+        "mb": round(size / 1024 ** 2, 2),
+        "entities": sum(content.count("&") for content in items),
+        "seconds": round(seconds, 3),
+        "mb_per_second": round(size / 1024 ** 2 / seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=5)
+    parser.add_argument("--references", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(run(args.articles, args.references, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# coding=utf-8
+"""
+Mede o tempo dos relatórios de coerência do grupo de documentos
+(GroupCoherenceReports) para um fascículo sintético grande.
+
+Uso:
+    python -m tests.benchmarks.bench_grouped_documents [--articles 400]
+"""
+import argparse
+import time
+
+from prodtools.data.article import Article
+from prodtools.utils import xml_utils
+from prodtools.validations.pkg_evaluation import GroupCoherenceReports
+
+
+ARTICLE_TEMPLATE = """<article article-type="research-article" xml:lang="en">
+<front>
+<journal-meta>
+<journal-id journal-id-type="publisher-id">acron</journal-id>
+<journal-title-group><journal-title>Journal Title</journal-title></journal-title-group>
+<issn pub-type="epub">1234-5678</issn>
+<publisher><publisher-name>Publisher</publisher-name></publisher>
+</journal-meta>
+<article-meta>
+<article-id pub-id-type="doi">10.1590/1234-5678.{order}</article-id>
+<article-id specific-use="previous-pid" pub-id-type="other">{order}</article-id>
+<pub-date pub-type="epub"><day>01</day><month>01</month><year>2020</year></pub-date>
+<volume>10</volume>
+<issue>2</issue>
+<fpage>{fpage}</fpage>
+<lpage>{lpage}</lpage>
+<permissions><license license-type="open-access" xlink:href="https://creativecommons.org/licenses/by/4.0/" xmlns:xlink="http://www.w3.org/1999/xlink"><license-p>CC BY</license-p></license></permissions>
+</article-meta>
+</front>
+</article>
+"""
+
+
+def make_articles(total):
+    articles = {}
+    for i in range(1, total + 1):
+        text = ARTICLE_TEMPLATE.format(
+            order=str(i).zfill(5), fpage=i * 10, lpage=i * 10 + 9)
+        name = "a{}".format(str(i).zfill(5))
+        articles[name] = Article(xml_utils.etree.fromstring(text), name)
+    return articles
+
+
+def run(total):
+    articles = make_articles(total)
+    started = time.time()
+    reports = GroupCoherenceReports(articles, True)
+    reports.journal_issue_header_report
+    reports.errors_reports
+    return {"articles": total, "seconds": round(time.time() - started, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=400)
+    args = parser.parse_args()
+    print(run(args.articles))
+
+
+if __name__ == "__main__":
+    main()
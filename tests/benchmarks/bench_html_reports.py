@@ -0,0 +1,115 @@
+# coding=utf-8
+"""
+Compara o pico de memória (tracemalloc) e o tempo para gravar um relatório
+HTML grande montando o documento em memória (html_reports.save) e
+gravando-o em partes (html_reports.ReportWriter).
+
+Uso:
+    python -m tests.benchmarks.bench_html_reports [--articles 300] [--refs 40]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from prodtools.reports import html_reports
+
+
+HEADER = ["label", "status", "message", "xml"]
+
+
+def references_rows(article, total):
+    for i in range(total):
+        yield {
+            "label": "ref {} ({})".format(i, article),
+            "status": "ERROR" if i % 7 == 0 else "OK",
+            "message": "reference {} of {} has no year".format(i, article),
+            "xml": "<element-citation><source>Source {}</source>"
+                   "</element-citation>".format(i),
+        }
+
+
+def blocks(articles, refs):
+    for i in range(articles):
+        name = "a{:05d}".format(i)
+        content = html_reports.sheet(HEADER, list(references_rows(name, refs)))
+        block = html_reports.HideAndShowBlock(name, [
+            html_reports.HideAndShowBlockItem(
+                name, "references", name + "-refs", "ok", content)
+        ])
+        yield ([name], block)
+
+
+def tabbed_report(articles, refs):
+    return html_reports.TabbedReport(
+        {"summary": "Summary", "individual": "Individual"},
+        ["summary", "individual"],
+        {"summary": "<p>{{IMG_PATH}} {} articles</p>".format(articles),
+         "individual": None},
+        "individual")
+
+
+def replace_paths(content):
+    return content.replace("{IMG_PATH}", "/img")
+
+
+def in_memory(filename, articles, refs):
+    report = html_reports.HideAndShowBlocksReport(
+        ["name", "reports"], list(blocks(articles, refs)),
+        html_cell_content=[])
+    tabs = tabbed_report(articles, refs)
+    tabs.tabbed_content["individual"] = report.content
+    content = replace_paths(tabs.report_content)
+    html_reports.save(filename, "Report", content)
+
+
+def streamed(filename, articles, refs):
+    report = html_reports.HideAndShowBlocksReport(
+        ["name", "reports"], blocks(articles, refs), html_cell_content=[])
+    tabs = tabbed_report(articles, refs)
+    tabs.tabbed_content["individual"] = report
+    with html_reports.ReportWriter(filename, "Report") as writer:
+        tabs.write(writer, replace_paths)
+
+
+def measure(func, filename, articles, refs):
+    tracemalloc.start()
+    started = time.time()
+    func(filename, articles, refs)
+    seconds = time.time() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 3),
+        "peak_mb": round(peak / 1024 ** 2, 2),
+        "file_mb": round(os.path.getsize(filename) / 1024 ** 2, 2),
+    }
+
+
+def run(articles, refs):
+    path = tempfile.mkdtemp()
+    try:
+        return {
+            "articles": articles,
+            "refs": refs,
+            "in_memory": measure(
+                in_memory, os.path.join(path, "a.html"), articles, refs),
+            "streamed": measure(
+                streamed, os.path.join(path, "b.html"), articles, refs),
+        }
+    finally:
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=300)
+    parser.add_argument("--refs", type=int, default=40)
+    args = parser.parse_args()
+    print(run(args.articles, args.refs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# coding=utf-8
+"""
+Mede o tempo de início de cada comando: o tempo de importação do módulo
+(`python -X importtime`), com os módulos mais demorados, e o tempo total
+de `<comando> --help`.
+
+Uso:
+    python -m tests.benchmarks.bench_import_time [--runs 5] [--top 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+ENTRY_POINTS = (
+    ("xml_package_maker.py", "prodtools.xpm"),
+    ("xml_converter.py", "prodtools.xc"),
+    ("prodtools/xc_server.py", "prodtools.xc_server"),
+    ("xml_transform.py", "prodtools.xml_transform_client"),
+    ("xml_pubmed.py", "prodtools.xml_pubmed"),
+)
+
+
+def import_times(module):
+    """
+    Retorna o tempo total (ms) de importação de `module`,
+    os tempos (ms) de cada módulo importado (self) e o erro, se houver
+    (por exemplo, dependência não instalada)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    total = 0
+    modules = []
+    error = None
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            error = line
+            continue
+        if "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[12:].split("|")
+        modules.append((int(self_us) / 1000, name.strip()))
+        if not name.startswith("  "):
+            total += int(cumulative_us) / 1000
+    if completed.returncode == 0:
+        error = None
+    return total, modules, error
+
+
+def help_time(script):
+    started = time.time()
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, script), "--help"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.time() - started
+
+
+def run(runs, top):
+    result = {}
+    for script, module in ENTRY_POINTS:
+        totals = []
+        for i in range(runs):
+            total, modules, error = import_times(module)
+            totals.append(total)
+        helps = sorted([help_time(script) for i in range(runs)])
+        result[script] = {
+            "import_ms": round(sorted(totals)[len(totals) // 2], 1),
+            "help_ms": round(helps[len(helps) // 2] * 1000, 1),
+            "slowest": [
+                "{} {:.1f}ms".format(name, ms)
+                for ms, name in sorted(modules, reverse=True)[:top]
+            ],
+        }
+        if error:
+            result[script]["error"] = error
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+    for script, item in run(args.runs, args.top).items():
+        print(script, item)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# coding=utf-8
+"""
+Mede quantos arquivos XML por segundo são carregados por
+`xml_utils.load_xml` (a partir do arquivo e a partir do conteúdo) e por
+`xml_utils.SuitableXML`, usando os XML de um pacote sintético.
+
+Uso:
+    python -m tests.benchmarks.bench_load_xml [--articles 50] [--references 50] [--runs 5]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+from prodtools.utils import fs_utils
+from prodtools.utils import xml_utils
+from tests.benchmarks import sps_package
+
+
+def load_files(xml_files):
+    for xml_file in xml_files:
+        xml_utils.load_xml(xml_file)
+
+
+def load_contents(contents):
+    for content in contents:
+        xml_utils.load_xml(content)
+
+
+def suitable_xml(xml_files):
+    for xml_file in xml_files:
+        xml_utils.SuitableXML(xml_file)
+
+
+def files_per_second(function, items, runs):
+    seconds = []
+    for i in range(runs):
+        started = time.time()
+        function(items)
+        seconds.append(time.time() - started)
+    return round(len(items) / sorted(seconds)[runs // 2], 1)
+
+
+def run(articles, references, runs):
+    path = tempfile.mkdtemp()
+    try:
+        xml_files = sps_package.create_sps_package(
+            path, articles, references, figures=2, languages=2)
+        contents = [fs_utils.read_file(xml_file) for xml_file in xml_files]
+        return {
+            "files": len(xml_files),
+            "load_xml_file": files_per_second(load_files, xml_files, runs),
+            "load_xml_str": files_per_second(load_contents, contents, runs),
+            "suitable_xml": files_per_second(suitable_xml, xml_files, runs),
+        }
+    finally:
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=50)
+    parser.add_argument("--references", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(run(args.articles, args.references, args.runs))
+
+
+if __name__ == "__main__":
+    main()
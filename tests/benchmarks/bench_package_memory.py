@@ -0,0 +1,131 @@
+# coding=utf-8
+"""
+Compara o pico de memória (RSS) do processamento de um pacote SPS
+sintético grande mantendo todos os documentos em memória e no modo de
+memória limitada (MAX_LOADED_ARTICLES), em que apenas `--max-loaded`
+árvores XML ficam carregadas. Mede o empacotamento (PackageMaker.pack)
+e a avaliação do pacote (PackageEvaluator.evaluate), cada modo em um
+processo próprio, com os dados do periódico obtidos localmente.
+
+Uso:
+    python -m tests.benchmarks.bench_package_memory [--articles 50] [--references 60] [--max-loaded 5] [--pack-only]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from tests.benchmarks import sps_package
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def peak_rss_mb():
+    # ru_maxrss em KB (Linux)
+    return round(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def process(path, max_loaded, pack_only):
+    """
+    Executado no processo filho: processa o pacote de `path`/src e
+    retorna os tempos e os picos de memória de cada etapa
+    """
+    from prodtools.config import config
+    from prodtools.processing.sps_pkgmaker import PackageMaker
+    from tests.benchmarks.bench_pipeline import (
+        CONFIGURATION,
+        registered_issues_manager,
+    )
+
+    result = {"before": peak_rss_mb()}
+    started = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pkg = PackageMaker(
+            os.path.join(path, "src"), os.path.join(path, "out"),
+            max_loaded_articles=max_loaded).pack()
+    result["pack"] = {
+        "seconds": round(time.time() - started, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if pack_only:
+        return result
+
+    from prodtools.validations.pkg_evaluation import PackageEvaluator
+
+    config_filename = os.path.join(path, "config.ini")
+    with open(config_filename, "w") as fp:
+        fp.write(CONFIGURATION.format(
+            serial_path=os.path.join(path, "serial")))
+    manager = registered_issues_manager(
+        sps_package.journals_csv(os.path.join(path, "journals.csv")))
+    registered_issue_data = manager.get_registered_issue_data(pkg.issue_data)
+    started = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        PackageEvaluator(
+            pkg, registered_issue_data, False, False,
+            config.Configuration(config_filename)).evaluate()
+    pkg.release_articles()
+    result["evaluate"] = {
+        "seconds": round(time.time() - started, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if pkg.loaded_trees is not None:
+        result["xml_loads"] = pkg.loaded_trees.loads
+    return result
+
+
+def measure(path, max_loaded, pack_only):
+    args = [sys.executable, "-m", "tests.benchmarks.bench_package_memory",
+            "--child", path, "--max-loaded", str(max_loaded)]
+    if pack_only:
+        args.append("--pack-only")
+    output = subprocess.check_output(
+        args, cwd=ROOT, stderr=subprocess.DEVNULL, universal_newlines=True)
+    return json.loads(output.splitlines()[-1])
+
+
+def run(articles, references, max_loaded, pack_only=False):
+    path = tempfile.mkdtemp()
+    try:
+        sps_package.create_sps_package(
+            os.path.join(path, "src"), articles, references, figures=3,
+            languages=2)
+        result = {"articles": articles, "references": references}
+        for name, limit in (("all_loaded", 0), ("bounded", max_loaded)):
+            for item in ("out", "serial"):
+                shutil.rmtree(os.path.join(path, item), ignore_errors=True)
+            result[name] = measure(path, limit, pack_only)
+        return result
+    finally:
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=50)
+    parser.add_argument("--references", type=int, default=60)
+    parser.add_argument("--max-loaded", type=int, default=5)
+    parser.add_argument("--pack-only", action="store_true")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(
+            process(args.child, args.max_loaded or None, args.pack_only)))
+        return
+    print(json.dumps(
+        run(args.articles, args.references, args.max_loaded, args.pack_only),
+        indent=2))
+
+
+if __name__ == "__main__":
+    main()
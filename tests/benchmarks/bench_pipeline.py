@@ -0,0 +1,263 @@
+# coding=utf-8
+"""
+Mede, de ponta a ponta, as etapas de processamento de um pacote SPS
+sintético (ver `sps_package`), parametrizado pela quantidade de
+documentos, de referências e de figuras por documento e de idiomas:
+
+    pack      PackageMaker.pack
+    evaluate  PkgProcessor.evaluate_package
+    convert   ArticlesManager.convert_articles
+
+Tudo é executado localmente: o acesso à web é desabilitado
+(ENABLED_WEB_ACCESS=off), os dados do periódico vêm de um CSV local, o
+registro de PIDs não é usado (PID_MANAGER vazio) e a base ISIS é
+substituída por um simulacro que grava os registros no formato ID
+(sem CISIS). A etapa que não puder ser importada (dependência não
+instalada) é registrada com o erro e não é medida.
+
+O resultado (JSON) pode ser gravado (--output) e comparado com o de
+outra versão (--compare), informando a razão entre os tempos.
+
+Uso:
+    python -m tests.benchmarks.bench_pipeline [--articles 20] [--references 30] [--figures 3] [--languages 2] [--runs 3] [--output result.json] [--compare previous.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+
+from prodtools.utils.dbm import dbm_isis
+from tests.benchmarks import sps_package
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+STAGES = ("pack", "evaluate", "convert")
+
+CONFIGURATION = """ENABLED_WEB_ACCESS=off
+PROC_SERIAL_PATH={serial_path}
+PID_MANAGER=
+SKIP_IDENTICAL_XML=no
+"""
+
+
+class LocalISIS(dbm_isis.UCISIS):
+    """
+    Simulacro de `dbm_isis.UCISIS`: a "base" (.mst) é a concatenação
+    dos arquivos ID, lida com `dbm_isis.IDFile`
+    """
+
+    is_available = True
+    launches = 0
+    executed = 0
+
+    def __init__(self):
+        self.idfile = dbm_isis.IDFile()
+
+    def batch(self):
+        return dbm_isis.CISISBatch()
+
+    def get_records(self, db_filename, expr=None):
+        if os.path.isfile(db_filename + ".mst"):
+            return self.idfile.read(db_filename + ".mst")
+        return []
+
+    def id_file_to_db(self, id_filename, db_filename, fst_filename=None):
+        shutil.copyfile(id_filename, db_filename + ".mst")
+        with open(db_filename + ".xrf", "w"):
+            pass
+
+    def append_id_file_to_db(self, id_filename, db_filename,
+                             fst_filename=None):
+        with open(db_filename + ".mst", "ab") as db:
+            with open(id_filename, "rb") as fp:
+                db.write(fp.read())
+
+    def mst2iso(self, mst_filename, iso_filename):
+        shutil.copyfile(mst_filename + ".mst", iso_filename)
+
+    def crunchmf(self, mst_filename, wmst_filename):
+        shutil.copyfile(mst_filename + ".mst", wmst_filename + ".mst")
+
+
+def registered_issues_manager(journals_filename):
+    """
+    Retorna `xc_models.RegisteredIssuesManager` que obtém os dados do
+    periódico de `journals_filename`, sem atualizá-lo pela web
+    """
+    from prodtools.db import xc_models
+
+    manager = xc_models.RegisteredIssuesManager.__new__(
+        xc_models.RegisteredIssuesManager)
+    manager.config = None
+    manager.is_db_generation = False
+    manager._db_manager = None
+    manager.journals_list = xc_models.JournalsList(journals_filename)
+    return manager
+
+
+def pack(path, context):
+    from prodtools.processing.sps_pkgmaker import PackageMaker
+
+    started = time.time()
+    context["pkg"] = PackageMaker(
+        context["src"], os.path.join(path, "out")).pack()
+    return time.time() - started, {
+        "documents": len(context["pkg"].articles)}
+
+
+def evaluate(path, context):
+    from prodtools.config import config
+    from prodtools.processing import pkg_processors
+
+    config_filename = os.path.join(path, "config.ini")
+    with open(config_filename, "w") as fp:
+        fp.write(CONFIGURATION.format(
+            serial_path=os.path.join(path, "serial")))
+    proc = pkg_processors.PkgProcessor(
+        config.Configuration(config_filename), False, "xpm")
+    proc.registered_issues_manager = registered_issues_manager(
+        sps_package.journals_csv(os.path.join(path, "journals.csv")))
+
+    started = time.time()
+    registered_issue_data, pkg_eval_result = proc.evaluate_package(
+        context["pkg"])
+    return time.time() - started, {
+        "blocking_errors": pkg_eval_result.blocking_errors}
+
+
+def convert(path, context):
+    from prodtools.db import serial
+    from prodtools.db import xc_models
+
+    pkg = context["pkg"]
+    journal_files = serial.JournalFiles(
+        os.path.join(path, "serial"), sps_package.ACRON)
+    issue_files = serial.IssueFiles(
+        journal_files, sps_package.ISSUE_FOLDER)
+
+    started = time.time()
+    manager = xc_models.ArticlesManager(LocalISIS(), issue_files)
+    manager.convert_articles(
+        pkg.package_folder.xml_list, pkg.articles,
+        sps_package.issue_record(), create_windows_base=True)
+    return time.time() - started, {
+        "converted": len(manager.db_conversion_status["converted"])}
+
+
+def measure(articles, references, figures, languages):
+    """
+    Executa as etapas uma vez sobre um pacote novo e retorna os tempos
+    (ou o erro) de cada etapa
+    """
+    path = tempfile.mkdtemp()
+    result = {}
+    try:
+        context = {"src": os.path.join(path, "src")}
+        sps_package.create_sps_package(
+            context["src"], articles, references, figures, languages)
+        for name, stage in (
+                ("pack", pack), ("evaluate", evaluate), ("convert", convert)):
+            if "pkg" not in context and name != "pack":
+                result[name] = {"error": "pack is required"}
+                continue
+            try:
+                seconds, info = stage(path, context)
+            except ImportError as e:
+                result[name] = {"error": "{}: {}".format(
+                    e.__class__.__name__, e)}
+            else:
+                info["seconds"] = seconds
+                result[name] = info
+    finally:
+        shutil.rmtree(path)
+    return result
+
+
+def version():
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT, stderr=subprocess.DEVNULL,
+            universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(articles, references, figures, languages, runs=3):
+    measures = [
+        measure(articles, references, figures, languages)
+        for i in range(runs)
+    ]
+    stages = {}
+    for name in STAGES:
+        items = [m[name] for m in measures]
+        seconds = sorted(
+            item["seconds"] for item in items if "seconds" in item)
+        stage = {k: v for k, v in items[-1].items() if k != "seconds"}
+        if seconds:
+            median = seconds[len(seconds) // 2]
+            stage["seconds"] = round(median, 3)
+            stage["ms_per_document"] = round(median * 1000 / articles, 2)
+        stages[name] = stage
+    return {
+        "version": version(),
+        "python": platform.python_version(),
+        "parameters": {
+            "articles": articles,
+            "references": references,
+            "figures": figures,
+            "languages": languages,
+            "runs": runs,
+        },
+        "stages": stages,
+    }
+
+
+def compare(result, previous):
+    """
+    Retorna, por etapa, a razão entre o tempo de `result` e o de
+    `previous` (< 1: mais rápido)
+    """
+    ratios = {}
+    for name, stage in result["stages"].items():
+        before = previous.get("stages", {}).get(name, {}).get("seconds")
+        if stage.get("seconds") is not None and before:
+            ratios[name] = round(stage["seconds"] / before, 3)
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=20)
+    parser.add_argument("--references", type=int, default=30)
+    parser.add_argument("--figures", type=int, default=3)
+    parser.add_argument("--languages", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    result = run(
+        args.articles, args.references, args.figures, args.languages,
+        args.runs)
+    if args.compare:
+        with open(args.compare) as fp:
+            previous = json.load(fp)
+        result["compared_to"] = {
+            "version": previous.get("version"),
+            "ratios": compare(result, previous),
+        }
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(result, fp, indent=2, sort_keys=True)
+    print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
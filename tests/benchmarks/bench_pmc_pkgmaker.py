@@ -0,0 +1,60 @@
+# coding=utf-8
+"""
+Compara o tempo de geração do pacote PMC (PMCPackageMaker.make_package)
+de um fascículo sintético com um processo e com vários processos,
+e verifica se os pacotes gerados são idênticos.
+
+Uso:
+    python -m tests.benchmarks.bench_pmc_pkgmaker [--articles 100] [--paragraphs 200] [--workers N]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from prodtools.processing.pmc_pkgmaker import PMCPackageMaker
+from tests.test_pmc_pkgmaker import create_package, read_files
+
+
+def measure(pkg, max_workers):
+    pmc_path = pkg.wk.pmc_package_path
+    shutil.rmtree(pmc_path)
+    os.makedirs(pmc_path)
+    started = time.time()
+    results = PMCPackageMaker(pkg, max_workers).make_package()
+    seconds = time.time() - started
+    return {
+        "workers": max_workers or os.cpu_count(),
+        "done": len([r for r in results if r[1]]),
+        "seconds": round(seconds, 3),
+    }, read_files(pmc_path)
+
+
+def run(articles, paragraphs, workers=None):
+    path = tempfile.mkdtemp()
+    try:
+        pkg = create_package(path, articles, paragraphs)
+        sequential, sequential_files = measure(pkg, 1)
+        parallel, parallel_files = measure(pkg, workers)
+        return {
+            "articles": articles,
+            "sequential": sequential,
+            "parallel": parallel,
+            "identical": sequential_files == parallel_files,
+        }
+    finally:
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    print(run(args.articles, args.paragraphs, args.workers))
+
+
+if __name__ == "__main__":
+    main()
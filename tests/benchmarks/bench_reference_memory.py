@@ -0,0 +1,97 @@
+# coding=utf-8
+"""
+Mede a memória (tracemalloc) ocupada pelos objetos de dados de
+referências, autores e afiliações (ReferenceXML, Reference, ContribXML,
+PersonAuthor, AffiliationXML, Affiliation) e pelos registros ISIS dos
+documentos (ArticleRecords) de um fascículo sintético com muitas
+referências, mantidos em memória como durante a avaliação do pacote.
+
+Uso:
+    python -m tests.benchmarks.bench_reference_memory [--articles 20] [--references 300]
+"""
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from prodtools.data import article
+from prodtools.db import serial
+from prodtools.db import xc_models
+from prodtools.utils import xml_utils
+from tests.benchmarks import sps_package
+
+
+def load_documents(xml_files):
+    docs = []
+    for xml_file in xml_files:
+        xml, error = xml_utils.load_xml(xml_file)
+        name = os.path.basename(xml_file)[:-4]
+        docs.append(article.Article(xml, name))
+    return docs
+
+
+def data_models(docs, issue_files):
+    """
+    Cria e retorna os objetos de dados de todos os documentos
+    """
+    items = []
+    i_record = sps_package.issue_record()
+    for doc in docs:
+        for ref_xml in doc.references_xml:
+            ref = ref_xml.reference
+            items.append((ref_xml, ref))
+        for aff_xml in doc.affiliations:
+            items.append((aff_xml, aff_xml.aff))
+        article_files = serial.ArticleFiles(
+            issue_files, doc.order, doc.xml_name)
+        items.append(
+            xc_models.ArticleRecords(doc, i_record, article_files))
+    return items
+
+
+def run(articles, references):
+    path = tempfile.mkdtemp()
+    try:
+        xml_files = sps_package.create_sps_package(
+            os.path.join(path, "src"), articles, references, figures=1)
+        docs = load_documents(xml_files)
+        issue_files = serial.IssueFiles(
+            serial.JournalFiles(
+                os.path.join(path, "serial"), sps_package.ACRON),
+            sps_package.ISSUE_FOLDER)
+
+        gc.collect()
+        tracemalloc.start()
+        started = time.time()
+        items = data_models(docs, issue_files)
+        seconds = time.time() - started
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        total_references = articles * references
+        return {
+            "articles": articles,
+            "references": total_references,
+            "objects": len(items),
+            "seconds": round(seconds, 3),
+            "memory_mb": round(current / 1024 ** 2, 2),
+            "bytes_per_reference": int(current / total_references),
+        }
+    finally:
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=20)
+    parser.add_argument("--references", type=int, default=300)
+    args = parser.parse_args()
+    print(run(args.articles, args.references))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# coding=utf-8
+"""
+Mede o tempo por referência da extração dos dados das referências
+(ReferenceXML e ReferenceXML.reference) de documentos sintéticos com
+muitas referências.
+
+Uso:
+    python -m tests.benchmarks.bench_reference_xml [--articles 10] [--references 300] [--runs 5]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from prodtools.data.article import ReferenceXML
+from prodtools.utils import xml_utils
+from tests.benchmarks import sps_package
+
+
+def ref_nodes(xml_files):
+    nodes = []
+    for xml_file in xml_files:
+        xml, error = xml_utils.load_xml(xml_file)
+        nodes.extend(xml.findall(".//back//ref"))
+    return nodes
+
+
+def measure(nodes):
+    started = time.time()
+    for node in nodes:
+        ReferenceXML(node)
+    init_seconds = time.time() - started
+
+    started = time.time()
+    for node in nodes:
+        ReferenceXML(node).reference
+    reference_seconds = time.time() - started
+    return init_seconds, reference_seconds
+
+
+def run(articles, references, runs):
+    path = tempfile.mkdtemp()
+    try:
+        nodes = ref_nodes(sps_package.create_sps_package(
+            path, articles, references, figures=0))
+    finally:
+        shutil.rmtree(path)
+    results = sorted(measure(nodes) for i in range(runs))
+    init_seconds, reference_seconds = results[len(results) // 2]
+    return {
+        "references": len(nodes),
+        "init_us_per_reference": round(init_seconds * 1e6 / len(nodes), 1),
+        "reference_us_per_reference": round(
+            reference_seconds * 1e6 / len(nodes), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--references", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(run(args.articles, args.references, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# coding=utf-8
+"""
+Compara a gravação do relatório do pacote (ReportsMaker.save_report) em
+uma única página e paginado (página principal + uma página por documento):
+tempo total, tamanho da página principal e pico de memória.
+
+Uso:
+    python -m tests.benchmarks.bench_reports_pages [--articles 250] [--items 60]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import Mock
+
+from prodtools.validations import reports_maker
+from prodtools.validations.article_validations import ArticleValidations
+from prodtools.validations.pkg_articles_validations import (
+    PkgArticlesValidationsReports,
+)
+from prodtools.validations.validations import ValidationsResult
+
+
+ITEM = (
+    "<div><p>[ERROR] reference {} of {} has no year: "
+    "<code>&lt;element-citation&gt;...&lt;/element-citation&gt;</code>"
+    "</p><img src=\"{{IMG_PATH}}/{}.jpg\"/></div>"
+)
+
+
+def article_validations(name, items):
+    validations = ArticleValidations()
+    validations.article_display_report = None
+    validations.xml_structure_validations = ValidationsResult()
+    validations.xml_structure_validations.message = "[WARNING] structure"
+    validations.xml_content_validations = ValidationsResult()
+    validations.xml_content_validations.message = "".join(
+        [ITEM.format(i, name, name) for i in range(items)])
+    return validations
+
+
+class EvaluationResult(object):
+
+    def __init__(self, pkg_validations_reports):
+        self.group_validations_report = ""
+        self.pkg_validations_reports = pkg_validations_reports
+
+    @property
+    def individual_validations_report(self):
+        return self.pkg_validations_reports.detailed_report
+
+
+def make_reports_maker(path, articles, items, paginated):
+    pkg = Mock()
+    pkg.package_folder.path = path
+    pkg.package_folder.pkgfiles_items = {}
+    pkg.package_folder.orphans = []
+    pkg.articles = {}
+    pkg.issue_data.journal = None
+
+    pkg_validations_reports = PkgArticlesValidationsReports.__new__(
+        PkgArticlesValidationsReports)
+    pkg_validations_reports.pkg_articles_validations = {
+        "a{:05d}".format(i): article_validations("a{:05d}".format(i), items)
+        for i in range(articles)
+    }
+    return reports_maker.ReportsMaker(
+        pkg, EvaluationResult(pkg_validations_reports),
+        reports_maker.BasicAssetsInReport(os.path.join(path, "pkg")),
+        "xpm", paginated=paginated)
+
+
+def measure(articles, items, paginated):
+    path = tempfile.mkdtemp()
+    try:
+        reports = make_reports_maker(path, articles, items, paginated)
+        tracemalloc.start()
+        started = time.time()
+        reports.save_report(display=False)
+        total_seconds = time.time() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        return {
+            "total_seconds": round(total_seconds, 3),
+            "index_mb": round(
+                os.path.getsize(reports.report_location) / 1024 ** 2, 2),
+            "peak_mb": round(peak / 1024 ** 2, 2),
+        }
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(path)
+
+
+def run(articles, items):
+    return {
+        "articles": articles,
+        "items": items,
+        "single_page": measure(articles, items, False),
+        "paginated": measure(articles, items, True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=250)
+    parser.add_argument("--items", type=int, default=60)
+    args = parser.parse_args()
+    print(run(args.articles, args.items))
+
+
+if __name__ == "__main__":
+    main()
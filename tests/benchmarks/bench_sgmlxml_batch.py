@@ -0,0 +1,78 @@
+# coding=utf-8
+"""
+Mede a vazão (documentos por minuto) da conversão de SGML para XML
+de documentos sintéticos: um documento por vez (SGMLXML2SPSXML.pack),
+como é feito pelo Markup, e em lote (SGMLXMLBatch) com processos paralelos.
+
+Uso:
+    python -m tests.benchmarks.bench_sgmlxml_batch [--documents 200] [--issues 4] [--workers N]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from prodtools.processing.sgmlxml import (
+    SGMLXMLBatch,
+    convert_sgmxml,
+    find_sgmxml_files,
+)
+from tests.test_sgmlxml import create_sgmxml
+
+
+def create_documents(path, documents, issues):
+    for i in range(documents):
+        create_sgmxml(
+            os.path.join(path, "v1n{}".format(i % issues), "markup_xml"),
+            "a{:05d}".format(i), i + 1)
+
+
+def sequential(path, acron):
+    started = time.time()
+    results = [convert_sgmxml(f, acron) for f in find_sgmxml_files(path)]
+    seconds = time.time() - started
+    return {
+        "done": len([r for r in results if r["status"] == "done"]),
+        "seconds": round(seconds, 3),
+        "documents_per_minute": round(len(results) * 60 / seconds, 2),
+    }
+
+
+def batch(path, acron, workers):
+    summary = SGMLXMLBatch(path, acron, workers).run()
+    return {
+        "done": summary["done"],
+        "seconds": summary["seconds"],
+        "documents_per_minute": summary["documents_per_minute"],
+    }
+
+
+def run(documents, issues, workers=None):
+    result = {
+        "documents": documents,
+        "workers": workers or os.cpu_count(),
+    }
+    for name, func, args in (
+            ("sequential", sequential, ()),
+            ("batch", batch, (workers, ))):
+        path = tempfile.mkdtemp()
+        try:
+            create_documents(path, documents, issues)
+            result[name] = func(path, "abc", *args)
+        finally:
+            shutil.rmtree(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--issues", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    print(run(args.documents, args.issues, args.workers))
+
+
+if __name__ == "__main__":
+    main()
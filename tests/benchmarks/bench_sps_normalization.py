@@ -0,0 +1,58 @@
+# coding=utf-8
+"""
+Mede o tempo da padronização dos XML (SPSXMLContent) de um pacote
+sintético, no total e por etapa de `SPSXMLContent._normalize`.
+
+Uso:
+    python -m tests.benchmarks.bench_sps_normalization [--articles 20] [--references 100] [--runs 3]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+from prodtools.processing.sps_pkgmaker import SPSXMLContent
+from tests.benchmarks import sps_package
+
+
+def measure(xml_files):
+    steps = {}
+    started = time.time()
+    for xml_file in xml_files:
+        xmlcontent = SPSXMLContent(xml_file)
+        for name, seconds in getattr(xmlcontent, "timings", []):
+            steps[name] = steps.get(name, 0) + seconds
+    return time.time() - started, steps
+
+
+def run(articles, references, runs):
+    path = tempfile.mkdtemp()
+    try:
+        xml_files = sps_package.create_sps_package(
+            path, articles, references, figures=2, languages=2)
+        results = sorted(
+            (measure(xml_files) for i in range(runs)), key=lambda r: r[0])
+    finally:
+        shutil.rmtree(path)
+    seconds, steps = results[len(results) // 2]
+    return {
+        "documents": len(xml_files),
+        "ms_per_document": round(seconds * 1000 / len(xml_files), 2),
+        "steps_ms_per_document": {
+            name: round(step_seconds * 1000 / len(xml_files), 2)
+            for name, step_seconds in steps.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=20)
+    parser.add_argument("--references", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    print(run(args.articles, args.references, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# coding=utf-8
+"""
+Compara a geração de XML PubMed de vários números: um por vez, copiando
+a base de cada número para a pasta temporária (IssueStuff), e em lote
+(PubMedBatch), lendo as bases no próprio local, em processos paralelos.
+
+A base ISIS é substituída por um simulacro (sem CISIS), por isso
+o tempo de atualização dos índices não está incluído; o de cópia da base,
+sim (--mst-mb). Os processos herdam o simulacro (fork), apenas Linux.
+
+Uso:
+    python -m tests.benchmarks.bench_xml_pubmed [--issues 12] [--articles 30] [--mst-mb 20] [--workers N]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from prodtools import xml_pubmed
+from tests.test_xml_pubmed import create_issue, fake_ucisis, issue_records
+
+
+def create_issues(serial_path, issues, articles, mst_mb):
+    records = {}
+    issues_paths = []
+    for i in range(issues):
+        issueid = "v10n{}".format(i + 1)
+        issue_path = create_issue(serial_path, "abc", issueid, articles)
+        db_filename = os.path.join(issue_path, "base", issueid)
+        with open(db_filename + ".mst", "wb") as fp:
+            fp.write(b"\0" * mst_mb * 1024 ** 2)
+        records[db_filename] = issue_records(issue_path, articles)
+        # cópia feita por IssueStuff
+        records[os.path.join(issue_path, "TMP", "pubmed_tmp_" + issueid)] = (
+            records[db_filename])
+        issues_paths.append(issue_path)
+    return issues_paths, fake_ucisis(records)
+
+
+def one_by_one(issues_paths, ucisis):
+    started = time.time()
+    for issue_path in issues_paths:
+        issue_stuff = xml_pubmed.IssueStuff(
+            ucisis, issue_path, "", "20201231")
+        xml_pubmed.PubMedXMLMaker(
+            issue_stuff, xml_pubmed.XSL).execute_procedures()
+    return {"seconds": round(time.time() - started, 3)}
+
+
+def batch(issues_paths, ucisis, workers):
+    with patch.object(xml_pubmed, "get_ucisis", return_value=ucisis):
+        summary = xml_pubmed.PubMedBatch(
+            issues_paths, "", "20201231", workers).run()
+    return {
+        "seconds": summary["seconds"],
+        "issues_seconds": summary["issues_seconds"],
+        "done": summary["done"],
+    }
+
+
+def run(issues, articles, mst_mb, workers=None):
+    result = {
+        "issues": issues,
+        "articles": articles,
+        "workers": workers or os.cpu_count(),
+    }
+    for name, func, args in (
+            ("one_by_one", one_by_one, ()),
+            ("batch", batch, (workers, ))):
+        path = tempfile.mkdtemp()
+        try:
+            issues_paths, ucisis = create_issues(
+                os.path.join(path, "serial"), issues, articles, mst_mb)
+            result[name] = func(issues_paths, ucisis, *args)
+        finally:
+            shutil.rmtree(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--issues", type=int, default=12)
+    parser.add_argument("--articles", type=int, default=30)
+    parser.add_argument("--mst-mb", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    print(run(args.issues, args.articles, args.mst_mb, args.workers))
+
+
+if __name__ == "__main__":
+    main()
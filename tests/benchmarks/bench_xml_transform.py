@@ -0,0 +1,123 @@
+# coding=utf-8
+"""
+Compara a latência de `xml_transform.py` executado como comando (um
+processo por transformação, XSL compilada a cada vez) com a do cliente
+`xml_transform_client` com o `xml_transform_server` já iniciado.
+
+Uso:
+    python -m tests.benchmarks.bench_xml_transform [--requests 20] [--xsl file.xsl] [--xml file.xml]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from prodtools import xml_transform_client
+from prodtools.xml_transform_server import XMLTransformServer
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+XSL = """<xsl:stylesheet version="1.0"
+    xmlns:xsl="http://www.w3.org/1999/XSL/Transform">
+  <xsl:template match="/">
+    <result><xsl:for-each select="//p">
+      <xsl:value-of select="position()"/>: <xsl:value-of select="."/>
+    </xsl:for-each></result>
+  </xsl:template>
+</xsl:stylesheet>
+"""
+
+
+def write(path, name, content):
+    file_path = os.path.join(path, name)
+    with open(file_path, "w", encoding="utf-8") as fp:
+        fp.write(content)
+    return file_path
+
+
+def filepaths(path, xml, xsl):
+    return [
+        xml, xsl,
+        os.path.join(path, "result.txt"),
+        os.path.join(path, "ctrl.txt"),
+        os.path.join(path, "err.txt"),
+    ]
+
+
+def summary(times):
+    times = sorted(times)
+    return {
+        "requests": len(times),
+        "mean_ms": round(sum(times) / len(times) * 1000, 1),
+        "median_ms": round(times[len(times) // 2] * 1000, 1),
+        "max_ms": round(times[-1] * 1000, 1),
+    }
+
+
+def cold_cli(args, requests):
+    env = dict(os.environ, PRODTOOLS_XML_TRANSFORM_SERVER="127.0.0.1:1")
+    times = []
+    for i in range(requests):
+        started = time.time()
+        subprocess.check_call(
+            [sys.executable, os.path.join(ROOT, "xml_transform.py")] + args,
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+        times.append(time.time() - started)
+    return summary(times)
+
+
+def warm_server(args, requests):
+    server = XMLTransformServer(port=0, preload=[args[1]])
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    paths = dict(zip(xml_transform_client.FILEPATHS, args))
+    times = []
+    try:
+        for i in range(requests):
+            started = time.time()
+            response = xml_transform_client.request_transformation(
+                paths, server.server_address)
+            times.append(time.time() - started)
+            assert response["status"] == "done"
+    finally:
+        server.shutdown()
+        server.server_close()
+    return summary(times)
+
+
+def run(requests, xml=None, xsl=None):
+    path = tempfile.mkdtemp()
+    try:
+        xml = xml or write(
+            path, "a.xml", "<doc>{}</doc>".format(
+                "".join(["<p>paragraph {}</p>".format(i)
+                         for i in range(2000)])))
+        xsl = xsl or write(path, "a.xsl", XSL)
+        args = filepaths(path, os.path.abspath(xml), os.path.abspath(xsl))
+        return {
+            "xsl": os.path.basename(xsl),
+            "cold_cli": cold_cli(args, requests),
+            "warm_server": warm_server(args, requests),
+        }
+    finally:
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--xml")
+    parser.add_argument("--xsl")
+    args = parser.parse_args()
+    print(run(args.requests, args.xml, args.xsl))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# coding=utf-8
+"""
+Gera pacotes SPS sintéticos e válidos para os benchmarks: `articles`
+documentos com `references` referências, `figures` figuras (com os
+respectivos arquivos de imagem) e `languages` idiomas (o principal e as
+traduções, em sub-article), além dos dados do periódico (CSV no formato
+de `downloaded_markup_journals.csv`) e do registro de fascículo (i)
+usados no lugar dos serviços web e das bases title e issue.
+"""
+import os
+
+
+LANGUAGES = ("en", "pt", "es", "fr", "de")
+
+ISSN = "1234-5678"
+ACRON = "bjm"
+JOURNAL_TITLE = "Brazilian Journal of Medicine"
+ABBREV_TITLE = "Braz J Med"
+PUBLISHER = "SciELO"
+VOLUME = "10"
+NUMBER = "2"
+YEAR = "2020"
+ISSUE_FOLDER = "v10n2"
+
+JOURNALS_CSV = (
+    "collection\tissn_id\tprint issn\te-issn\tcollection name\tacron\t"
+    "abbrev title\ttitle\tnlm title\tpublisher\tstatus\tlicense\n"
+    "scl\t{issn}\t\t{issn}\tBrasil\t{acron}\t{abbrev}\t{title}\t{abbrev}\t"
+    "{publisher}\tcurrent\tby/4.0\n"
+)
+
+XML = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE article PUBLIC "-//NLM//DTD JATS (Z39.96) Journal Publishing DTD v1.1 20151215//EN" "https://jats.nlm.nih.gov/publishing/1.1/JATS-journalpublishing1.dtd">
+<article xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:mml="http://www.w3.org/1998/Math/MathML" dtd-version="1.1" specific-use="sps-1.9" article-type="research-article" xml:lang="{lang}">
+<front>
+<journal-meta>
+<journal-id journal-id-type="nlm-ta">{abbrev}</journal-id>
+<journal-id journal-id-type="publisher-id">{acron}</journal-id>
+<journal-title-group>
+<journal-title>{title}</journal-title>
+<abbrev-journal-title abbrev-type="publisher">{abbrev}</abbrev-journal-title>
+</journal-title-group>
+<issn pub-type="epub">{issn}</issn>
+<publisher><publisher-name>{publisher}</publisher-name></publisher>
+</journal-meta>
+<article-meta>
+<article-id pub-id-type="doi">10.1590/{issn}-{name}</article-id>
+<article-id pub-id-type="other">{order}</article-id>
+<article-categories><subj-group subj-group-type="heading"><subject>Original Article</subject></subj-group></article-categories>
+<title-group>
+<article-title>Title of the article {i}</article-title>
+{trans_titles}
+</title-group>
+<contrib-group>
+<contrib contrib-type="author"><name><surname>Silva</surname><given-names>Maria {i}</given-names></name><xref ref-type="aff" rid="aff1">1</xref></contrib>
+<contrib contrib-type="author"><name><surname>Souza</surname><given-names>João {i}</given-names></name><xref ref-type="aff" rid="aff1">1</xref></contrib>
+</contrib-group>
+<aff id="aff1"><label>1</label><institution content-type="orgname">Universidade de São Paulo</institution><institution content-type="orgdiv1">Faculdade de Medicina</institution><addr-line><named-content content-type="city">São Paulo</named-content><named-content content-type="state">SP</named-content></addr-line><country country="BR">Brasil</country><institution content-type="original">Faculdade de Medicina, Universidade de São Paulo. São Paulo, SP, Brasil</institution></aff>
+<author-notes><corresp id="c1">Correspondence: <email>maria{i}@example.org</email></corresp></author-notes>
+<pub-date publication-format="electronic" date-type="pub"><day>15</day><month>03</month><year>{year}</year></pub-date>
+<pub-date publication-format="electronic" date-type="collection"><season>Mar-Apr</season><year>{year}</year></pub-date>
+<volume>{volume}</volume>
+<issue>{number}</issue>
+<fpage>{fpage}</fpage>
+<lpage>{lpage}</lpage>
+<history>
+<date date-type="received"><day>05</day><month>01</month><year>{year}</year></date>
+<date date-type="accepted"><day>10</day><month>02</month><year>{year}</year></date>
+</history>
+<permissions><license license-type="open-access" xlink:href="http://creativecommons.org/licenses/by/4.0/" xml:lang="en"><license-p>This is an article published in open access under a Creative Commons license</license-p></license></permissions>
+<abstract><title>Abstract</title><p>Abstract of the article {i}.</p></abstract>
+{trans_abstracts}
+<kwd-group xml:lang="{lang}"><title>Keywords</title><kwd>keyword one</kwd><kwd>keyword two</kwd></kwd-group>
+{trans_kwd_groups}
+<counts><fig-count count="{figures}"/><table-count count="0"/><equation-count count="0"/><ref-count count="{references}"/><page-count count="{pages}"/></counts>
+</article-meta>
+</front>
+<body>
+<sec sec-type="intro"><title>Introduction</title>{paragraphs}</sec>
+<sec sec-type="results"><title>Results</title>{figs}</sec>
+</body>
+<back>
+<ref-list><title>References</title>
+{refs}
+</ref-list>
+</back>
+{sub_articles}
+</article>
+"""
+
+REF = """<ref id="B{n}"><label>{n}</label><mixed-citation>Costa A{n}, Lima B. Title of the cited article {n}. Rev Saude Publica. {ref_year};{n}(2):{fpage}-{lpage}.</mixed-citation>
+<element-citation publication-type="journal">
+<person-group person-group-type="author"><name><surname>Costa</surname><given-names>A{n}</given-names></name><name><surname>Lima</surname><given-names>B</given-names></name></person-group>
+<article-title>Title of the cited article {n}</article-title>
+<source>Rev Saude Publica</source>
+<year>{ref_year}</year>
+<volume>{n}</volume>
+<issue>2</issue>
+<fpage>{fpage}</fpage>
+<lpage>{lpage}</lpage>
+</element-citation></ref>"""
+
+FIG = """<fig id="f{n}{suffix}"><label>Figure {n}</label><caption><title>Caption of the figure {n}</title></caption><graphic xlink:href="{name}-gf{n:02d}.jpg"/><attrib>Source: the authors</attrib></fig>"""
+
+SUB_ARTICLE = """<sub-article article-type="translation" id="s{n}" xml:lang="{lang}">
+<front-stub>
+<article-categories><subj-group subj-group-type="heading"><subject>Artigo Original</subject></subj-group></article-categories>
+<title-group><article-title>Title ({lang}) of the article {i}</article-title></title-group>
+<contrib-group><contrib contrib-type="author"><name><surname>Silva</surname><given-names>Maria {i}</given-names></name><xref ref-type="aff" rid="aff1">1</xref></contrib></contrib-group>
+<abstract><title>Abstract ({lang})</title><p>Abstract ({lang}) of the article {i}.</p></abstract>
+<kwd-group xml:lang="{lang}"><title>Keywords ({lang})</title><kwd>keyword one ({lang})</kwd></kwd-group>
+</front-stub>
+<body>
+<sec><title>Introduction ({lang})</title>{paragraphs}</sec>
+<sec><title>Results ({lang})</title>{figs}</sec>
+</body>
+</sub-article>"""
+
+PARAGRAPH = "<p>Paragraph {n} of the text which cites the reference <xref ref-type=\"bibr\" rid=\"B{ref}\">{ref}</xref>.</p>"
+
+
+def journals_csv(filename):
+    """
+    Grava os dados do periódico no formato de
+    `downloaded_markup_journals.csv`, usado quando as bases não estão
+    disponíveis
+    """
+    with open(filename, "w") as fp:
+        fp.write(JOURNALS_CSV.format(
+            issn=ISSN, acron=ACRON, abbrev=ABBREV_TITLE,
+            title=JOURNAL_TITLE, publisher=PUBLISHER))
+    return filename
+
+
+def issue_record():
+    """
+    Retorna o registro de fascículo (i), como o da base issue
+    """
+    return {
+        "30": ABBREV_TITLE,
+        "35": ISSN,
+        "36": YEAR + "0002",
+        "31": VOLUME,
+        "32": NUMBER,
+        "62": PUBLISHER,
+        "65": YEAR + "0300",
+        "130": JOURNAL_TITLE,
+        "435": [{"_": ISSN, "t": "ONLIN"}],
+        "480": PUBLISHER,
+        "706": "i",
+    }
+
+
+def document_name(i):
+    return "{}-{}-{}-{:02d}-{:04d}".format(
+        ISSN, ACRON, VOLUME, int(NUMBER), i)
+
+
+def _figs(name, figures, suffix=""):
+    return "".join(
+        FIG.format(n=n, name=name, suffix=suffix)
+        for n in range(1, figures + 1))
+
+
+def _paragraphs(references):
+    if references == 0:
+        return "<p>Paragraph of the text.</p>"
+    return "".join(
+        PARAGRAPH.format(n=n, ref=n) for n in range(1, references + 1))
+
+
+def document(i, references, figures, languages):
+    """
+    Retorna o nome e o conteúdo XML do documento `i`
+    """
+    name = document_name(i)
+    langs = LANGUAGES[:max(languages, 1)]
+    paragraphs = _paragraphs(references)
+    fpage = (i - 1) * 10 + 1
+    xml = XML.format(
+        i=i,
+        name=name,
+        order="{:05d}".format(i),
+        lang=langs[0],
+        issn=ISSN,
+        acron=ACRON,
+        title=JOURNAL_TITLE,
+        abbrev=ABBREV_TITLE,
+        publisher=PUBLISHER,
+        year=YEAR,
+        volume=VOLUME,
+        number=NUMBER,
+        fpage=fpage,
+        lpage=fpage + 9,
+        pages=10,
+        figures=figures * len(langs),
+        references=references,
+        trans_titles="".join(
+            '<trans-title-group xml:lang="{lang}"><trans-title>'
+            'Title ({lang}) of the article {i}</trans-title>'
+            '</trans-title-group>'.format(lang=lang, i=i)
+            for lang in langs[1:]),
+        trans_abstracts="".join(
+            '<trans-abstract xml:lang="{lang}"><title>Abstract ({lang})'
+            '</title><p>Abstract ({lang}) of the article {i}.</p>'
+            '</trans-abstract>'.format(lang=lang, i=i)
+            for lang in langs[1:]),
+        trans_kwd_groups="".join(
+            '<kwd-group xml:lang="{lang}"><title>Keywords ({lang})</title>'
+            '<kwd>keyword ({lang})</kwd></kwd-group>'.format(lang=lang)
+            for lang in langs[1:]),
+        paragraphs=paragraphs,
+        figs=_figs(name, figures),
+        refs="\n".join(
+            REF.format(
+                n=n, ref_year=2000 + n % 20, fpage=n * 10, lpage=n * 10 + 9)
+            for n in range(1, references + 1)),
+        sub_articles="\n".join(
+            SUB_ARTICLE.format(
+                n=n, i=i, lang=lang, paragraphs=paragraphs,
+                figs=_figs(name, figures, suffix="s{}".format(n)))
+            for n, lang in enumerate(langs[1:], 1)),
+    )
+    return name, xml
+
+
+def create_sps_package(pkg_path, articles, references=20, figures=2,
+                       languages=1):
+    """
+    Cria em `pkg_path` um pacote SPS sintético e retorna a lista dos
+    caminhos dos arquivos XML
+    """
+    if not os.path.isdir(pkg_path):
+        os.makedirs(pkg_path)
+    xml_files = []
+    for i in range(1, articles + 1):
+        name, xml = document(i, references, figures, languages)
+        xml_file = os.path.join(pkg_path, name + ".xml")
+        with open(xml_file, "w", encoding="utf-8") as fp:
+            fp.write(xml)
+        with open(os.path.join(pkg_path, name + ".pdf"), "wb") as fp:
+            fp.write(b"%PDF-1.4\n%%EOF\n")
+        for n in range(1, figures + 1):
+            image = os.path.join(pkg_path, "{}-gf{:02d}.jpg".format(name, n))
+            with open(image, "wb") as fp:
+                fp.write(b"\xff\xd8\xff\xe0" + b"\0" * 2048 + b"\xff\xd9")
+        xml_files.append(xml_file)
+    return xml_files
@@ -1,6 +1,11 @@
 from unittest import TestCase
 
-from prodtools.data.article import Article
+from prodtools.data.article import (
+    AffiliationXML,
+    Article,
+    ContribXML,
+    ReferenceXML,
+)
 from prodtools.utils import xml_utils
 
 
@@ -235,3 +240,47 @@ class TestArticleXref(TestCase):
         result = self.a.any_xref_ranges
         expected = {"bibr": []}
         self.assertEqual(expected, result)
+
+
+class TestCompactDataModels(TestCase):
+
+    REF = (
+        '<ref id="B{n}"><element-citation publication-type="journal">'
+        '<person-group person-group-type="author"><name>'
+        '<surname>Costa</surname><given-names>A</given-names></name>'
+        '</person-group><source xml:lang="pt">Rev Saude Publica</source>'
+        '<year>2010</year></element-citation></ref>'
+    )
+
+    def test_references_have_no_instance_dict(self):
+        ref_xml = ReferenceXML(
+            xml_utils.etree.fromstring(self.REF.format(n=1)))
+        ref = ref_xml.reference
+        author = ref.contrib_xml_items[0]
+        for item in (ref_xml, ref, author, author.contrib()):
+            self.assertFalse(hasattr(item, "__dict__"))
+        self.assertEqual("Costa", author.contrib().surname)
+        self.assertEqual("journal", ref.publication_type)
+        self.assertEqual("Rev Saude Publica", ref.source)
+
+    def test_repeated_values_are_interned(self):
+        refs = [
+            ReferenceXML(
+                xml_utils.etree.fromstring(self.REF.format(n=n))).reference
+            for n in (1, 2)
+        ]
+        for attr in ("publication_type", "language", "source", "year"):
+            self.assertIs(getattr(refs[0], attr), getattr(refs[1], attr))
+
+    def test_affiliation_has_no_instance_dict(self):
+        aff_xml = AffiliationXML(xml_utils.etree.fromstring(
+            '<aff id="aff1"><country country="BR">Brasil</country></aff>'))
+        aff = aff_xml.aff
+        self.assertFalse(hasattr(aff_xml, "__dict__"))
+        self.assertFalse(hasattr(aff, "__dict__"))
+        self.assertEqual(("BR", "Brasil"), (aff.i_country, aff.country))
+
+    def test_contrib_role_is_set_for_anonymous_author(self):
+        contrib_xml = ContribXML(
+            xml_utils.etree.fromstring('<contrib><anonymous/></contrib>'))
+        self.assertEqual("author", contrib_xml.contrib("author").role)
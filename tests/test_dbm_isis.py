@@ -2,9 +2,13 @@
 
 from unittest import TestCase, skipIf
 from unittest.mock import patch, mock_open
+import os
+import shutil
+import stat
 import sys
+import tempfile
 
-from prodtools.utils.dbm.dbm_isis import IDFile
+from prodtools.utils.dbm.dbm_isis import IDFile, CISIS, UCISIS
 from prodtools.utils import fs_utils
 
 
@@ -237,3 +241,74 @@ class TestIDFile(TestCase):
         records = self.idfile.read(file_path)
         print(records)
         self.assertEqual(records, expected)
+
+
+FAKE_MX = """#!/bin/sh
+echo "mx $*"
+case "$*" in
+    *fail*) echo "error" >&2; exit 3;;
+    *+control*) echo "nxtmfn";;
+esac
+"""
+
+FAKE_ID2I = """#!/bin/sh
+echo "id2i $*" >> "$(dirname "$0")/log.txt"
+touch "${2#create=}.mst" "${2#create=}.xrf"
+"""
+
+
+@skipIf(os.name == "nt", "usa scripts sh como comandos CISIS")
+class TestCISISBatch(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        for name, content in (("mx", FAKE_MX), ("id2i", FAKE_ID2I)):
+            file_path = os.path.join(self.path, name)
+            with open(file_path, "w") as fp:
+                fp.write(content)
+            os.chmod(file_path, stat.S_IRWXU)
+        self.cisis = CISIS(self.path)
+        self.ucisis = UCISIS(self.cisis, CISIS(self.path))
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_batch_runs_the_commands_in_order_in_one_process(self):
+        with self.ucisis.batch() as batch:
+            results = [
+                self.cisis.run_cmd("mx", "a", "now"),
+                self.cisis.run_cmd("mx", "b", "fail"),
+                self.ucisis.cisis1660.run_cmd("mx", "c"),
+            ]
+            self.assertEqual(0, self.ucisis.launches)
+        self.assertEqual(1, self.ucisis.launches)
+        self.assertEqual(3, self.ucisis.executed)
+        self.assertEqual(results, batch.executed)
+        self.assertEqual(
+            ["mx a now", "mx b fail\nerror", "mx c"],
+            [command.output for command in results])
+        self.assertEqual([0, 3, 0], [command.status for command in results])
+
+    def test_get_output_runs_the_gathered_commands_first(self):
+        with self.ucisis.batch():
+            command = self.cisis.run_cmd("mx", "a")
+            self.assertEqual(
+                "mx db +control now\nnxtmfn",
+                self.cisis.get_output("mx", "db", "+control now"))
+            self.assertEqual("mx a", command.output)
+            self.cisis.run_cmd("mx", "b")
+        self.assertEqual(3, self.ucisis.launches)
+        self.assertEqual(3, self.ucisis.executed)
+
+    def test_append_id_to_master_deletes_temporary_db_after_the_batch(self):
+        id_filename = os.path.join(self.path, "00001.id")
+        mst_filename = os.path.join(self.path, "base")
+        with self.ucisis.batch():
+            self.ucisis.append_id_file_to_db(id_filename, mst_filename)
+            self.assertFalse(os.path.isfile(id_filename[:-3] + ".mst"))
+        self.assertFalse(os.path.isfile(id_filename[:-3] + ".mst"))
+        self.assertEqual(1, self.ucisis.launches)
+        with open(os.path.join(self.path, "log.txt")) as fp:
+            self.assertEqual(
+                "id2i {} create={}\n".format(id_filename, id_filename[:-3]),
+                fp.read())
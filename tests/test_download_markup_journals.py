@@ -0,0 +1,18 @@
+from unittest import TestCase
+from unittest.mock import patch, ANY
+
+from prodtools import download_markup_journals
+
+
+class TestMain(TestCase):
+
+    @patch("prodtools.download_markup_journals.open_main_window")
+    @patch("prodtools.download_markup_journals.journals_by_collection")
+    @patch("prodtools.download_markup_journals.ws_journals.Journals")
+    @patch("prodtools.download_markup_journals.config.Configuration")
+    def test_main_checks_the_server_without_waiting_the_refresh_interval(
+            self, MockConfiguration, MockJournals, mock_journals_by_collection,
+            mock_open_main_window):
+        download_markup_journals.main()
+        MockJournals.assert_called_once_with(ANY, min_refresh_interval=0)
+        MockJournals.return_value.update_journals_file.assert_called_once_with()
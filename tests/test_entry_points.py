@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("packtools", "sqlalchemy", "PIL", "scielo_v3_manager")
+
+
+def loaded_modules(module):
+    code = (
+        "import sys; import {}; "
+        "print(' '.join(sorted(sys.modules.keys())))".format(module))
+    output = subprocess.check_output(
+        [sys.executable, "-c", code], cwd=ROOT, universal_newlines=True)
+    return set(output.splitlines()[-1].split())
+
+
+class TestEntryPointsImports(TestCase):
+
+    def assert_lazy(self, module, *more):
+        modules = loaded_modules(module)
+        for name in HEAVY_MODULES + more:
+            self.assertNotIn(name, modules)
+
+    def test_xpm_does_not_import_processing_modules(self):
+        self.assert_lazy("prodtools.xpm", "lxml", "prodtools.processing")
+
+    def test_xc_server_does_not_import_xc(self):
+        self.assert_lazy("prodtools.xc_server", "lxml", "prodtools.xc")
+
+    def test_xml_transform_client_does_not_import_lxml(self):
+        self.assert_lazy("prodtools.xml_transform_client", "lxml")
+
+    def test_xml_versions_reads_versions_ini_on_first_use(self):
+        from prodtools.processing import xml_versions
+        self.assertIn("j1.1", xml_versions.valid_dtd_items())
+        self.assertEqual(
+            xml_versions.valid_dtd_items()[0], xml_versions.default_version())
+
+
+class TestEntryPointsScripts(TestCase):
+
+    def test_scripts_call_main_only_as_main_module(self):
+        # os processos criados com spawn (Windows) pelos
+        # ProcessPoolExecutor importam o script como __mp_main__
+        for name in os.listdir(ROOT):
+            if not name.endswith(".py") or name in ("setup.py", "__init__.py"):
+                continue
+            with open(os.path.join(ROOT, name)) as fp:
+                content = fp.read()
+            if "main()" in content:
+                self.assertIn('if __name__ == "__main__":', content, name)
@@ -3,16 +3,20 @@ from unittest.mock import patch, Mock, ANY
 
 import tempfile
 import os
+import json
+import time
 import shutil
+import socket
 
 
-from prodtools.utils.exporter import Exporter
+from prodtools.utils.exporter import Exporter, FTPUploader, UploadJob
 
 
 class TestExporter(unittest.TestCase):
 
     def setUp(self):
         self.files_path = tempfile.mkdtemp()
+        self.outbox_path = tempfile.mkdtemp()
         for item in "abc":
             with open(os.path.join(self.files_path, item), "w") as fp:
                 fp.write(item)
@@ -25,6 +29,7 @@ class TestExporter(unittest.TestCase):
                 ("password", "password"),
                 ("remote_path", "remote_path"),
                 ("user", "user"),
+                ("outbox_path", self.outbox_path),
             )
         )
 
@@ -34,6 +39,27 @@ class TestExporter(unittest.TestCase):
         MockAsyncFTP.assert_called_once_with(
             ANY, "server", "user", "password", "remote_path"
         )
+        self.assertEqual(
+            self.outbox_path,
+            os.path.dirname(MockAsyncFTP.call_args[0][0]))
+
+    @patch('prodtools.utils.exporter.exp_logger')
+    @patch('prodtools.utils.exporter.AsyncFTP')
+    def test_export_requires_outbox_path(self, MockAsyncFTP, mk_logger):
+        data = dict(
+            (
+                ("server", "server"),
+                ("password", "password"),
+                ("remote_path", "remote_path"),
+                ("user", "user"),
+                ("outbox_path", ""),
+            )
+        )
+        exporter = Exporter(data)
+        self.assertIsNone(exporter.export(self.files_path, "xxx.zip"))
+        MockAsyncFTP.assert_not_called()
+        mk_logger.error.assert_called_once_with(
+            "Exporter: Missing outbox_path Configuration")
 
     @patch('prodtools.utils.exporter.exp_logger')
     def test_export_raises_configuration_error(self, mk_logger):
@@ -50,3 +76,157 @@ class TestExporter(unittest.TestCase):
 
     def tearDown(self):
         shutil.rmtree(self.files_path)
+        shutil.rmtree(self.outbox_path)
+
+
+class TestFTPUploader(unittest.TestCase):
+
+    def setUp(self):
+        self.outbox = tempfile.mkdtemp()
+        self.source = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.outbox)
+        shutil.rmtree(self.source)
+
+    def _create_file(self, path, name, content=b"zip content"):
+        file_path = os.path.join(path, name)
+        with open(file_path, "wb") as fp:
+            fp.write(content)
+        return file_path
+
+    def _uploader(self, retries=2, retry_interval=None):
+        return FTPUploader(
+            self.outbox, "server:2121", "user", "password", "remote_path",
+            max_workers=2, retries=retries, backoff=0,
+            retry_interval=retry_interval)
+
+    def _create_lock(self, file_path, pid=None):
+        with open(file_path, "w") as fp:
+            json.dump({
+                "pid": pid or os.getpid(),
+                "host": socket.gethostname(),
+                "time": time.time()}, fp)
+
+    @patch('prodtools.utils.exporter.FTP')
+    def test_submit_moves_file_to_outbox_and_deletes_it_after_upload(self, MockFTP):
+        uploader = self._uploader()
+        job = uploader.submit(self._create_file(self.source, "a.zip"))
+        uploader.wait()
+
+        self.assertEqual(UploadJob.DONE, job.state)
+        self.assertEqual(1, job.attempts)
+        self.assertEqual(11, job.size)
+        MockFTP.return_value.connect.assert_called_once_with("server", 2121)
+        MockFTP.return_value.cwd.assert_called_once_with("remote_path")
+        MockFTP.return_value.storbinary.assert_called_once_with(
+            "STOR a.zip", ANY)
+        self.assertEqual(["uploads.log"], os.listdir(self.outbox))
+        self.assertEqual([], os.listdir(self.source))
+
+    @patch('prodtools.utils.exporter.FTP')
+    def test_upload_is_retried(self, MockFTP):
+        MockFTP.return_value.storbinary.side_effect = [
+            EOFError("connection lost"), None]
+        uploader = self._uploader()
+        job = uploader.submit(self._create_file(self.outbox, "a.zip"))
+        uploader.wait()
+
+        self.assertEqual(UploadJob.DONE, job.state)
+        self.assertEqual(2, job.attempts)
+        self.assertIsNone(job.error)
+
+    @patch('prodtools.utils.exporter.FTP')
+    def test_failed_upload_keeps_file_in_outbox(self, MockFTP):
+        MockFTP.return_value.login.side_effect = EOFError("refused")
+        uploader = self._uploader(retries=1)
+        job = uploader.submit(self._create_file(self.outbox, "a.zip"))
+        uploader.wait()
+
+        self.assertEqual(UploadJob.FAILED, job.state)
+        self.assertEqual(2, job.attempts)
+        self.assertEqual("refused", job.error)
+        self.assertTrue(os.path.isfile(os.path.join(self.outbox, "a.zip")))
+        status = uploader.status()
+        self.assertEqual("failed", status["a.zip"]["state"])
+        self.assertEqual(0, status["a.zip"]["throughput"])
+
+    @patch('prodtools.utils.exporter.FTP')
+    def test_resume_uploads_files_left_in_outbox(self, MockFTP):
+        self._create_file(self.outbox, "a.zip")
+        self._create_file(self.outbox, "b.zip")
+        self._create_file(self.outbox, "uploads.log", b"")
+        uploader = self._uploader()
+        jobs = uploader.resume()
+        uploader.wait()
+
+        self.assertEqual(["a.zip", "b.zip"], [job.name for job in jobs])
+        self.assertEqual(
+            ["done", "done"],
+            [item["state"] for name, item in sorted(uploader.status().items())])
+        self.assertEqual(2, MockFTP.return_value.storbinary.call_count)
+        with open(uploader.log_file_path) as fp:
+            self.assertEqual(2, len(fp.read().splitlines()))
+
+    @patch('prodtools.utils.exporter.FTP')
+    def test_failed_upload_is_scheduled_again(self, MockFTP):
+        MockFTP.return_value.login.side_effect = [
+            EOFError("refused"), None]
+        uploader = self._uploader(retries=0, retry_interval=0.01)
+        job = uploader.submit(self._create_file(self.outbox, "a.zip"))
+        uploader.wait()
+        self.assertEqual(UploadJob.FAILED, job.state)
+        for i in range(100):
+            if uploader.status()["a.zip"]["state"] == "done":
+                break
+            time.sleep(0.05)
+        uploader.wait()
+        uploader.close()
+
+        self.assertEqual("done", uploader.status()["a.zip"]["state"])
+        self.assertFalse(os.path.isfile(os.path.join(self.outbox, "a.zip")))
+
+    @patch('prodtools.utils.exporter.FTP')
+    def test_upload_skips_file_locked_by_another_process(self, MockFTP):
+        file_path = self._create_file(self.outbox, "a.zip")
+        self._create_lock(file_path + ".lock")
+        uploader = self._uploader()
+        job = uploader.submit(file_path)
+        uploader.wait()
+
+        self.assertEqual(UploadJob.SKIPPED, job.state)
+        self.assertTrue(os.path.isfile(file_path))
+        MockFTP.return_value.storbinary.assert_not_called()
+
+    @patch('prodtools.utils.exporter.FTP')
+    def test_upload_skips_file_already_uploaded_by_another_process(self, MockFTP):
+        file_path = self._create_file(self.outbox, "a.zip")
+        uploader = self._uploader()
+        os.unlink(file_path)
+        job = UploadJob(file_path)
+        self.assertEqual(0, job.size)
+        uploader._upload(job)
+
+        self.assertEqual(UploadJob.SKIPPED, job.state)
+        MockFTP.return_value.storbinary.assert_not_called()
+
+    @patch('prodtools.utils.exporter.FTP')
+    def test_resume_does_nothing_if_another_process_is_resuming(self, MockFTP):
+        self._create_file(self.outbox, "a.zip")
+        self._create_lock(os.path.join(self.outbox, "outbox.lock"))
+        uploader = self._uploader()
+
+        self.assertEqual([], uploader.resume())
+        self.assertTrue(os.path.isfile(os.path.join(self.outbox, "a.zip")))
+
+    @patch('prodtools.utils.fs_utils.os.kill', side_effect=ProcessLookupError)
+    @patch('prodtools.utils.exporter.FTP')
+    def test_resume_removes_lock_of_finished_process(self, MockFTP, mock_kill):
+        self._create_file(self.outbox, "a.zip")
+        self._create_lock(os.path.join(self.outbox, "outbox.lock"), pid=1)
+        uploader = self._uploader()
+        jobs = uploader.resume()
+        uploader.wait()
+
+        self.assertEqual(["done"], [job.state for job in jobs])
+        self.assertEqual(["uploads.log"], os.listdir(self.outbox))
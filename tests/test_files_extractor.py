@@ -0,0 +1,128 @@
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+
+from prodtools.utils import files_extractor
+from prodtools.utils import fs_utils
+
+
+def create_zip(path, members):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+    return path
+
+
+def create_tar(path, members, mode):
+    with tarfile.open(path, mode) as tf:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tf.addfile(info, io.BytesIO(content))
+    return path
+
+
+MEMBERS = {
+    "a01.xml": b"<article/>",
+    "pkg/a01-gf01.jpg": b"jpg",
+    "pkg/deep/ignored.txt": b"ignored",
+}
+
+
+class TestExtractFile(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.dest = os.path.join(self.path, "dest")
+        os.makedirs(self.dest)
+        self.cwd = os.getcwd()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _archives(self):
+        return [
+            create_zip(os.path.join(self.path, "p.zip"), MEMBERS),
+            create_tar(os.path.join(self.path, "p.tar.gz"), MEMBERS, "w:gz"),
+            create_tar(os.path.join(self.path, "p.tbz"), MEMBERS, "w:bz2"),
+        ]
+
+    def test_extract_file_keeps_tree_and_cwd(self):
+        for archive in self._archives():
+            with self.subTest(archive=archive):
+                dest = os.path.join(self.path, os.path.basename(archive) + "_")
+                os.makedirs(dest)
+                self.assertTrue(files_extractor.extract_file(archive, dest))
+                self.assertTrue(os.path.isfile(
+                    os.path.join(dest, "pkg", "deep", "ignored.txt")))
+                self.assertEqual(self.cwd, os.getcwd())
+
+    def test_extract_file_with_flatten(self):
+        for archive in self._archives():
+            with self.subTest(archive=archive):
+                dest = os.path.join(self.path, os.path.basename(archive) + "_")
+                os.makedirs(dest)
+                self.assertTrue(
+                    files_extractor.extract_file(archive, dest, flatten=True))
+                self.assertEqual(
+                    ["a01-gf01.jpg", "a01.xml"], sorted(os.listdir(dest)))
+
+    def test_extract_file_rejects_too_many_members(self):
+        archive = create_zip(os.path.join(self.path, "p.zip"), MEMBERS)
+        limits = files_extractor.ExtractionLimits(max_members=2)
+        self.assertFalse(
+            files_extractor.extract_file(archive, self.dest, limits))
+        self.assertEqual([], os.listdir(self.dest))
+
+    def test_extract_file_rejects_total_size(self):
+        archive = create_zip(os.path.join(self.path, "p.zip"), MEMBERS)
+        limits = files_extractor.ExtractionLimits(max_total_size=10)
+        self.assertFalse(
+            files_extractor.extract_file(archive, self.dest, limits))
+        self.assertEqual([], os.listdir(self.dest))
+
+    def test_extract_file_rejects_compression_ratio(self):
+        archive = create_zip(
+            os.path.join(self.path, "p.zip"),
+            {"bomb.xml": b"0" * files_extractor.MIN_SIZE_TO_CHECK_RATIO})
+        limits = files_extractor.ExtractionLimits(max_compression_ratio=10)
+        self.assertFalse(
+            files_extractor.extract_file(archive, self.dest, limits))
+        self.assertEqual([], os.listdir(self.dest))
+
+    def test_extract_file_rejects_path_traversal(self):
+        archive = create_zip(
+            os.path.join(self.path, "p.zip"), {"../evil.txt": b"x"})
+        self.assertFalse(files_extractor.extract_file(archive, self.dest))
+        self.assertFalse(os.path.isfile(os.path.join(self.path, "evil.txt")))
+
+    def test_extract_file_returns_false_for_invalid_file(self):
+        archive = os.path.join(self.path, "p.zip")
+        with open(archive, "w") as fp:
+            fp.write("not a zip")
+        self.assertFalse(files_extractor.extract_file(archive, self.dest))
+
+    def test_extract_archive_returns_result(self):
+        archive = create_zip(os.path.join(self.path, "p.zip"), MEMBERS)
+        result = files_extractor.extract_archive(archive, self.dest)
+        self.assertEqual(3, len(result.files))
+        self.assertEqual(20, result.size)
+
+    def test_extract_package_concurrently(self):
+        archives = []
+        for i in range(8):
+            archives.append(create_zip(
+                os.path.join(self.path, "p%i.zip" % i),
+                {"pkg/a%i.xml" % i: b"<article/>"}))
+        dests = [os.path.join(self.path, "q%i" % i) for i in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(fs_utils.extract_package, archives, dests))
+        self.assertEqual([True] * 8, results)
+        for i, dest in enumerate(dests):
+            self.assertEqual(["a%i.xml" % i], os.listdir(dest))
@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+from unittest.mock import Mock, patch
+
+from prodtools.server.filestransfer import SciELOWebFilesTransfer
+from prodtools.utils import remote_server
+from prodtools.utils.remote_server import RemoteServer
+
+
+def create_config(servers, local_web_app_path, remote_web_app_path="/var/www"):
+    return Mock(
+        is_enabled_transference=True,
+        transference_user="user",
+        transference_servers=servers,
+        transference_max_workers=4,
+        transference_retries=1,
+        local_web_app_path=local_web_app_path,
+        remote_web_app_path=remote_web_app_path,
+    )
+
+
+class TestRemoteServer(TestCase):
+
+    def test_rsync_command_for_remote_server_with_port(self):
+        server = RemoteServer("scielo.org:2222", "user")
+        self.assertEqual(
+            ["rsync", "-CrK", "--stats", "-e", "ssh -p 2222",
+             "/local/pdf/", "user@scielo.org:/remote/pdf"],
+            server.rsync_command("/local/pdf", "/remote/pdf"))
+
+    def test_rsync_command_for_local_server_copying_folder(self):
+        server = RemoteServer("/tmp/server1", "user")
+        self.assertTrue(server.is_local)
+        self.assertEqual(
+            ["rsync", "-CrK", "--stats", "/local/bases/title",
+             "/tmp/server1/remote/bases/"],
+            server.rsync_command("/local/bases/title", "/remote/bases/", True))
+
+    def test_rsync_transferred_bytes(self):
+        output = "Number of files: 3\nTotal transferred file size: 1,234 bytes\n"
+        self.assertEqual(
+            1234, remote_server.rsync_transferred_bytes(output))
+
+    @patch("prodtools.utils.remote_server.time.sleep")
+    @patch("prodtools.utils.remote_server.execute")
+    def test_transfer_retries_after_failure(self, mock_execute, mock_sleep):
+        mock_execute.side_effect = [
+            (0, ""), (12, "connection reset"),
+            (0, ""), (0, "Total transferred file size: 10 bytes"),
+        ]
+        server = RemoteServer("scielo.org", "user")
+        result = server.transfer("/local/pdf", "/remote/pdf", retries=2)
+        self.assertTrue(result.ok)
+        self.assertEqual(2, result.attempts)
+        self.assertEqual(10, result.bytes)
+        mock_sleep.assert_called_once_with(1)
+
+    @patch("prodtools.utils.remote_server.time.sleep")
+    @patch("prodtools.utils.remote_server.execute")
+    def test_transfer_fails_after_retries(self, mock_execute, mock_sleep):
+        mock_execute.return_value = (255, "ssh: connect to host")
+        server = RemoteServer("scielo.org", "user")
+        result = server.transfer("/local/pdf", "/remote/pdf", retries=1)
+        self.assertFalse(result.ok)
+        self.assertEqual(255, result.exit_code)
+        self.assertEqual(2, result.attempts)
+
+
+class TestSciELOWebFilesTransfer(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.local = os.path.join(self.path, "local")
+        self.servers = [
+            os.path.join(self.path, "server1"),
+            os.path.join(self.path, "server2"),
+        ]
+        for folder in ("htdocs/img/revistas", "bases/pdf", "bases/xml"):
+            issue_path = os.path.join(self.local, folder, "acron", "v1n1")
+            os.makedirs(issue_path)
+            with open(os.path.join(issue_path, "a01.txt"), "w") as fp:
+                fp.write(folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    @patch("prodtools.utils.remote_server.execute")
+    def test_transfer_website_files_to_all_servers_and_folders(self, mock_execute):
+        mock_execute.return_value = (0, "Total transferred file size: 5 bytes")
+        transfer = SciELOWebFilesTransfer(
+            create_config(["web1", "web2"], self.local))
+        summary = transfer.transfer_website_files("acron", "v1n1")
+        self.assertTrue(summary.ok)
+        self.assertEqual(6, len(summary.results))
+        self.assertEqual(30, summary.bytes)
+        expected = {
+            (server, "/var/www" + folder + "acron/v1n1")
+            for server in ("web1", "web2")
+            for folder in ('/htdocs/img/revistas/', '/bases/pdf/', '/bases/xml/')
+        }
+        self.assertEqual(
+            expected, {(r.server, r.dest) for r in summary.results})
+
+    @patch("prodtools.utils.remote_server.time.sleep")
+    @patch("prodtools.utils.remote_server.execute")
+    def test_transfer_report_files_reports_failures(self, mock_execute, mock_sleep):
+        mock_execute.return_value = (23, "partial transfer")
+        transfer = SciELOWebFilesTransfer(
+            create_config(["web1"], self.local))
+        summary = transfer.transfer_report_files("acron", "v1n1")
+        self.assertFalse(summary.ok)
+        self.assertEqual(1, len(summary.failures))
+
+    def test_transfer_files_returns_none_if_transference_is_disabled(self):
+        config = create_config(["web1"], self.local)
+        config.is_enabled_transference = False
+        transfer = SciELOWebFilesTransfer(config)
+        self.assertIsNone(transfer.transfer_website_files("acron", "v1n1"))
+
+    @skipIf(shutil.which("rsync") is None, "rsync is not installed")
+    def test_transfer_website_files_to_local_servers(self):
+        transfer = SciELOWebFilesTransfer(
+            create_config(self.servers, self.local, "/var/www"))
+        summary = transfer.transfer_website_files("acron", "v1n1")
+        self.assertTrue(summary.ok, str(summary))
+        for server in self.servers:
+            for folder in ("htdocs/img/revistas", "bases/pdf", "bases/xml"):
+                self.assertTrue(os.path.isfile(os.path.join(
+                    server, "var/www", folder, "acron", "v1n1", "a01.txt")))
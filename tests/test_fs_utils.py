@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import socket
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from prodtools.utils import fs_utils
+
+
+class TestFilesPropagation(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.src = os.path.join(self.path, "a01.pdf")
+        with open(self.src, "wb") as fp:
+            fp.write(b"pdf content")
+        self.dest_path = os.path.join(self.path, "dest")
+        os.makedirs(self.dest_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def read(self, file_path):
+        with open(file_path, "rb") as fp:
+            return fp.read()
+
+    def test_propagate_to_folder_uses_links_in_the_same_filesystem(self):
+        propagation = fs_utils.FilesPropagation(hardlinks=True)
+        dest = propagation.propagate(self.src, self.dest_path)
+        self.assertEqual(os.path.join(self.dest_path, "a01.pdf"), dest)
+        self.assertEqual(b"pdf content", self.read(dest))
+        self.assertEqual(11, propagation.bytes_avoided)
+        self.assertEqual(0, propagation.copied)
+
+    def test_propagate_copies_if_links_are_disabled(self):
+        propagation = fs_utils.FilesPropagation(use_links=False)
+        dest = propagation.propagate(
+            self.src, os.path.join(self.dest_path, "b.pdf"))
+        self.assertEqual(b"pdf content", self.read(dest))
+        self.assertFalse(os.path.samefile(self.src, dest))
+        self.assertEqual(1, propagation.copied)
+        self.assertEqual(11, propagation.bytes_copied)
+
+    def test_propagate_does_not_hardlink_by_default(self):
+        propagation = fs_utils.FilesPropagation()
+        dest = propagation.propagate(self.src, self.dest_path)
+        self.assertEqual(0, propagation.linked)
+        with open(self.src, "wb") as fp:
+            fp.write(b"changed")
+        self.assertEqual(b"pdf content", self.read(dest))
+
+    @patch("prodtools.utils.fs_utils._hardlink", return_value=False)
+    @patch("prodtools.utils.fs_utils._reflink", return_value=False)
+    def test_propagate_falls_back_to_copy(self, mock_reflink, mock_hardlink):
+        propagation = fs_utils.FilesPropagation()
+        dest = propagation.propagate(self.src, self.dest_path)
+        self.assertEqual(b"pdf content", self.read(dest))
+        self.assertEqual(1, propagation.copied)
+        self.assertEqual(0, propagation.bytes_avoided)
+
+    def test_propagate_replaces_dest_without_changing_other_links(self):
+        other = os.path.join(self.path, "other.pdf")
+        with open(other, "wb") as fp:
+            fp.write(b"other")
+        dest = os.path.join(self.dest_path, "a01.pdf")
+        os.link(other, dest)
+        fs_utils.FilesPropagation().propagate(self.src, dest)
+        self.assertEqual(b"pdf content", self.read(dest))
+        self.assertEqual(b"other", self.read(other))
+
+    def test_propagate_ignores_same_file(self):
+        propagation = fs_utils.FilesPropagation(hardlinks=True)
+        dest = propagation.propagate(self.src, self.dest_path)
+        propagation.propagate(self.src, dest)
+        self.assertEqual(b"pdf content", self.read(dest))
+        self.assertEqual(11, propagation.bytes_avoided)
+
+
+class TestFileLock(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.lock = fs_utils.FileLock(os.path.join(self.path, "a.lock"), 60)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write_lock(self, **owner):
+        with open(self.lock.lock_file, "w") as fp:
+            json.dump(owner, fp)
+
+    def test_acquire_and_release(self):
+        self.assertTrue(self.lock.acquire())
+        self.assertEqual(os.getpid(), self.lock.owner["pid"])
+        self.assertFalse(self.lock.is_free)
+        self.assertFalse(
+            fs_utils.FileLock(self.lock.lock_file, 60).acquire())
+        self.lock.release()
+        self.assertTrue(self.lock.is_free)
+        self.assertTrue(self.lock.acquire())
+
+    def test_acquire_removes_lock_of_finished_process(self):
+        self.write_lock(pid=2 ** 22 + 1, host=socket.gethostname(),
+                        time=time.time())
+        with patch("prodtools.utils.fs_utils.os.kill",
+                   side_effect=ProcessLookupError):
+            self.assertTrue(self.lock.is_free)
+            self.assertTrue(self.lock.acquire())
+        self.assertEqual(os.getpid(), self.lock.owner["pid"])
+
+    def test_acquire_removes_old_lock(self):
+        self.write_lock(pid=1, host="other", time=time.time() - 120)
+        self.assertTrue(self.lock.acquire())
+
+    def test_acquire_keeps_lock_of_other_host(self):
+        self.write_lock(pid=1, host="other", time=time.time())
+        self.assertFalse(self.lock.acquire())
@@ -0,0 +1,259 @@
+import os
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+from unittest import TestCase
+
+from prodtools.utils import ftp_service
+
+
+class FTPHandler(socketserver.StreamRequestHandler):
+    """
+    Servidor FTP mínimo (somente leitura/exclusão em `server.root`)
+    para testar FTPService
+    """
+
+    def reply(self, text):
+        self.wfile.write((text + "\r\n").encode("utf-8"))
+
+    def path(self, arg):
+        return os.path.join(self.server.root, arg.lstrip("/"))
+
+    def data_connection(self):
+        conn, addr = self.pasv.accept()
+        self.pasv.close()
+        self.pasv = None
+        return conn
+
+    def handle(self):
+        self.pasv = None
+        self.rest = 0
+        self.reply("220 stand-in")
+        for line in self.rfile:
+            line = line.decode("utf-8").rstrip("\r\n")
+            cmd, _, arg = line.partition(" ")
+            cmd = cmd.upper()
+            if cmd == "USER":
+                self.reply("331 password")
+            elif cmd == "PASS":
+                self.reply("230 logged in")
+            elif cmd == "TYPE":
+                self.reply("200 type")
+            elif cmd == "PASV":
+                self.pasv = socket.socket()
+                self.pasv.bind(("127.0.0.1", 0))
+                self.pasv.listen(1)
+                port = self.pasv.getsockname()[1]
+                self.reply("227 Entering Passive Mode (127,0,0,1,%i,%i)" % (
+                    port // 256, port % 256))
+            elif cmd == "NLST":
+                path = self.path(arg)
+                if not os.path.isdir(path):
+                    self.reply("550 not found")
+                    continue
+                self.reply("150 listing")
+                conn = self.data_connection()
+                conn.sendall("".join(
+                    [item + "\r\n" for item in sorted(os.listdir(path))]
+                ).encode("utf-8"))
+                conn.close()
+                self.reply("226 done")
+            elif cmd == "SIZE":
+                path = self.path(arg)
+                if self.server.without_size:
+                    self.reply("502 not implemented")
+                elif os.path.isfile(path):
+                    self.reply("213 %i" % os.path.getsize(path))
+                else:
+                    self.reply("550 not found")
+            elif cmd == "MDTM":
+                path = self.path(arg)
+                if os.path.isfile(path):
+                    self.reply("213 %i" % int(os.path.getmtime(path)))
+                else:
+                    self.reply("550 not found")
+            elif cmd == "REST":
+                self.rest = int(arg)
+                self.reply("350 restarting")
+            elif cmd == "RETR":
+                with open(self.path(arg), "rb") as fp:
+                    fp.seek(self.rest)
+                    content = fp.read()
+                self.server.retr.append((arg, self.rest))
+                self.rest = 0
+                self.reply("150 sending")
+                conn = self.data_connection()
+                fail_after = self.server.fail_after.pop(arg, None)
+                if fail_after is not None:
+                    conn.sendall(content[:fail_after])
+                    conn.close()
+                    self.reply("426 transfer aborted")
+                    continue
+                conn.sendall(content)
+                conn.close()
+                self.reply("226 done")
+            elif cmd == "DELE":
+                os.unlink(self.path(arg))
+                self.reply("250 deleted")
+            elif cmd == "QUIT":
+                self.reply("221 bye")
+                break
+            else:
+                self.reply("502 not implemented")
+
+
+class FTPServerStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, root):
+        super().__init__(("127.0.0.1", 0), FTPHandler)
+        self.root = root
+        self.fail_after = {}
+        self.retr = []
+        self.without_size = False
+
+    @property
+    def address(self):
+        return "127.0.0.1:%i" % self.server_address[1]
+
+
+class TestFTPService(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.root = os.path.join(self.path, "ftp")
+        self.local = os.path.join(self.path, "download")
+        os.makedirs(os.path.join(self.root, "incoming", "sub"))
+        self.files = {
+            "incoming/a.zip": b"a" * 5000,
+            "incoming/b.tgz": b"b" * 3000,
+            "incoming/sub/c.zip": b"c" * 100,
+        }
+        for name, content in self.files.items():
+            with open(os.path.join(self.root, name), "wb") as fp:
+                fp.write(content)
+        self.server = FTPServerStandIn(self.root)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.path)
+
+    def service(self, **kwargs):
+        return ftp_service.FTPService(
+            self.server.address, "user", "pswd", **kwargs)
+
+    def read(self, name):
+        with open(os.path.join(self.local, name), "rb") as fp:
+            return fp.read()
+
+    def test_download_files_downloads_and_deletes_packages(self):
+        files = self.service(max_workers=3).download_files(
+            self.local, "incoming")
+        self.assertEqual(["a.zip", "b.tgz", "sub_c.zip"], sorted(files))
+        self.assertEqual(b"a" * 5000, self.read("a.zip"))
+        self.assertEqual(b"c" * 100, self.read("sub_c.zip"))
+        self.assertEqual([], os.listdir(self.local + "_partial"))
+        self.assertFalse(
+            os.path.isfile(os.path.join(self.root, "incoming", "a.zip")))
+        self.assertFalse(
+            os.path.isfile(os.path.join(self.root, "incoming/sub/c.zip")))
+
+    def test_download_files_resumes_interrupted_transfer(self):
+        self.server.fail_after["incoming/a.zip"] = 1200
+        service = self.service(max_workers=1)
+        files = service.download_files(self.local, "incoming")
+        self.assertIn("a.zip", files)
+        self.assertEqual(b"a" * 5000, self.read("a.zip"))
+        self.assertIn(("incoming/a.zip", 1200), self.server.retr)
+        result = [r for r in service.results if r.name == "a.zip"][0]
+        self.assertEqual(2, result.attempts)
+        self.assertTrue(result.deleted)
+
+    def test_download_files_resumes_previous_partial_file(self):
+        self.server.fail_after["incoming/b.tgz"] = 1000
+        files = self.service(retries=0).download_files(
+            self.local, "incoming")
+        self.assertNotIn("b.tgz", files)
+        self.assertFalse(os.path.isfile(os.path.join(self.local, "b.tgz")))
+
+        files = self.service().download_files(self.local, "incoming")
+        self.assertEqual(["b.tgz"], files)
+        self.assertEqual(b"b" * 3000, self.read("b.tgz"))
+        self.assertIn(("incoming/b.tgz", 1000), self.server.retr)
+
+    def test_download_files_discards_partial_file_of_another_download(self):
+        os.makedirs(self.local)
+        os.makedirs(self.local + "_partial")
+        with open(os.path.join(self.local + "_partial", "b.tgz"), "wb") as fp:
+            fp.write(b"x" * 1000)
+        with open(os.path.join(self.local, "a.zip"), "wb") as fp:
+            fp.write(b"x" * 5000)
+        self.service().download_files(self.local, "incoming")
+        self.assertEqual(b"b" * 3000, self.read("b.tgz"))
+        self.assertEqual(b"a" * 5000, self.read("a.zip"))
+        self.assertIn(("incoming/b.tgz", 0), self.server.retr)
+        self.assertIn(("incoming/a.zip", 0), self.server.retr)
+
+    def test_download_files_keeps_packages_with_the_same_name(self):
+        with open(os.path.join(self.root, "incoming/sub/a.zip"), "wb") as fp:
+            fp.write(b"s" * 10)
+        files = self.service(max_workers=4).download_files(
+            self.local, "incoming")
+        self.assertEqual(
+            ["a.zip", "b.tgz", "sub_a.zip", "sub_c.zip"], sorted(files))
+        self.assertEqual(b"a" * 5000, self.read("a.zip"))
+        self.assertEqual(b"s" * 10, self.read("sub_a.zip"))
+
+    def test_local_file_name(self):
+        self.assertEqual("a.zip", ftp_service.local_file_name(
+            "incoming/", "incoming/a.zip"))
+        self.assertEqual("x_y_a.zip", ftp_service.local_file_name(
+            "incoming", "incoming/x/y/a.zip"))
+        self.assertEqual("x_a-1.zip", ftp_service.local_file_name(
+            "incoming", "incoming/x/a.zip", {"x_a.zip"}))
+
+    def test_download_files_does_not_delete_incomplete_file(self):
+        self.server.fail_after["incoming/a.zip"] = 10
+        files = self.service(max_workers=1, retries=0).download_files(
+            self.local, "incoming")
+        self.assertNotIn("a.zip", files)
+        self.assertTrue(
+            os.path.isfile(os.path.join(self.root, "incoming", "a.zip")))
+
+    def test_download_files_without_size_downloads_again_after_failure(self):
+        self.server.without_size = True
+        self.server.fail_after["incoming/a.zip"] = 1200
+        service = self.service(max_workers=1)
+        files = service.download_files(self.local, "incoming")
+        self.assertIn("a.zip", files)
+        self.assertEqual(b"a" * 5000, self.read("a.zip"))
+        self.assertEqual(
+            2, self.server.retr.count(("incoming/a.zip", 0)))
+        result = [r for r in service.results if r.name == "a.zip"][0]
+        self.assertEqual(2, result.attempts)
+        self.assertFalse(result.deleted)
+        self.assertTrue(
+            os.path.isfile(os.path.join(self.root, "incoming", "a.zip")))
+        self.assertFalse(
+            os.path.isfile(os.path.join(self.root, "incoming", "b.tgz")))
+
+    def test_download_files_without_size_keeps_truncated_file_partial(self):
+        self.server.without_size = True
+        self.server.fail_after["incoming/a.zip"] = 1200
+        files = self.service(max_workers=1, retries=0).download_files(
+            self.local, "incoming")
+        self.assertNotIn("a.zip", files)
+        self.assertFalse(os.path.isfile(os.path.join(self.local, "a.zip")))
+        self.assertTrue(
+            os.path.isfile(os.path.join(self.root, "incoming", "a.zip")))
+
+    def test_download_files_of_missing_folder(self):
+        files = self.service().download_files(self.local, "missing")
+        self.assertEqual([], files)
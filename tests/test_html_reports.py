@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from prodtools.reports import html_reports
+
+
+def read(filename):
+    with open(filename, encoding="utf-8") as fp:
+        return fp.read()
+
+
+def rows(total):
+    for i in range(total):
+        yield {
+            "label": "item %i" % i,
+            "status": "ERROR" if i % 2 else "OK",
+            "message": "message <b>%i</b>" % i,
+        }
+
+
+@patch("prodtools.reports.html_reports.report_date", return_value="<p>date</p>")
+class TestReportWriter(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.filename = os.path.join(self.path, "reports", "report.html")
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_save_writes_same_content_as_html(self, mock_date):
+        body = html_reports.tag("p", "content")
+        html_reports.save(self.filename, "Title", body)
+        self.assertEqual(
+            html_reports.html("Title", body), read(self.filename))
+
+    def test_save_writes_same_content_as_html_with_math(self, mock_date):
+        body = "<mml:math><mml:mi>x</mml:mi></mml:math>"
+        html_reports.save(self.filename, ["Title", "Subtitle"], body)
+        self.assertEqual(
+            html_reports.html(["Title", "Subtitle"], body),
+            read(self.filename))
+
+    def test_write_sheet_writes_same_content_as_sheet(self, mock_date):
+        header = ["label", "status", "message"]
+        with html_reports.ReportWriter(self.filename, "Title") as writer:
+            writer.write_sheet(header, rows(10))
+        expected = html_reports.html(
+            "Title", html_reports.sheet(header, list(rows(10))))
+        self.assertEqual(expected, read(self.filename))
+
+    def test_write_sheet_writes_div_if_rows_have_paragraphs(self, mock_date):
+        header = ["label", "message"]
+        data = [{"label": "a", "message": "<div><p>a</p></div>"}]
+        with html_reports.ReportWriter(self.filename, "Title") as writer:
+            writer.write_sheet(header, iter(data), html_cell_content=["message"])
+        expected = html_reports.html(
+            "Title",
+            html_reports.sheet(header, data, html_cell_content=["message"]))
+        self.assertEqual(expected, read(self.filename))
+        self.assertIn("<div><table", expected)
+
+    def test_write_sheet_writes_same_content_as_sheet_without_rows(self, mock_date):
+        header = ["label", "message"]
+        with html_reports.ReportWriter(self.filename, "Title") as writer:
+            writer.write_sheet(header, iter([]))
+        expected = html_reports.html("Title", html_reports.sheet(header, []))
+        self.assertEqual(expected, read(self.filename))
+
+    def test_write_sheet_spools_large_tables(self, mock_date):
+        header = ["label", "status", "message"]
+        with patch("prodtools.reports.html_reports.SPOOL_MAX_SIZE", 100):
+            with html_reports.ReportWriter(self.filename, "Title") as writer:
+                writer.write_sheet(header, rows(100))
+        expected = html_reports.html(
+            "Title", html_reports.sheet(header, list(rows(100))))
+        self.assertEqual(expected, read(self.filename))
+        self.assertEqual(len(expected), writer.size)
+
+    def test_tabbed_report_write(self, mock_date):
+        report = html_reports.TabbedReport(
+            {"a": "Tab A", "b": "Tab B", "c": "Tab C"},
+            ["a", "b", "c"],
+            {"a": "<p>{PATH} a</p>", "c": "<p>c</p>"},
+            "c")
+        with html_reports.ReportWriter(self.filename, "Title") as writer:
+            report.write(writer, lambda c: c.replace("{PATH}", "/path"))
+        expected = html_reports.html(
+            "Title", report.report_content.replace("{PATH}", "/path"))
+        self.assertEqual(expected, read(self.filename))
+
+    def test_hide_and_show_blocks_report_write(self, mock_date):
+        def report():
+            items = []
+            for name in ("a", "b"):
+                block = html_reports.HideAndShowBlock(name, [
+                    html_reports.HideAndShowBlockItem(
+                        name, "data", name + "-data", "ok", "<p>data</p>")
+                ])
+                items.append(([name], block))
+            return html_reports.HideAndShowBlocksReport(
+                ["name", "reports"], items, html_cell_content=[])
+
+        with html_reports.ReportWriter(self.filename, "Title") as writer:
+            report().write(writer)
+        expected = html_reports.html("Title", report().content)
+        self.assertEqual(expected, read(self.filename))
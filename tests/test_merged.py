@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+from prodtools.data.merged import GroupedDocuments
+
+
+class FakeArticle(object):
+
+    def __init__(self, order, doi, journal_title="Journal"):
+        self.order = order
+        self.is_ahead = False
+        self.is_rolling_pass = False
+        self.summary_calls = 0
+        self._summary = {
+            'journal-title': journal_title,
+            'journal-id (nlm-ta)': None,
+            'journal ISSN': 'epub:1234-5678',
+            'e-ISSN': '1234-5678',
+            'print ISSN': None,
+            'publisher name': 'Publisher',
+            'issue label': 'v1n1',
+            'issue pub date': '2020',
+            'license': None,
+            'order': order,
+            'doi': doi,
+            'elocation id': None,
+            'fpage-lpage-seq-elocation-id': order,
+        }
+
+    @property
+    def summary(self):
+        self.summary_calls += 1
+        return dict(self._summary)
+
+
+class TestGroupedDocuments(TestCase):
+
+    def setUp(self):
+        self.docs = {
+            "a02": FakeArticle("00002", "10.1/b"),
+            "a01": FakeArticle("00001", "10.1/a"),
+            "a03": FakeArticle("00003", "10.1/a", "Other"),
+        }
+        self.group = GroupedDocuments(self.docs, True)
+
+    def test_articles_are_sorted_by_order(self):
+        self.assertEqual(
+            ["a01", "a02", "a03"],
+            [name for name, doc in self.group.articles])
+
+    def test_common_data(self):
+        self.assertEqual(
+            {"Journal": ["a02", "a01"], "Other": ["a03"]},
+            self.group.common_data["journal-title"])
+        self.assertNotIn(None, self.group.common_data["print ISSN"])
+
+    def test_conflicting_values(self):
+        self.assertEqual(
+            ["journal-title"], list(self.group.conflicting_values.keys()))
+
+    def test_missing_required_data(self):
+        self.assertEqual({}, self.group.missing_required_data)
+
+    def test_duplicated_values(self):
+        self.assertEqual(
+            {"doi": {"10.1/a": ["a01", "a03"]}},
+            self.group.duplicated_values)
+
+    def test_summary_is_computed_once_per_document(self):
+        self.group.common_data
+        self.group.missing_required_data
+        self.group.conflicting_values
+        self.group.duplicated_values
+        self.group.unique_values
+        self.group.articles
+        for doc in self.docs.values():
+            self.assertEqual(1, doc.summary_calls)
+
+    def test_invalidate_recomputes_aggregates(self):
+        self.assertEqual(3, len(self.group.articles))
+        self.docs["a04"] = FakeArticle("00004", "10.1/d")
+        self.assertEqual(3, len(self.group.articles))
+        self.group.invalidate()
+        self.assertEqual(4, len(self.group.articles))
+
+    def test_assigning_grouped_docs_invalidates_aggregates(self):
+        self.assertEqual(3, len(self.group.articles))
+        self.group.grouped_docs = {"a05": FakeArticle("00005", "10.1/e")}
+        self.assertEqual(["a05"], [name for name, doc in self.group.articles])
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from prodtools.data.package import SPPackage
+from tests.test_pmc_pkgmaker import create_package
+
+
+class TestSPPackageMaxLoadedArticles(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.pkg = create_package(self.path, 4)
+        self.bounded = SPPackage(
+            self.pkg.package_folder.path, os.path.join(self.path, "out2"),
+            self.pkg.xml_names, max_loaded_articles=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def loaded(self, pkg):
+        return [name for name, doc in sorted(pkg.articles.items())
+                if doc._tree is not None]
+
+    def test_articles_are_released_after_loading(self):
+        self.assertEqual([], self.loaded(self.bounded))
+        self.assertEqual(4, len(self.loaded(self.pkg)))
+        self.assertIsNone(self.pkg.loaded_trees)
+
+    def test_articles_data_is_the_same(self):
+        self.assertEqual(
+            self.pkg.issue_data.pkg_issue_label,
+            self.bounded.issue_data.pkg_issue_label)
+        for name, doc in self.pkg.articles.items():
+            bounded_doc = self.bounded.articles[name]
+            self.assertEqual(doc.xml, bounded_doc.xml)
+            self.assertEqual(doc.fpage, bounded_doc.fpage)
+            self.assertEqual(doc.title, bounded_doc.title)
+            self.assertEqual(doc.issue_label, bounded_doc.issue_label)
+        self.assertTrue(self.bounded.is_pmc_journal)
+
+    def test_keeps_at_most_max_loaded_articles(self):
+        for name in sorted(self.bounded.articles.keys()):
+            self.assertIsNotNone(self.bounded.articles[name].article_meta)
+            self.assertLessEqual(len(self.loaded(self.bounded)), 2)
+        self.assertEqual(["a00003", "a00004"], self.loaded(self.bounded))
+        self.assertEqual(4, self.bounded.loaded_trees.loads)
+
+        self.bounded.release_articles()
+        self.assertEqual([], self.loaded(self.bounded))
+
+    def test_release_keeps_the_article_instance_data(self):
+        doc = self.bounded.articles["a00001"]
+        doc.pid = "S1234-56782020000200001"
+        self.assertEqual("1", doc.fpage)
+        for name in ("a00002", "a00003", "a00004"):
+            self.bounded.articles[name].tree
+        self.assertIsNone(doc._tree)
+        self.assertIs(doc, self.bounded.articles["a00001"])
+        self.assertEqual("S1234-56782020000200001", doc.pid)
+        self.assertEqual("Title 1", doc.title)
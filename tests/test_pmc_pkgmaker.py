@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from prodtools.data.package import SPPackage
+from prodtools.processing.pmc_pkgmaker import (
+    PMCPackageMaker,
+    make_package_item,
+)
+
+
+XML = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE article PUBLIC "-//NLM//DTD JATS (Z39.96) Journal Publishing DTD v1.1 20151215//EN" "https://jats.nlm.nih.gov/publishing/1.1/JATS-journalpublishing1.dtd">
+<article xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:mml="http://www.w3.org/1998/Math/MathML" dtd-version="1.1" specific-use="sps-1.9" article-type="research-article" xml:lang="en">
+<front><journal-meta>{journal_id}<journal-id journal-id-type="publisher-id">bjm</journal-id>
+<journal-title-group><journal-title>Braz J Med</journal-title></journal-title-group>
+<issn pub-type="epub">1234-5678</issn>
+<publisher><publisher-name>SciELO</publisher-name></publisher></journal-meta>
+<article-meta><article-id pub-id-type="doi">10.1590/1234-{i}</article-id>
+<title-group><article-title>Title {i}</article-title></title-group>
+<pub-date pub-type="epub"><day>01</day><month>01</month><year>2020</year></pub-date>
+<volume>10</volume><issue>2</issue><fpage>{i}</fpage><lpage>10</lpage>
+</article-meta></front>
+<body>{paragraphs}<fig id="f1"><label>Figure 1</label>
+<graphic xlink:href="{name}-gf01.jpg"/></fig></body></article>
+"""
+
+
+def create_package(path, total, paragraphs=1, nlm_ta=True):
+    """
+    Cria um pacote SPS com `total` documentos e retorna `SPPackage`
+    """
+    pkg_path = os.path.join(path, "pkg")
+    os.makedirs(pkg_path)
+    journal_id = ""
+    if nlm_ta:
+        journal_id = (
+            '<journal-id journal-id-type="nlm-ta">Braz J Med</journal-id>')
+    names = []
+    for i in range(1, total + 1):
+        name = "a{:05d}".format(i)
+        with open(os.path.join(pkg_path, name + ".xml"), "w") as fp:
+            fp.write(XML.format(
+                i=i, name=name, journal_id=journal_id,
+                paragraphs="<p>Text {}</p>".format(i) * paragraphs))
+        with open(os.path.join(pkg_path, name + "-gf01.jpg"), "w") as fp:
+            fp.write("jpg")
+        names.append(name + ".xml")
+    return SPPackage(pkg_path, os.path.join(path, "out"), names)
+
+
+def read_files(path):
+    items = {}
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), "rb") as fp:
+            items[name] = fp.read()
+    return items
+
+
+class TestPMCPackageMaker(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_make_package_in_parallel_is_equal_to_sequential(self):
+        pkg = create_package(self.path, 4)
+        pmc_path = pkg.wk.pmc_package_path
+
+        results = PMCPackageMaker(pkg, max_workers=1).make_package()
+        sequential = read_files(pmc_path)
+        shutil.rmtree(pmc_path)
+        os.makedirs(pmc_path)
+        self.assertEqual(
+            results, PMCPackageMaker(pkg, max_workers=3).make_package())
+
+        self.assertEqual(sequential, read_files(pmc_path))
+        self.assertEqual(
+            ["a00001", "a00002", "a00003", "a00004"],
+            [xml_name for xml_name, done, error in results])
+        with zipfile.ZipFile(pmc_path + ".zip") as zf:
+            self.assertEqual(sorted(sequential.keys()), zf.namelist())
+
+    def test_make_package_isolates_errors(self):
+        pkg = create_package(self.path, 3)
+        # impede a gravação do documento a00002
+        os.makedirs(os.path.join(pkg.wk.pmc_package_path, "a00002.xml"))
+
+        results = PMCPackageMaker(pkg, max_workers=2).make_package()
+
+        self.assertEqual(("a00001", True, None), results[0])
+        self.assertEqual(("a00003", True, None), results[2])
+        xml_name, done, error = results[1]
+        self.assertFalse(done)
+        self.assertTrue(error)
+        with open(pkg.outputs["a00002"].pmc_style_report_filename) as fp:
+            self.assertIn("[FATAL ERROR]", fp.read())
+        self.assertTrue(os.path.isfile(
+            os.path.join(pkg.wk.pmc_package_path, "a00003.xml")))
+
+    def test_make_package_item_without_nlm_ta(self):
+        pkg = create_package(self.path, 1, nlm_ta=False)
+        outputs = pkg.outputs["a00001"]
+        result = make_package_item(
+            "a00001", pkg.files["a00001"].filename, outputs.report_path,
+            outputs.sgmxml_name,
+            os.path.join(pkg.wk.pmc_package_path, "a00001.xml"))
+        self.assertEqual(("a00001", False, None), result)
+        self.assertFalse(os.path.isfile(pkg.wk.pmc_package_path + ".zip"))
@@ -0,0 +1,195 @@
+import shutil
+import tempfile
+from unittest import TestCase
+
+from prodtools.data.article import ReferenceXML, element_lang
+from prodtools.utils import xml_utils
+from tests.benchmarks import sps_package
+
+
+REFS = """<back><ref-list>
+<ref id="B1"><label>1</label>
+<mixed-citation>Costa A, Lima B. <italic>Title</italic>. Source; 2010.</mixed-citation>
+<element-citation publication-type="journal" specific-use="display-only">
+<person-group person-group-type="author">
+<name><surname>Costa</surname><given-names>A</given-names><suffix>Jr</suffix></name>
+<name><surname>Lima</surname><given-names>B</given-names></name><etal/>
+</person-group>
+<article-title xml:lang="en">Title <italic>in italic</italic></article-title>
+<trans-title-group><trans-title xml:lang="pt">Titulo</trans-title></trans-title-group>
+<source xml:lang="pt">Rev <bold>Saude</bold> Publica</source>
+<year>2010</year><volume>44</volume><issue>3</issue><supplement>Suppl 1</supplement>
+<fpage>10</fpage><lpage>20</lpage>
+<pub-id pub-id-type="doi">10.1590/S0034</pub-id><pub-id pub-id-type="pmid">123</pub-id>
+<pub-id pub-id-type="pmcid">PMC1</pub-id>
+<comment content-type="award-id">2010/01</comment><comment>doi: 10.1/x</comment>
+</element-citation></ref>
+<ref id="B2"><mixed-citation>Book.</mixed-citation>
+<element-citation publication-type="book">
+<person-group person-group-type="editor"><collab>WHO</collab></person-group>
+<person-group person-group-type="author"><anonymous/></person-group>
+<chapter-title>Chapter</chapter-title><source>Book</source>
+<edition>2nd</edition><publisher-loc>Geneva</publisher-loc>
+<publisher-name>WHO</publisher-name><publisher-name>Other</publisher-name>
+<year>2005a</year><size units="pages">300</size><page-range>1-5, 10</page-range>
+<comment>Available from: <ext-link ext-link-type="uri" xlink:href="http://a.org" xmlns:xlink="http://www.w3.org/1999/xlink">http://a.org</ext-link></comment>
+<date-in-citation content-type="update">2019</date-in-citation>
+<date-in-citation content-type="access-date">2020 Jan 5</date-in-citation>
+</element-citation></ref>
+<ref id="B3"><element-citation publication-type="confproc">
+<conf-name>Congress</conf-name><conf-loc>Rio</conf-loc><conf-date>2001</conf-date>
+<source>Anais</source><elocation-id>e10</elocation-id><version>v2</version>
+<notes>Note</notes><pub-id pub-id-type="art-access-id">X1</pub-id>
+</element-citation></ref>
+<ref id="B4"><mixed-citation>Only mixed.<comment>no doi</comment></mixed-citation>
+<element-citation publication-type="thesis"><source>Thesis</source>
+<comment content-type="degree">PhD</comment>
+<pub-id pub-id-type="other">1</pub-id></element-citation></ref>
+<ref id="B5"><element-citation publication-type="webpage">
+<source>Site</source><ext-link ext-link-type="uri">http://b.org</ext-link>
+</element-citation><element-citation publication-type="journal">
+<source>Second</source><year>1999</year></element-citation></ref>
+<ref id="B6"><mixed-citation>No element-citation</mixed-citation></ref>
+<ref id="B7"><!-- comentario --><?pi dado?><element-citation publication-type="report">
+<person-group><name><surname>Souza</surname></name></person-group>
+<source>Report<!-- outro --></source><comment content-type="award-id">A1</comment>
+<comment content-type="award-id">A2</comment></element-citation></ref>
+</ref-list></back>"""
+
+
+FIELDS = {
+    "source": ".//source",
+    "volume": ".//volume",
+    "issue": ".//issue",
+    "supplement": ".//supplement",
+    "edition": ".//edition",
+    "version": ".//version",
+    "year": ".//year",
+    "fpage": ".//fpage",
+    "lpage": ".//lpage",
+    "label": ".//label",
+    "article_title": ".//article-title",
+    "chapter_title": ".//chapter-title",
+    "trans_title": ".//trans-title",
+    "publisher_name": ".//publisher-name",
+    "publisher_loc": ".//publisher-loc",
+    "page_range": ".//page-range",
+    "elocation_id": ".//elocation-id",
+    "ext_link": ".//ext-link",
+    "comments": ".//comment",
+    "notes": ".//notes",
+    "contract_number": './/comment[@content-type="award-id"]',
+    "conference_name": ".//conf-name",
+    "conference_location": ".//conf-loc",
+    "conference_date": ".//conf-date",
+    "mixed_citation": ".//mixed-citation",
+    "element_citation": ".//element-citation",
+}
+
+
+def queried_values(root):
+    """
+    Valores obtidos com uma consulta (findall) para cada dado,
+    como `ReferenceXML` fazia antes da extração em um único percurso
+    """
+    values = {
+        name: xml_utils.nodes_xml_content(root, [xpath])
+        for name, xpath in FIELDS.items()
+    }
+    elem_citations = root.findall(".//element-citation")
+    values["publication_type"] = [
+        e.get("publication-type") for e in elem_citations]
+    values["ref_status"] = [e.get("specific-use") for e in elem_citations]
+    values["cited_date"] = xml_utils.nodes_xml_content(root, [
+        './/date-in-citation[@content-type="access-date"]',
+        './/date-in-citation[@content-type="update"]'])
+    values["size"] = [
+        {"size": text, "units": attribs.get("units")}
+        for text, attribs in xml_utils.nodes_xml_content_and_attributes(
+            root, [".//size"])] or [None]
+    values["trans_title_language"] = [
+        element_lang(node) for node in root.findall(".//trans-title")]
+    lang = None
+    for xpath in [".//source", ".//article-title", ".//chapter-title"]:
+        if root.find(xpath) is not None:
+            lang = element_lang(root.find(xpath))
+        if lang is not None:
+            break
+    values["language"] = lang
+    pub_ids = xml_utils.nodes_xml_content_and_attributes(root, [".//pub-id"])
+    values["pub_id_items"] = {
+        attribs.get("pub-id-type"): text for text, attribs in pub_ids
+    } or None
+    groups = []
+    if elem_citations:
+        for person_group in root.findall(".//person-group"):
+            contribs = [
+                xml_utils.tostring(c) for c in person_group.findall("*")
+                if c.tag != "etal"]
+            etal = "et al" if person_group.find("etal") is not None else None
+            groups.append((
+                person_group.get("person-group-type", "author"),
+                contribs, etal))
+    values["person_groups"] = groups
+    return values
+
+
+def extracted_values(ref_xml):
+    values = {name: getattr(ref_xml, name) for name in FIELDS}
+    for name in ("publication_type", "ref_status", "cited_date", "size",
+                 "trans_title_language", "language", "pub_id_items"):
+        values[name] = getattr(ref_xml, name)
+    values["person_groups"] = [
+        (role, [c.display() for c in contribs], etal)
+        for role, contribs, etal in ref_xml.person_group_xml_items
+    ]
+    return values
+
+
+def corpus():
+    """
+    Retorna os nós `ref` das referências de exemplo e de documentos
+    sintéticos
+    """
+    nodes = xml_utils.etree.fromstring(REFS).findall(".//ref")
+    path = tempfile.mkdtemp()
+    try:
+        for xml_file in sps_package.create_sps_package(path, 2, 10, 0, 2):
+            xml, error = xml_utils.load_xml(xml_file)
+            nodes.extend(xml.findall(".//ref"))
+    finally:
+        shutil.rmtree(path)
+    return nodes
+
+
+class TestReferenceXMLExtraction(TestCase):
+
+    def test_values_are_the_same_as_queried_ones(self):
+        nodes = corpus()
+        self.assertGreater(len(nodes), 10)
+        for node in nodes:
+            with self.subTest(ref=node.get("id")):
+                self.assertEqual(
+                    queried_values(node),
+                    extracted_values(ReferenceXML(node)))
+
+    def test_reference(self):
+        refs = [
+            ReferenceXML(node).reference
+            for node in xml_utils.etree.fromstring(REFS).findall(".//ref")
+        ]
+        self.assertEqual("journal", refs[0].publication_type)
+        self.assertEqual("display-only", refs[0].ref_status)
+        self.assertEqual("Rev <bold>Saude</bold> Publica", refs[0].source)
+        self.assertEqual("pt", refs[0].language)
+        self.assertEqual(
+            '<pub-id pub-id-type="doi">10.1590/S0034</pub-id>', refs[0].doi)
+        self.assertEqual("2010/01", refs[0].contract_number)
+        self.assertEqual("Chapter", refs[1].chapter_title)
+        self.assertEqual("2020 Jan 5", refs[1].cited_date)
+        self.assertEqual(
+            {"size": '<size units="pages">300</size>', "units": "pages"},
+            refs[1].size)
+        self.assertEqual("Congress", refs[2].conference_name)
+        self.assertEqual(["no doi"], refs[3].doi)
+        self.assertIsNone(refs[5].publication_type)
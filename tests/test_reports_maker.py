@@ -1,13 +1,21 @@
+import os
 import tempfile
 import shutil
 import pathlib
 from unittest import TestCase
+from unittest.mock import Mock
 
 from prodtools.validations.reports_maker import (
     AssetsInReport,
     BasicAssetsInReport,
     CollectionAssetsInReport,
+    ReportsMaker,
 )
+from prodtools.validations.article_validations import ArticleValidations
+from prodtools.validations.pkg_articles_validations import (
+    PkgArticlesValidationsReports,
+)
+from prodtools.validations.validations import ValidationsResult
 
 
 class TestAssetsInReportReturnsCollectionAssetsInReportForRemoteWebsite(TestCase):
@@ -393,3 +401,109 @@ class TestCollectionAssetsInReportValidateSaveReport(TestCase):
         self.data.save_report(str(report_path))
         path_result = pathlib.Path(self.data.report_path) / "doc.xml"
         self.assertEqual(path_result.read_text(), xml_text)
+
+
+class TestReportsMakerPaginated(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        pkg = Mock()
+        pkg.package_folder.path = self.path
+        pkg.package_folder.pkgfiles_items = {}
+        pkg.package_folder.orphans = []
+        pkg.articles = {}
+        pkg.issue_data.journal = None
+
+        pkg_validations_reports = PkgArticlesValidationsReports.__new__(
+            PkgArticlesValidationsReports)
+        pkg_validations_reports.pkg_articles_validations = {
+            "a01": self._article_validations("[ERROR] a01 {IMG_PATH}"),
+            "a02": self._article_validations("[WARNING] a02"),
+        }
+        pkg_eval_result = Mock()
+        pkg_eval_result.group_validations_report = ""
+        pkg_eval_result.pkg_validations_reports = pkg_validations_reports
+        self.pkg_eval_result = pkg_eval_result
+        self.pkg = pkg
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _article_validations(self, message):
+        validations = ArticleValidations()
+        validations.article_display_report = None
+        validations.xml_structure_validations = ValidationsResult()
+        validations.xml_structure_validations.message = "structure ok"
+        validations.xml_content_validations = ValidationsResult()
+        validations.xml_content_validations.message = message
+        return validations
+
+    def _reports_maker(self, paginated):
+        reports = ReportsMaker(
+            self.pkg, self.pkg_eval_result,
+            BasicAssetsInReport(os.path.join(self.path, "pkg")), "xpm",
+            paginated=paginated)
+        self.pkg_eval_result.individual_validations_report = (
+            self.pkg_eval_result.pkg_validations_reports.detailed_report)
+        return reports
+
+    def read(self, path):
+        with open(path, encoding="utf-8") as fp:
+            return fp.read()
+
+    def test_save_report_writes_index_and_articles_pages(self):
+        reports = self._reports_maker(paginated=True)
+        reports.save_report(display=False)
+
+        index = self.read(reports.report_location)
+        self.assertIn('href="xpm_articles/a01.html#datarepa01"', index)
+        self.assertNotIn("a01 {IMG_PATH}", index)
+        self.assertNotIn("a01 " + self.path, index)
+
+        page = self.read(reports.article_report_location("a01"))
+        self.assertIn("a01 " + os.path.join(self.path, "pkg"), page)
+        self.assertIn('<a name="datarepa01"/>', page)
+        self.assertIn('href="../xpm.html"', page)
+        self.assertTrue(
+            os.path.isfile(reports.article_report_location("a02")))
+
+    def test_paginated_report_keeps_statistics(self):
+        reports = self._reports_maker(paginated=False)
+        reports.report_components
+        expected = reports.validations.numbers
+
+        reports = self._reports_maker(paginated=True)
+        reports.report_components
+        self.assertEqual(expected, reports.validations.numbers)
+        self.assertEqual(1, reports.validations.errors)
+        self.assertEqual(1, reports.validations.warnings)
+
+    def test_save_report_does_not_write_articles_pages(self):
+        reports = self._reports_maker(paginated=False)
+        reports.save_report(display=False)
+
+        index = self.read(reports.report_location)
+        self.assertIn("a01 " + os.path.join(self.path, "pkg"), index)
+        self.assertFalse(os.path.isdir(reports.articles_reports_location))
+
+    def test_save_report_removes_stale_articles_pages(self):
+        reports = self._reports_maker(paginated=True)
+        stale = reports.article_report_location("old")
+        os.makedirs(os.path.dirname(stale))
+        with open(stale, "w") as fp:
+            fp.write("old")
+        reports.save_report(display=False)
+
+        self.assertFalse(os.path.isfile(stale))
+        self.assertTrue(
+            os.path.isfile(reports.article_report_location("a01")))
+
+    def test_paginated_report_does_not_keep_articles_pages(self):
+        reports = self._reports_maker(paginated=True)
+        reports.report_components
+
+        self.assertNotIn("a01 {IMG_PATH}", reports.validations.message)
+        self.assertIn(
+            "xpm_articles/a01.html#datarepa01", reports.validations.message)
+        self.assertTrue(
+            os.path.isfile(reports.article_report_location("a01")))
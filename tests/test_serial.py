@@ -1,8 +1,13 @@
+import os
+import shutil
+import tempfile
 from unittest import TestCase, mock
 from unittest.mock import call
 
 
 from prodtools.db.serial import (
+    ArticlesContentIndex,
+    record_hash,
     IssuePathsInWebsite,
     IssuePathsInSerial,
     WebsiteFiles,
@@ -293,3 +298,95 @@ class TestIssuePathsInSerial(TestCase):
         self.assertEqual(
             "/scielo/serial/acron/issue_folder/windows/issue_folder",
             self.data.windows_base)
+
+
+class TestArticlesContentIndex(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.filename = os.path.join(self.path, "base_xml", "index.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_is_registered_returns_false_if_index_does_not_exist(self):
+        index = ArticlesContentIndex(self.filename)
+        self.assertFalse(index.is_registered("a01", "hash", "00001", "issue"))
+
+    def test_is_registered_returns_true_after_save_and_load(self):
+        index = ArticlesContentIndex(self.filename)
+        index.register("a01", "hash", "00001", "issue")
+        index.save()
+        index = ArticlesContentIndex(self.filename)
+        self.assertTrue(index.is_registered("a01", "hash", "00001", "issue"))
+
+    def test_is_registered_returns_false_if_hash_or_order_differ(self):
+        index = ArticlesContentIndex(self.filename)
+        index.register("a01", "hash", "00001", "issue")
+        self.assertFalse(index.is_registered("a01", "other", "00001", "issue"))
+        self.assertFalse(index.is_registered("a01", "hash", "00002", "issue"))
+
+    def test_is_registered_returns_false_if_issue_record_differs(self):
+        index = ArticlesContentIndex(self.filename)
+        index.register("a01", "hash", "00001", "issue")
+        self.assertFalse(index.is_registered("a01", "hash", "00001", "other"))
+
+    def test_is_registered_returns_false_for_items_of_other_version(self):
+        index = ArticlesContentIndex(self.filename)
+        index.register("a01", "hash", "00001", "issue")
+        index.items["a01"]["version"] = ArticlesContentIndex.VERSION - 1
+        self.assertFalse(index.is_registered("a01", "hash", "00001", "issue"))
+        del index.items["a01"]["version"]
+        self.assertFalse(index.is_registered("a01", "hash", "00001", "issue"))
+
+    def test_record_hash_depends_on_record_content(self):
+        self.assertEqual(
+            record_hash({"35": "1234-5678", "36": "20201"}),
+            record_hash({"36": "20201", "35": "1234-5678"}))
+        self.assertNotEqual(
+            record_hash({"35": "1234-5678", "36": "20201"}),
+            record_hash({"35": "1234-5678", "36": "20202"}))
+
+    def test_remove(self):
+        index = ArticlesContentIndex(self.filename)
+        index.register("a01", "hash", "00001", "issue")
+        index.remove("a01")
+        self.assertFalse(index.is_registered("a01", "hash", "00001", "issue"))
+
+    def test_items_is_empty_if_index_is_corrupted(self):
+        os.makedirs(os.path.dirname(self.filename))
+        with open(self.filename, "w") as fp:
+            fp.write("{")
+        index = ArticlesContentIndex(self.filename)
+        self.assertEqual({}, index.items)
+
+
+class TestWebsiteFilesGetFiles(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.pkg_path = os.path.join(self.path, "pkg")
+        os.makedirs(self.pkg_path)
+        for name in ("a01.xml", "a01-gf01.jpg", "a02-gf01.jpg"):
+            with open(os.path.join(self.pkg_path, name), "w") as fp:
+                fp.write(name)
+        self.website_files = WebsiteFiles(
+            os.path.join(self.path, "web"), "acron", "issue")
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_get_files_copies_skip_files_which_are_missing(self):
+        self.website_files.get_files(self.pkg_path, ["a01-gf01.jpg"])
+        self.assertTrue(os.path.isfile(os.path.join(
+            self.website_files.paths.web_htdocs_img, "a01-gf01.jpg")))
+
+    def test_get_files_does_not_copy_skip_files_which_exist(self):
+        self.website_files.get_files(self.pkg_path)
+        with open(os.path.join(self.pkg_path, "a01-gf01.jpg"), "w") as fp:
+            fp.write("changed")
+        self.website_files.get_files(self.pkg_path, ["a01-gf01.jpg"])
+        with open(os.path.join(
+                self.website_files.paths.web_htdocs_img,
+                "a01-gf01.jpg")) as fp:
+            self.assertEqual("a01-gf01.jpg", fp.read())
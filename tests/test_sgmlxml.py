@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from prodtools.processing.sgmlxml import (
+    SGMLXMLBatch,
+    convert_sgmxml,
+    find_sgmxml_files,
+)
+
+
+SGMXML = (
+    '<doc acron="abc" issn="1234-5678" volid="10" issueno="2" '
+    'fpage="{fpage}" lpage="10" language="en" sps="sps-1.9" '
+    'dateiso="20200000" doctopic="oa"><front><titlegrp>'
+    '<title language="en">A title</title></titlegrp></front>'
+    '<body><p>Text</p></body></doc>'
+)
+
+
+def create_sgmxml(markup_xml_path, name, fpage, html=True):
+    """
+    Cria markup_xml/work/name/name.sgm.xml e o HTML que o Word gera junto
+    """
+    path = os.path.join(markup_xml_path, "work", name)
+    os.makedirs(path)
+    sgmxml_filepath = os.path.join(path, name + ".sgm.xml")
+    with open(sgmxml_filepath, "w") as fp:
+        fp.write(SGMXML.format(fpage=fpage))
+    if html:
+        with open(os.path.join(path, name + ".temp.html"), "w") as fp:
+            fp.write("<html><body><p>Text</p></body></html>")
+    return sgmxml_filepath
+
+
+class TestSGMLXMLBatch(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_find_sgmxml_files(self):
+        expected = [
+            create_sgmxml(os.path.join(self.path, "v1n1", "markup_xml"),
+                          "a01", 1),
+            create_sgmxml(os.path.join(self.path, "v1n2", "markup_xml"),
+                          "a01", 1),
+        ]
+        self.assertEqual(expected, find_sgmxml_files(self.path))
+
+    def test_convert_sgmxml(self):
+        sgmxml = create_sgmxml(os.path.join(self.path, "markup_xml"), "a01", 5)
+        result = convert_sgmxml(sgmxml, "abc")
+        self.assertEqual("done", result["status"])
+        self.assertEqual("abc-10-02-5.xml", result["xml"])
+        self.assertTrue(os.path.isfile(
+            os.path.join(result["package"], "abc-10-02-5.xml")))
+
+    def test_convert_sgmxml_returns_failure(self):
+        sgmxml = create_sgmxml(
+            os.path.join(self.path, "markup_xml"), "a01", 5, html=False)
+        result = convert_sgmxml(sgmxml, "abc")
+        self.assertEqual("failed", result["status"])
+        self.assertTrue(result["error"])
+
+    def test_run_continues_after_failures(self):
+        markup_xml = os.path.join(self.path, "markup_xml")
+        create_sgmxml(markup_xml, "a01", 1)
+        create_sgmxml(markup_xml, "a02", 2, html=False)
+        create_sgmxml(markup_xml, "a03", 3)
+        create_sgmxml(os.path.join(self.path, "other", "markup_xml"), "a01", 4)
+
+        batch = SGMLXMLBatch(self.path, "abc", max_workers=2)
+        summary = batch.run()
+
+        self.assertEqual(4, summary["total"])
+        self.assertEqual(3, summary["done"])
+        self.assertEqual(1, summary["failed"])
+        self.assertEqual(
+            os.path.join(markup_xml, "work", "a02", "a02.sgm.xml"),
+            summary["failures"][0]["sgmxml"])
+        self.assertGreater(summary["documents_per_minute"], 0)
+        self.assertEqual(
+            ["abc-10-02-1.xml", "abc-10-02-3.xml"],
+            sorted(os.listdir(os.path.join(markup_xml, "scielo_package"))))
+
+        with open(batch.summary_filename) as fp:
+            self.assertEqual(summary, json.load(fp))
+        with open(batch.results_filename) as fp:
+            results = [json.loads(line) for line in fp]
+        self.assertEqual(
+            ["done", "done", "done", "failed"],
+            sorted([r["status"] for r in results]))
@@ -57,6 +57,47 @@ class TestSPSXMLContent(TestCase):
         obj.remove_styles_off_tagged_content("source")
         self.assertEqual(obj.content, expected)
 
+    def test_normalize_fixes_content_without_reparsing(self):
+        text = (
+            '<article xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'dtd-version="3.0" id=" a1"> :texto'
+            '<contrib-id contrib-id-type="lattes">https://lattes.cnpq.br/'
+            '</contrib-id>'
+            '<license xlink:href="http://creativecommons.org/licenses/by/">'
+            'http://creativecommons.org <!-- http://creativecommons.org -->'
+            ' :x</license>'
+            '<sec><title> Intro - </title><xref rid=" B1">1</xref> :y</sec>'
+            '<sec><title id="t1"> T <italic>i</italic> - </title></sec>'
+            '<sec><title> - </title></sec>'
+            '<ref-list><ref id="B1"><element-citation publication-type="web">'
+            '<source xml:lang="en">S</source>'
+            '<comment content-type="cited">c</comment>'
+            '</element-citation></ref></ref-list>'
+            '<sub-article dtd-version="3.0"/></article>'
+        )
+        expected = (
+            '<article xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'dtd-version="3.0" id="a1">: texto'
+            '<contrib-id contrib-id-type="lattes"/>'
+            '<license xlink:href="https://creativecommons.org/licenses/by/">'
+            'https://creativecommons.org '
+            '<!-- https://creativecommons.org -->: x</license>'
+            '<sec><title>Intro</title><xref rid="B1">1</xref>: y</sec>'
+            '<sec><title id="t1"> T <italic>i</italic></title></sec>'
+            '<sec><title/></sec>'
+            '<ref-list><ref id="B1">'
+            '<element-citation publication-type="webpage">'
+            '<source>S</source><comment>c</comment>'
+            '</element-citation></ref></ref-list>'
+            '<sub-article dtd-version="1.0"/></article>'
+        )
+        obj = sps_pkgmaker.SPSXMLContent(text)
+        self.assertEqual(expected, obj.content)
+        self.assertEqual(
+            ["remove_nodes", "remove_styles_off_tagged_content",
+             "normalize_nodes", "normalize_references"],
+            [name for name, seconds in obj.timings])
+
     def test_remove_uri_off_contrib_id(self):
         text = """<contrib-group>
         <contrib contrib-type="author">
@@ -333,6 +374,51 @@ class TestBrokenRefLinksInMixedCitation(TestCase):
             obj.tree.find(".//element-citation").find(".//ext-link").text
         )
 
+    def test_insert_ext_link_elements_in_mixed_citation_texts_and_tails(self):
+        text = (
+            '<ref xmlns:xlink="http://www.w3.org/1999/xlink" id="B6">'
+            '<mixed-citation>Links http://a.org and <bold>see http://b.org'
+            '</bold> http://b.org.<!-- http://a.org --></mixed-citation> '
+            '<element-citation publication-type="webpage">'
+            '<ext-link ext-link-type="uri" xlink:href="http://a.org">'
+            'http://a.org</ext-link>'
+            '<ext-link ext-link-type="uri" xlink:href="http://b.org">'
+            'http://b.org</ext-link></element-citation></ref>'
+        )
+        expected = (
+            '<ref xmlns:xlink="http://www.w3.org/1999/xlink" id="B6">'
+            '<mixed-citation>Links <ext-link ext-link-type="uri" '
+            'xlink:href="http://a.org">http://a.org</ext-link> and <bold>see '
+            '<ext-link ext-link-type="uri" xlink:href="http://b.org">'
+            'http://b.org</ext-link></bold> <ext-link ext-link-type="uri" '
+            'xlink:href="http://b.org">http://b.org</ext-link>.'
+            '<!-- <ext-link xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'ext-link-type="uri" xlink:href="http://a.org">http://a.org'
+            '</ext-link> --></mixed-citation>'
+            '<element-citation publication-type="webpage">'
+            '<ext-link ext-link-type="uri" xlink:href="http://a.org">'
+            'http://a.org</ext-link>'
+            '<ext-link ext-link-type="uri" xlink:href="http://b.org">'
+            'http://b.org</ext-link></element-citation></ref>'
+        )
+        xml = xml_utils.etree.fromstring(text)
+        obj = sps_pkgmaker.BrokenRef(xml)
+        obj.insert_ext_link_elements_in_mixed_citation()
+        self.assertEqual(expected, xml_utils.tostring(obj.tree))
+
+    def test_insert_ext_link_elements_in_mixed_citation_ignores_escaped_text(self):
+        text = (
+            '<ref xmlns:xlink="http://www.w3.org/1999/xlink" id="B10">'
+            '<mixed-citation>http://f.org/?a=1&amp;b=2</mixed-citation>'
+            '<element-citation publication-type="webpage">'
+            '<ext-link ext-link-type="uri" xlink:href="http://f.org/?a=1&amp;b=2">'
+            'http://f.org/?a=1&amp;b=2</ext-link></element-citation></ref>'
+        )
+        xml = xml_utils.etree.fromstring(text)
+        obj = sps_pkgmaker.BrokenRef(xml)
+        obj.insert_ext_link_elements_in_mixed_citation()
+        self.assertIsNone(obj.tree.find(".//mixed-citation/ext-link"))
+
 
 class TestBrokenRefSource(TestCase):
 
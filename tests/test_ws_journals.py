@@ -0,0 +1,180 @@
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import TestCase
+from unittest.mock import patch
+
+from prodtools.db import ws_journals
+from prodtools.db.xc_models import JournalsList
+from prodtools.utils.ws.ws_requester import WebServicesRequester
+
+
+CSV = (
+    "collection\tissn_id\tp_issn\te_issn\tcollection_name\tacron\t"
+    "abbrev\ttitle\tnlm\tpublisher\tx\tlicense\n"
+    "scl\t0001-0001\t0001-0001\t1001-0001\tBrasil\tabc\t"
+    "Abc\tJournal ABC\tAbc NLM\tPublisher A\tx\tby/4.0\n"
+    "spa\t0001-0001\t0001-0001\t1001-0001\tSaude\tabc\t"
+    "Abc\tJournal ABC\tAbc NLM\tPublisher A\tx\tby/4.0\n"
+    "scl\t0002-0002\t0002-0002\t1002-0002\tBrasil\txyz\t"
+    "Xyz\tJournal XYZ\tXyz NLM\tPublisher X\tx\tby-nc/4.0\n"
+    "invalid\trow\n"
+)
+
+
+class CSVHandler(BaseHTTPRequestHandler):
+    """
+    Servidor HTTP mínimo que publica `server.content` com ETag
+    e responde 304 quando o cliente informa o ETag atual
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers.items()))
+        etag = '"%i"' % self.server.version
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        content = self.server.content.encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", "Mon, 01 Jun 2020 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestJournals(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.server = HTTPServer(("127.0.0.1", 0), CSVHandler)
+        self.server.content = CSV
+        self.server.version = 1
+        self.server.requests = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        patcher = patch("prodtools.db.ws_journals.BIN_MARKUP_PATH", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.path)
+
+    def _journals(self, min_refresh_interval=0):
+        journals = ws_journals.Journals(
+            WebServicesRequester(), min_refresh_interval)
+        journals.journals_url = "http://127.0.0.1:%i/titles.csv" % (
+            self.server.server_address[1])
+        return journals
+
+    def test_update_journals_file_downloads_file(self):
+        journals = self._journals()
+        self.assertTrue(journals.update_journals_file())
+        with open(journals.downloaded_journals_filename) as fp:
+            self.assertEqual(CSV, fp.read())
+        self.assertEqual('"1"', journals.download_info["etag"])
+        self.assertEqual(
+            "Mon, 01 Jun 2020 00:00:00 GMT",
+            journals.download_info["last_modified"])
+
+    def test_update_journals_file_sends_conditional_request(self):
+        self._journals().update_journals_file()
+        journals = self._journals()
+        self.assertFalse(journals.update_journals_file())
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual('"1"', self.server.requests[1]["If-None-Match"])
+        self.assertEqual(
+            "Mon, 01 Jun 2020 00:00:00 GMT",
+            self.server.requests[1]["If-Modified-Since"])
+
+    def test_update_journals_file_downloads_changed_file(self):
+        self._journals().update_journals_file()
+        self.server.version = 2
+        self.server.content = CSV.replace("Publisher X", "Publisher Y")
+        journals = self._journals()
+        self.assertTrue(journals.update_journals_file())
+        with open(journals.downloaded_journals_filename) as fp:
+            self.assertIn("Publisher Y", fp.read())
+
+    def test_update_journals_file_respects_min_refresh_interval(self):
+        self._journals().update_journals_file()
+        self.assertFalse(self._journals(3600).update_journals_file())
+        self.assertEqual(1, len(self.server.requests))
+
+    def test_update_journals_file_keeps_file_if_server_fails(self):
+        journals = self._journals()
+        journals.update_journals_file()
+        closed = HTTPServer(("127.0.0.1", 0), CSVHandler)
+        closed.server_close()
+        journals.journals_url = "http://127.0.0.1:%i/titles.csv" % (
+            closed.server_address[1])
+        self.assertFalse(journals.update_journals_file())
+        with open(journals.downloaded_journals_filename) as fp:
+            self.assertEqual(CSV, fp.read())
+
+
+class TestJournalsList(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.filename = os.path.join(self.path, "journals.csv")
+        with open(self.filename, "w") as fp:
+            fp.write(CSV)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_journals_snapshot_indexes_by_issn_and_acron(self):
+        snapshot = ws_journals.journals_snapshot(self.filename)
+        self.assertEqual(3, len(snapshot["rows"]))
+        self.assertEqual([0, 1], snapshot["issn"]["1001-0001"])
+        self.assertEqual([2], snapshot["acron"]["xyz"])
+        self.assertTrue(
+            os.path.isfile(ws_journals.snapshot_filename(self.filename)))
+
+    def test_journals_snapshot_is_loaded_from_file(self):
+        ws_journals.journals_snapshot(self.filename)
+        ws_journals._snapshots.clear()
+        with patch("prodtools.db.ws_journals.parse_journals_file") as mock:
+            snapshot = ws_journals.journals_snapshot(self.filename)
+        mock.assert_not_called()
+        self.assertEqual([2], snapshot["issn"]["0002-0002"])
+
+    def test_journals_snapshot_is_updated_if_csv_changes(self):
+        ws_journals.journals_snapshot(self.filename)
+        with open(self.filename, "a") as fp:
+            fp.write(
+                "scl\t0003-0003\t0003-0003\t\tBrasil\tnew\t"
+                "New\tJournal New\tNew NLM\tPublisher N\n")
+        snapshot = ws_journals.journals_snapshot(self.filename)
+        self.assertEqual([3], snapshot["acron"]["new"])
+
+    def test_get_journal(self):
+        journals_list = JournalsList(self.filename)
+        journal = journals_list.get_journal(None, "1002-0002", None)
+        self.assertEqual("xyz", journal.acron)
+        self.assertEqual("Publisher X", journal.publisher_name)
+        self.assertEqual("by-nc/4.0", journal.license)
+
+    def test_get_journal_data(self):
+        journals_list = JournalsList(self.filename)
+        journal = journals_list.get_journal_data("0001-0001", None, None)
+        self.assertEqual(["scl", "spa"], journal.collection_acron)
+        self.assertEqual(["abc"], journal.acron)
+
+    def test_get_journals_by_acron(self):
+        journals_list = JournalsList(self.filename)
+        self.assertEqual(
+            ["scl", "spa"],
+            [j.collection_acron
+             for j in journals_list.get_journals_by_acron("abc")])
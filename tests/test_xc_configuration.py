@@ -21,3 +21,20 @@ class TestConfigurationOfXC(unittest.TestCase):
     def test_email_subject_conversion_failure_returns_none_if_config_is_empty(self):
         self.configuration._data = {}
         self.assertIsNone(self.configuration.email_subject_conversion_failure)
+
+    def test_kernel_gate_outbox_path_defaults_to_serial_path(self):
+        self.configuration._data = {
+            "KG_server": "server", "KG_outbox_path": "",
+            "PROC_SERIAL_PATH": "/scielo/serial",
+        }
+        self.assertEqual(
+            "/scielo/serial/kernel_gate_outbox",
+            self.configuration.kernel_gate["outbox_path"].replace("\\", "/"))
+
+    def test_kernel_gate_keeps_configured_outbox_path(self):
+        self.configuration._data = {
+            "KG_server": "server", "KG_outbox_path": "/outbox",
+            "PROC_SERIAL_PATH": "/scielo/serial",
+        }
+        self.assertEqual(
+            "/outbox", self.configuration.kernel_gate["outbox_path"])
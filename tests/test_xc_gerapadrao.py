@@ -0,0 +1,231 @@
+import os
+import json
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from prodtools.server.xc_gerapadrao import (
+    GeraPadrao,
+    GeraPadraoStatusManager,
+    Scilista,
+    coalesce_scilista,
+    sort_scilista,
+)
+
+
+class TestScilista(TestCase):
+
+    def test_coalesce_scilista_removes_repeated_items(self):
+        self.assertEqual(
+            ["abc v1n1", "xyz v2n2", "abc v1n2"],
+            coalesce_scilista("abc v1n1\nxyz  v2n2\nabc v1n1\n\nabc\nabc v1n2\n"))
+
+    def test_coalesce_scilista_keeps_last_action(self):
+        self.assertEqual(
+            ["abc v1n1", "xyz v2n2"],
+            coalesce_scilista("abc v1n1 del\nxyz v2n2\nabc v1n1\n"))
+
+    def test_sort_scilista_puts_pr_first(self):
+        self.assertEqual(
+            "abc nahead pr\nabc v1n1\n",
+            sort_scilista("abc v1n1\nabc nahead pr\nabc v1n1\n"))
+
+    def test_consume_collection_scilista(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        scilista_file = os.path.join(path, "scilista.lst")
+        with open(scilista_file, "w") as fp:
+            fp.write("abc v1n1\n")
+        scilista = Scilista(scilista_file)
+        self.assertEqual("abc v1n1\n", scilista.consume_collection_scilista())
+        self.assertEqual([], os.listdir(path))
+        self.assertEqual("", scilista.consume_collection_scilista())
+
+
+class TestGeraPadraoStatusManager(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.manager = GeraPadraoStatusManager(
+            os.path.join(self.path, "gerapadrao.permission"))
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_acquire_and_release(self):
+        self.assertTrue(self.manager.acquire())
+        self.assertEqual("running", self.manager.status)
+        self.assertFalse(self.manager.is_free)
+        self.assertFalse(self.manager.acquire())
+        self.manager.release()
+        self.assertEqual("FINISHED", self.manager.status)
+        self.assertTrue(self.manager.is_free)
+        self.assertTrue(self.manager.acquire())
+
+    def test_acquire_removes_lock_of_finished_process(self):
+        with open(self.manager.lock_file, "w") as fp:
+            json.dump({
+                "pid": 2 ** 22 + 1,
+                "host": __import__("socket").gethostname(),
+                "time": time.time()}, fp)
+        self.assertTrue(self.manager.is_free)
+        self.assertTrue(self.manager.acquire())
+        self.assertEqual(os.getpid(), self.manager.lock_owner["pid"])
+
+    def test_acquire_removes_old_lock(self):
+        with open(self.manager.lock_file, "w") as fp:
+            json.dump({"pid": 1, "host": "other", "time": 0}, fp)
+        self.assertTrue(self.manager.acquire())
+
+    def test_acquire_keeps_lock_of_other_host(self):
+        with open(self.manager.lock_file, "w") as fp:
+            json.dump({"pid": 1, "host": "other", "time": time.time()}, fp)
+        self.assertFalse(self.manager.acquire())
+
+
+class TestGeraPadrao(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.serial_path = os.path.join(self.path, "serial")
+        config = Mock()
+        config.gerapadrao_permission_file = os.path.join(
+            self.path, "gerapadrao.permission")
+        config.gerapadrao_state_file = os.path.join(self.path, "state.json")
+        config.gerapadrao_lock_max_age = 3600
+        config.gerapadrao_proc_path = self.path
+        config.gerapadrao_scilista = os.path.join(
+            self.serial_path, "scilista.lst")
+        config.collection_scilista = os.path.join(self.path, "col.lst")
+        config.serial_path = self.serial_path
+        config.is_enabled_transference = False
+        self.config = config
+        for issue in ("v1n1", "v1n2"):
+            self.update_base("abc", issue)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def update_base(self, acron, issue, content="base"):
+        base_path = os.path.join(self.serial_path, acron, issue, "base")
+        if not os.path.isdir(base_path):
+            os.makedirs(base_path)
+        with open(os.path.join(base_path, issue + ".mst"), "a") as fp:
+            fp.write(content)
+
+    def add_to_scilista(self, content):
+        with open(self.config.collection_scilista, "a") as fp:
+            fp.write(content)
+
+    def run_gerapadrao(self, status=0):
+        gerapadrao = GeraPadrao("scl", self.config, None)
+        with patch("prodtools.server.xc_gerapadrao.os.system",
+                   return_value=status) as mock_system:
+            gerapadrao.run()
+        return gerapadrao, mock_system
+
+    def read_scilista(self):
+        with open(self.config.gerapadrao_scilista) as fp:
+            return fp.read()
+
+    def test_run_builds_coalesced_scilista(self):
+        self.add_to_scilista("abc v1n1\nabc v1n2\nabc v1n1\n")
+        gerapadrao, mock_system = self.run_gerapadrao()
+
+        mock_system.assert_called_once_with(gerapadrao.command)
+        self.assertEqual("abc v1n1\nabc v1n2\n", self.read_scilista())
+        self.assertTrue(gerapadrao.status_manager.is_free)
+        run = gerapadrao.state.runs[-1]
+        self.assertEqual(2, run["items"])
+        self.assertEqual(2, run["built"])
+        self.assertEqual(0, run["skipped"])
+        self.assertEqual(0, run["status"])
+
+    def test_run_skips_issues_unchanged_since_last_success(self):
+        self.add_to_scilista("abc v1n1\nabc v1n2\n")
+        self.run_gerapadrao()
+
+        self.update_base("abc", "v1n2", "new record")
+        self.add_to_scilista("abc v1n1\nabc v1n2\n")
+        gerapadrao, mock_system = self.run_gerapadrao()
+
+        self.assertEqual(1, mock_system.call_count)
+        self.assertEqual("abc v1n2\n", self.read_scilista())
+        run = gerapadrao.state.runs[-1]
+        self.assertEqual(1, run["built"])
+        self.assertEqual(1, run["skipped"])
+        self.assertEqual(2, len(gerapadrao.state.runs))
+
+    def test_run_does_not_call_gerapadrao_if_nothing_changed(self):
+        self.add_to_scilista("abc v1n1\n")
+        self.run_gerapadrao()
+        self.add_to_scilista("abc v1n1\n")
+        gerapadrao, mock_system = self.run_gerapadrao()
+
+        mock_system.assert_not_called()
+        self.assertEqual(1, gerapadrao.state.runs[-1]["skipped"])
+
+    def test_run_restores_scilista_if_gerapadrao_fails(self):
+        self.add_to_scilista("abc v1n1\n")
+        gerapadrao, mock_system = self.run_gerapadrao(status=256)
+
+        self.assertEqual(1, mock_system.call_count)
+        with open(self.config.collection_scilista) as fp:
+            self.assertEqual("abc v1n1\n", fp.read())
+        self.assertEqual(256, gerapadrao.state.runs[-1]["status"])
+
+        gerapadrao, mock_system = self.run_gerapadrao()
+        self.assertEqual(1, mock_system.call_count)
+        self.assertEqual(1, gerapadrao.state.runs[-1]["built"])
+
+    def write_gerapadrao_bat(self, exit_code):
+        bat = os.path.join(self.config.gerapadrao_proc_path, "GeraPadrao.bat")
+        with open(bat, "w") as fp:
+            fp.write("#!/bin/sh\nexit {}\n".format(exit_code))
+        os.chmod(bat, 0o755)
+
+    def test_command_returns_gerapadrao_status(self):
+        self.write_gerapadrao_bat(1)
+        gerapadrao = GeraPadrao("scl", self.config, None)
+        self.assertNotEqual(0, os.system(gerapadrao.command))
+
+        self.write_gerapadrao_bat(0)
+        self.assertEqual(0, os.system(gerapadrao.command))
+
+    def test_run_restores_scilista_if_gerapadrao_bat_fails(self):
+        self.write_gerapadrao_bat(1)
+        self.add_to_scilista("abc v1n1\n")
+        gerapadrao = GeraPadrao("scl", self.config, None)
+        gerapadrao.run()
+
+        with open(self.config.collection_scilista) as fp:
+            self.assertEqual("abc v1n1\n", fp.read())
+        self.assertNotEqual(0, gerapadrao.state.runs[-1]["status"])
+        self.assertEqual("FINISHED", gerapadrao.status_manager.status)
+
+    def test_run_processes_items_added_during_the_build(self):
+        self.add_to_scilista("abc v1n1\n")
+
+        def system(command):
+            if not os.path.isfile(self.config.collection_scilista):
+                self.update_base("abc", "v1n2", "new record")
+                self.add_to_scilista("abc v1n2\n")
+            return 0
+
+        gerapadrao = GeraPadrao("scl", self.config, None)
+        with patch("prodtools.server.xc_gerapadrao.os.system",
+                   side_effect=system) as mock_system:
+            gerapadrao.run()
+        self.assertEqual(2, mock_system.call_count)
+        self.assertEqual("abc v1n2\n", self.read_scilista())
+
+    def test_run_does_not_build_if_locked(self):
+        self.add_to_scilista("abc v1n1\n")
+        manager = GeraPadraoStatusManager(
+            self.config.gerapadrao_permission_file)
+        manager.acquire()
+        gerapadrao, mock_system = self.run_gerapadrao()
+        mock_system.assert_not_called()
+        self.assertTrue(os.path.isfile(self.config.collection_scilista))
@@ -1,8 +1,16 @@
-from unittest import TestCase
+import os
+import shutil
+import stat
+import tempfile
+from unittest import TestCase, skipIf
 from unittest.mock import Mock, patch
 
 
-from prodtools.db.xc_models import IssueAndTitleManager
+from prodtools.db.serial import ArticlesContentIndex, record_hash
+from prodtools.db.xc_models import (
+    IssueAndTitleManager, ArticlesManager, BaseManager)
+from prodtools.utils.dbm.dbm_isis import CISIS, UCISIS
+from tests.test_dbm_isis import FAKE_MX, FAKE_ID2I
 
 ISSUE_RECORD = {
     '30': 'Food Sci. Technol',
@@ -129,3 +137,120 @@ class TestIssueAndTitleManager(TestCase):
         registered_title, res_msg = result
         self.assertIsNotNone(registered_title)
         self.assertIsNone(res_msg)
+
+
+@patch("prodtools.db.xc_models.AopManager")
+@patch("prodtools.db.xc_models.BaseManager")
+class TestArticlesManagerConvertArticles(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.issue_files = Mock(is_aop=False)
+        self.issue_files.id_path = self.path
+        self.issue_files.acron_issue_label = "acron v1n1"
+        self.issue_files.content_index = ArticlesContentIndex(
+            os.path.join(self.path, "content_index.json"))
+        self.issue_hash = record_hash({})
+        self.articles = {
+            "a01": Mock(order="00001", marked_to_delete=False, is_ahead=True),
+            "a02": Mock(order="00002", marked_to_delete=False, is_ahead=True),
+        }
+        for order in ("00001", "00002"):
+            with open(os.path.join(self.path, order + ".id"), "w") as fp:
+                fp.write("")
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _manager(self, MockBaseManager):
+        MockBaseManager.return_value.save_article.return_value = True
+        MockBaseManager.return_value.registered_articles = {
+            "a01": None, "a02": None}
+        manager = ArticlesManager(Mock(), self.issue_files)
+        manager.aop_db_manager.scilista_items = []
+        return manager
+
+    def test_convert_articles_registers_hashes(self, MockBaseManager, MockAopManager):
+        manager = self._manager(MockBaseManager)
+        manager.convert_articles(
+            ["/pkg/a01.xml", "/pkg/a02.xml"], self.articles, {}, False,
+            {"a01": "h1", "a02": "h2"})
+        self.assertEqual([], manager.articles_skipped)
+        self.assertTrue(
+            self.issue_files.content_index.is_registered("a01", "h1", "00001", self.issue_hash))
+
+    def test_convert_articles_skips_identical_articles(self, MockBaseManager, MockAopManager):
+        self.issue_files.content_index.register("a01", "h1", "00001", self.issue_hash)
+        self.issue_files.content_index.register("a02", "old", "00002", self.issue_hash)
+        manager = self._manager(MockBaseManager)
+        result = manager.convert_articles(
+            ["/pkg/a01.xml", "/pkg/a02.xml"], self.articles, {}, False,
+            {"a01": "h1", "a02": "h2"})
+        self.assertEqual(["acron v1n1"], result)
+        self.assertEqual(["a01"], manager.articles_skipped)
+        manager.base_manager.save_article.assert_called_once_with(
+            self.articles["a02"], {})
+        self.issue_files.save_xml_files.assert_called_once_with(
+            ["/pkg/a02.xml"])
+        self.assertEqual(
+            {"converted": ["a02"], "not converted": [], "skipped": ["a01"]},
+            manager.db_conversion_status)
+
+    def test_convert_articles_does_not_skip_if_issue_record_changed(self, MockBaseManager, MockAopManager):
+        self.issue_files.content_index.register("a01", "h1", "00001", self.issue_hash)
+        manager = self._manager(MockBaseManager)
+        i_record = {"35": "1234-5678"}
+        manager.convert_articles(
+            ["/pkg/a01.xml", "/pkg/a02.xml"], self.articles, i_record, False,
+            {"a01": "h1", "a02": "h2"})
+        self.assertEqual([], manager.articles_skipped)
+        self.assertTrue(
+            self.issue_files.content_index.is_registered(
+                "a01", "h1", "00001", record_hash(i_record)))
+
+    def test_convert_articles_does_not_skip_without_id_file(self, MockBaseManager, MockAopManager):
+        self.issue_files.content_index.register("a01", "h1", "00001", self.issue_hash)
+        os.unlink(os.path.join(self.path, "00001.id"))
+        manager = self._manager(MockBaseManager)
+        manager.convert_articles(
+            ["/pkg/a01.xml", "/pkg/a02.xml"], self.articles, {}, False,
+            {"a01": "h1", "a02": "h2"})
+        self.assertEqual([], manager.articles_skipped)
+
+
+@skipIf(os.name == "nt", "usa scripts sh como comandos CISIS")
+class TestBaseManagerCreateDB(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        cisis_path = os.path.join(self.path, "cisis")
+        os.makedirs(cisis_path)
+        for name, content in (("mx", FAKE_MX), ("id2i", FAKE_ID2I)):
+            file_path = os.path.join(cisis_path, name)
+            with open(file_path, "w") as fp:
+                fp.write(content)
+            os.chmod(file_path, stat.S_IRWXU)
+        self.db_isis = UCISIS(CISIS(cisis_path), CISIS(cisis_path))
+        self.issue_files = Mock(is_ex_aop=False)
+        self.issue_files.id_path = os.path.join(self.path, "id")
+        self.issue_files.id_filename = os.path.join(
+            self.issue_files.id_path, "i.id")
+        self.issue_files.base = os.path.join(self.path, "base", "v1n1")
+        os.makedirs(self.issue_files.id_path)
+        os.makedirs(os.path.dirname(self.issue_files.base))
+        for name in ("i", "00001", "00002", "00003"):
+            with open(os.path.join(
+                    self.issue_files.id_path, name + ".id"), "w") as fp:
+                fp.write("")
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_create_db_runs_the_cisis_commands_in_one_process(self):
+        BaseManager(self.db_isis, self.issue_files).create_db()
+        self.assertEqual(1, self.db_isis.launches)
+        self.assertEqual(7, self.db_isis.executed)
+        self.assertTrue(os.path.isfile(self.issue_files.base + ".mst"))
+        self.assertEqual([], [
+            f for f in os.listdir(self.issue_files.id_path)
+            if not f.endswith(".id")])
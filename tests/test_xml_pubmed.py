@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from prodtools import xml_pubmed
+from tests.test_pmc_pkgmaker import XML
+
+
+def issue_records(issue_path, total):
+    records = [{"706": "i", "35": "1234-5678", "36": "20200002"}]
+    for i in range(1, total + 1):
+        records.append({
+            "706": "h",
+            "702": os.path.join(
+                issue_path, "markup_xml", "scielo_package",
+                "a{:05d}.xml".format(i)),
+            "121": str(i),
+            "223": "20200101",
+        })
+        records.append({"706": "o", "91": "20200101"})
+    return records
+
+
+def create_issue(serial_path, acron, issueid, total):
+    issue_path = os.path.join(serial_path, acron, issueid)
+    base_path = os.path.join(issue_path, "base")
+    pkg_path = os.path.join(issue_path, "markup_xml", "scielo_package")
+    os.makedirs(base_path)
+    os.makedirs(pkg_path)
+    for ext in (".mst", ".xrf"):
+        with open(os.path.join(base_path, issueid + ext), "w") as fp:
+            fp.write("isis")
+    for i in range(1, total + 1):
+        name = "a{:05d}".format(i)
+        with open(os.path.join(pkg_path, name + ".xml"), "w") as fp:
+            fp.write(XML.format(
+                i=i, name=name, paragraphs="<p>Text</p>",
+                journal_id='<journal-id journal-id-type="nlm-ta">'
+                           'Braz J Med</journal-id>'))
+    return issue_path
+
+
+def fake_ucisis(records_by_db):
+    ucisis = Mock()
+    ucisis.is_available = True
+    ucisis.get_records.side_effect = (
+        lambda db_filename, expr=None: records_by_db[db_filename])
+    return ucisis
+
+
+class TestPubMedBatch(TestCase):
+
+    def setUp(self):
+        self.serial_path = os.path.join(tempfile.mkdtemp(), "serial")
+        self.issues = {}
+        records = {}
+        for issueid, total in (("v10n1", 2), ("v10n2", 3)):
+            issue_path = create_issue(self.serial_path, "abc", issueid, total)
+            self.issues[issueid] = issue_path
+            records[os.path.join(issue_path, "base", issueid)] = (
+                issue_records(issue_path, total))
+        self.ucisis = fake_ucisis(records)
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.serial_path))
+
+    def test_export_issue_reads_the_database_in_place(self):
+        issue_path = self.issues["v10n1"]
+        with patch.object(xml_pubmed, "get_ucisis", return_value=self.ucisis):
+            result = xml_pubmed.export_issue(issue_path, "", "20201231")
+
+        self.assertEqual("done", result["status"])
+        self.assertEqual(2, result["articles"])
+        self.ucisis.get_records.assert_called_once_with(
+            os.path.join(issue_path, "base", "v10n1"))
+        self.ucisis.update_indexes.assert_not_called()
+        self.assertEqual(
+            ["v10n1.mst", "v10n1.xrf"],
+            sorted(os.listdir(os.path.join(issue_path, "base"))))
+
+        with open(result["pubmed_filename"]) as fp:
+            content = fp.read()
+        self.assertIn("S1234-56782020000200001", content)
+        self.assertIn("S1234-56782020000200002", content)
+
+    def test_run_exports_each_issue_and_isolates_failures(self):
+        issues_paths = [
+            self.issues["v10n1"],
+            os.path.join(self.serial_path, "abc", "missing"),
+            self.issues["v10n2"],
+        ]
+        batch = xml_pubmed.PubMedBatch(
+            issues_paths, "", "20201231", max_workers=1)
+        with patch.object(xml_pubmed, "get_ucisis", return_value=self.ucisis):
+            summary = batch.run()
+
+        self.assertEqual(3, summary["issues"])
+        self.assertEqual(2, summary["done"])
+        self.assertEqual(1, summary["failed"])
+        self.assertEqual(
+            issues_paths, [r["issue_path"] for r in summary["results"]])
+        self.assertFalse(os.path.isdir(issues_paths[1]))
+        self.assertEqual(
+            ["done", "failed", "done"],
+            [r["status"] for r in summary["results"]])
+        self.assertEqual(
+            [2, 3],
+            [r["articles"] for r in summary["results"] if "articles" in r])
+        for issueid, issue_path in self.issues.items():
+            self.assertEqual(
+                ["abc{}-20201231.xml".format(issueid)],
+                [f for f in os.listdir(os.path.join(issue_path, "PubMed"))
+                 if f.endswith(".xml")])
+
+
+class TestArticlesDB(TestCase):
+
+    def test_articles_uses_indexes_if_not_read_only(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        db_filename = os.path.join(path, "v1n1")
+        with open(db_filename + ".mst", "w") as fp:
+            fp.write("isis")
+        ucisis = Mock()
+        ucisis.get_records.return_value = issue_records(path, 1)[:2]
+        articles = xml_pubmed.ArticlesDB(ucisis, db_filename).articles()
+        ucisis.update_indexes.assert_called_once_with(
+            db_filename, xml_pubmed.FST_ARTICLE)
+        ucisis.get_records.assert_called_once_with(
+            db_filename, "tp=i or tp=h")
+        self.assertEqual(
+            {"a00001.xml": ("S1234-56782020000200001", None)}, articles)
@@ -0,0 +1,219 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from prodtools import xml_transform
+from prodtools import xml_transform_client
+from prodtools.utils import xml_utils
+from prodtools.xml_transform_server import (
+    XMLTransformServer,
+    validate_paths,
+)
+
+
+XSL = """<xsl:stylesheet version="1.0"
+    xmlns:xsl="http://www.w3.org/1999/XSL/Transform">
+  <xsl:template match="/">
+    <result>{}<xsl:value-of select="//title"/></result>
+  </xsl:template>
+</xsl:stylesheet>
+"""
+
+
+class XMLTransformTestCase(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.xml = self.write("a.xml", "<doc><title>Ação</title></doc>")
+        self.xsl = self.write("a.xsl", XSL.format("title: "))
+        self.paths = {
+            "xml_filepath": self.xml,
+            "xsl_filepath": self.xsl,
+            "result_filepath": os.path.join(self.path, "result.txt"),
+            "ctrl_filepath": os.path.join(self.path, "ctrl.txt"),
+            "err_filepath": os.path.join(self.path, "err.txt"),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write(self, name, content):
+        file_path = os.path.join(self.path, name)
+        with open(file_path, "w", encoding="utf-8") as fp:
+            fp.write(content)
+        return file_path
+
+    def read(self, name):
+        with open(self.paths[name], encoding="iso-8859-1") as fp:
+            return fp.read()
+
+    def argv(self):
+        return [self.paths[name] for name in xml_transform_client.FILEPATHS]
+
+
+class TestGetXSLT(XMLTransformTestCase):
+
+    def test_get_xslt_returns_the_same_object_if_file_is_unchanged(self):
+        self.assertIs(xml_utils.get_xslt(self.xsl), xml_utils.get_xslt(self.xsl))
+
+    def test_get_xslt_is_shared_by_threads(self):
+        compiled = []
+        thread = threading.Thread(
+            target=lambda: compiled.append(xml_utils.get_xslt(self.xsl)))
+        thread.start()
+        thread.join()
+        self.assertIs(compiled[0], xml_utils.get_xslt(self.xsl))
+
+    def test_get_xslt_compiles_again_if_file_changes(self):
+        xslt = xml_utils.get_xslt(self.xsl)
+        self.write("a.xsl", XSL.format("new title: "))
+        os.utime(self.xsl, (time.time() + 10, time.time() + 10))
+        self.assertIsNot(xslt, xml_utils.get_xslt(self.xsl))
+        result = xml_utils.transform(
+            xml_utils.get_xml_object(self.xml), self.xsl)
+        self.assertEqual("new title: Ação", result.getroot().text)
+
+
+class TestTransformFile(XMLTransformTestCase):
+
+    def test_transform_file_writes_result_and_ctrl_files(self):
+        xml_transform.transform_file(*self.argv())
+        self.assertEqual("title: Ação", self.read("result_filepath"))
+        self.assertEqual("done", self.read("ctrl_filepath"))
+        self.assertFalse(os.path.isfile(self.paths["err_filepath"]))
+
+    def test_transform_file_writes_err_file(self):
+        self.write("a.xml", "<doc>")
+        xml_transform.transform_file(*self.argv())
+        self.assertEqual("", self.read("result_filepath"))
+        self.assertEqual("done", self.read("ctrl_filepath"))
+        self.assertTrue(self.read("err_filepath"))
+
+
+class TestValidatePaths(XMLTransformTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.other_path)
+
+    def test_validate_paths_accepts_results_in_the_xml_folder(self):
+        validate_paths(self.paths)
+
+    def test_validate_paths_refuses_relative_paths(self):
+        self.paths["ctrl_filepath"] = "ctrl.txt"
+        with self.assertRaises(ValueError):
+            validate_paths(self.paths)
+
+    def test_validate_paths_refuses_missing_xml(self):
+        self.paths["xml_filepath"] = os.path.join(self.path, "missing.xml")
+        with self.assertRaises(ValueError):
+            validate_paths(self.paths)
+
+    def test_validate_paths_refuses_results_outside_the_xml_folder(self):
+        self.paths["err_filepath"] = os.path.join(self.other_path, "err.txt")
+        with self.assertRaises(ValueError):
+            validate_paths(self.paths)
+        self.paths["err_filepath"] = os.path.join(
+            self.path, "..", "err.txt")
+        with self.assertRaises(ValueError):
+            validate_paths(self.paths)
+
+    def test_validate_paths_accepts_results_in_allowed_paths(self):
+        self.paths["err_filepath"] = os.path.join(self.other_path, "err.txt")
+        validate_paths(self.paths, [self.path, self.other_path])
+        with self.assertRaises(ValueError):
+            validate_paths(self.paths, [self.other_path])
+
+    def test_validate_paths_refuses_links(self):
+        os.symlink(
+            os.path.join(self.other_path, "result.txt"),
+            self.paths["result_filepath"])
+        with self.assertRaises(ValueError):
+            validate_paths(self.paths)
+
+
+class TestXMLTransformClientAndServer(XMLTransformTestCase):
+
+    def start_server(self):
+        server = XMLTransformServer(port=0, preload=[self.xsl])
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def unused_address(self):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        address = sock.getsockname()
+        sock.close()
+        return address
+
+    def test_request_transformation_returns_none_without_server(self):
+        self.assertIsNone(xml_transform_client.request_transformation(
+            self.paths, self.unused_address()))
+
+    def test_main_transforms_locally_without_server(self):
+        os.environ["PRODTOOLS_XML_TRANSFORM_SERVER"] = "{}:{}".format(
+            *self.unused_address())
+        self.addCleanup(os.environ.pop, "PRODTOOLS_XML_TRANSFORM_SERVER")
+        xml_transform_client.main(self.argv())
+        self.assertEqual("title: Ação", self.read("result_filepath"))
+        self.assertEqual("done", self.read("ctrl_filepath"))
+
+    def test_main_requests_the_transformation_to_the_server(self):
+        server = self.start_server()
+        os.environ["PRODTOOLS_XML_TRANSFORM_SERVER"] = "{}:{}".format(
+            *server.server_address)
+        self.addCleanup(os.environ.pop, "PRODTOOLS_XML_TRANSFORM_SERVER")
+        for i in range(2):
+            xml_transform_client.main(self.argv())
+            self.assertEqual("title: Ação", self.read("result_filepath"))
+            self.assertEqual("done", self.read("ctrl_filepath"))
+        self.assertEqual(2, server.transformations)
+
+    def test_server_answers_invalid_request(self):
+        server = self.start_server()
+        conn = socket.create_connection(server.server_address)
+        conn.sendall(b"{}\n")
+        response = conn.makefile("rb").readline()
+        conn.close()
+        self.assertIn(b"invalid request", response)
+        self.assertEqual(0, server.transformations)
+
+    def test_server_refuses_results_outside_the_xml_folder(self):
+        server = self.start_server()
+        other_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_path)
+        self.paths["result_filepath"] = os.path.join(other_path, "keep.txt")
+        with open(self.paths["result_filepath"], "w") as fp:
+            fp.write("keep")
+
+        response = xml_transform_client.request_transformation(
+            self.paths, server.server_address)
+        self.assertEqual("invalid request", response["status"])
+        self.assertEqual("keep", self.read("result_filepath"))
+        self.assertEqual(0, server.transformations)
+
+    def test_main_transforms_locally_if_server_refuses_request(self):
+        server = self.start_server()
+        os.environ["PRODTOOLS_XML_TRANSFORM_SERVER"] = "{}:{}".format(
+            *server.server_address)
+        self.addCleanup(os.environ.pop, "PRODTOOLS_XML_TRANSFORM_SERVER")
+        other_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_path)
+        self.paths["result_filepath"] = os.path.join(other_path, "result.txt")
+
+        xml_transform_client.main(self.argv())
+        self.assertEqual("title: Ação", self.read("result_filepath"))
+        self.assertEqual(0, server.transformations)
+
+    def test_server_refuses_non_loopback_host(self):
+        with self.assertRaises(ValueError):
+            XMLTransformServer(host="0.0.0.0", port=0)
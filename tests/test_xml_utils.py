@@ -102,6 +102,31 @@ class TextEntity2Char(TestCase):
         obj = xml_utils.Entity2Char()
         self.assertEqual(expected, obj.convert(text))
 
+    def test_convert_converts_entities_in_content(self):
+        text = (
+            "<root a=\"x&amp;y\">&#30952&amp;ccedil; &lt;b&gt;\n"
+            "<p>&ge.&amp;lt; &eacute\t&copy2020 &notin;x</p>"
+            "<p>A&B&#38;C &amp;#38;</p></root>")
+        expected = (
+            "<root a=\"x&amp;y\">磨ç &lt;b&gt;\n"
+            "<p>≥.&lt; é\t©2020 ∉x</p>"
+            "<p>A&amp;B&amp;C &amp;</p></root>")
+        obj = xml_utils.Entity2Char()
+        self.assertEqual(expected, obj.convert(text))
+
+    def test_convert_has_the_same_result_as_converting_the_whole_content(self):
+        items = ["&", "amp;", "#", "x", "3C;", "60;", "lt;", "gt", ";",
+                 " ", "\n", "\t", "\r", "<", ">", "a", "eacute", "ge", ".",
+                 "38;", "x26;", "copy", "notin;", "1", "AMP;", "\xa0", "\f"]
+        obj = xml_utils.Entity2Char()
+        different = []
+        for first in items:
+            for second in items:
+                text = "&" + first + second + "&amp;" + second + first
+                if obj._convert_entities(text) != obj.convert(text):
+                    different.append(text)
+        self.assertEqual([], different)
+
 
 class TestLoadXML(TestCase):
 
@@ -681,3 +706,51 @@ class TestStripAllTagsExcept(TestCase):
         xml_utils.strip_all_tags_except(node, [".//a[@href='x']"])
         result = xml_utils.tostring(node)
         self.assertEqual(expected, result)
+
+
+class TestGetParser(TestCase):
+
+    def test_get_parser_returns_the_same_parser_for_the_same_options(self):
+        self.assertIs(
+            xml_utils.get_parser(remove_blank_text=True),
+            xml_utils.get_parser(remove_blank_text=True))
+        self.assertIsNot(
+            xml_utils.get_parser(remove_blank_text=True),
+            xml_utils.get_parser())
+
+    def test_load_xml_reusing_the_parser_keeps_the_errors_of_each_xml(self):
+        xml, errors = xml_utils.load_xml("<root")
+        self.assertIsNone(xml)
+        self.assertIsNotNone(errors)
+        xml, errors = xml_utils.load_xml("<root>ç</root>")
+        self.assertIsNone(errors)
+        self.assertEqual("ç", xml.find(".").text)
+
+
+class TestReadXMLFile(TestCase):
+
+    def read(self, content):
+        with tempfile.NamedTemporaryFile(suffix=".xml", delete=False) as fp:
+            fp.write(content)
+        try:
+            return xml_utils.read_xml_file(fp.name)
+        finally:
+            os.unlink(fp.name)
+
+    def test_read_xml_file_reads_utf8(self):
+        self.assertEqual(
+            "<root>ação</root>", self.read("<root>ação</root>".encode("utf-8")))
+
+    def test_read_xml_file_reads_iso_8859_1(self):
+        self.assertEqual(
+            "<root>ação</root>",
+            self.read("<root>ação</root>".encode("iso-8859-1")))
+
+    def test_read_xml_file_reads_declared_encoding(self):
+        content = '<?xml version="1.0" encoding="windows-1252"?><root>“a”</root>'
+        self.assertEqual(content, self.read(content.encode("windows-1252")))
+
+    def test_read_xml_file_normalizes_line_breaks(self):
+        self.assertEqual(
+            "<root>\n<a/>\n<b/>\n</root>",
+            self.read(b"<root>\r\n<a/>\r<b/>\n</root>"))
@@ -1,4 +1,5 @@
 from prodtools import xc
 
 
-xc.main()
+if __name__ == "__main__":
+    xc.main()
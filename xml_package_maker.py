@@ -1,4 +1,5 @@
 from prodtools import xpm
 
 
-xpm.main()
+if __name__ == "__main__":
+    xpm.main()
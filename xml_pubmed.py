@@ -1,4 +1,5 @@
 from prodtools import xml_pubmed
 
 
-xml_pubmed.main()
+if __name__ == "__main__":
+    xml_pubmed.main()
@@ -1,4 +1,5 @@
-from prodtools import xml_transform
+from prodtools import xml_transform_client
 
 
-xml_transform.main()
+if __name__ == "__main__":
+    xml_transform_client.main()
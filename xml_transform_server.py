@@ -0,0 +1,5 @@
+from prodtools import xml_transform_server
+
+
+if __name__ == "__main__":
+    xml_transform_server.main()